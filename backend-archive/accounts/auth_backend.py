@@ -1,6 +1,12 @@
-import bcrypt
+from asgiref.sync import sync_to_async
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import PermissionDenied
+from django.db.models import Q
+
+from .hashing import averify, check_django_password, check_legacy_password, needs_rehash, verify
+from .rehash import enqueue, upgrade_on_login
 
 UserModel = get_user_model()
 
@@ -9,43 +15,92 @@ class LegacyBcryptBackend(ModelBackend):
     """Authentication backend that falls back to verifying legacy bcrypt hashes stored in `legacy_password`.
 
     If the Django authentication (password) fails and the user has a `legacy_password`, this backend will
-    verify the given password with bcrypt and, on success, migrate the user to Django's password hashing
-    by calling `set_password` and clearing `legacy_password`.
+    verify the given password with bcrypt and, on success, queue the user for the background conversion in
+    `accounts.rehash`. With `PASSWORD_UPGRADE_ON_LOGIN` it instead re-hashes the password with Django's
+    preferred hasher right away (and upgrades outdated Django hashes too), at the cost of a second hash and
+    a write on that login.
+
+    Every hash computation runs on the bounded pool in `accounts.hashing`; when it is saturated
+    `VerifierBusy` propagates to the caller. `aauthenticate` does the same without blocking the event loop.
+
+    The user is resolved with a single query on the normalized email or the username. Once this backend
+    has looked at the credentials, a wrong password raises `PermissionDenied` so Django does not hand the
+    same credentials to another backend for a second lookup and hash check. An unknown login still pays for
+    one hash, as `ModelBackend` does, so response time does not reveal which accounts exist.
     """
 
+    def login_queryset(self, login):
+        """At most two candidates, found with one indexed query: by normalized email or exact username."""
+        return UserModel.objects.filter(
+            Q(email_normalized=UserModel.normalize_login(login)) | Q(username=login)
+        )[:2]
+
+    def pick(self, candidates, login):
+        # An email match wins over someone whose username happens to equal the input.
+        normalized = UserModel.normalize_login(login)
+        for user in candidates:
+            if user.email_normalized == normalized:
+                return user
+        return candidates[0] if candidates else None
+
+    def get_user_by_login(self, username):
+        return self.pick(list(self.login_queryset(username)), username)
+
+    async def aget_user_by_login(self, username):
+        return self.pick([user async for user in self.login_queryset(username)], username)
+
     def authenticate(self, request, username=None, password=None, **kwargs):
         if username is None:
             username = kwargs.get(UserModel.USERNAME_FIELD)
-        try:
-            user = UserModel.objects.get(email__iexact=username)
-        except UserModel.DoesNotExist:
-            try:
-                # fallback to username lookup
-                user = UserModel.objects.get(username__iexact=username)
-            except UserModel.DoesNotExist:
-                return None
+        if username is None or password is None:
+            return None
+        user = self.get_user_by_login(username)
+        if user is None:
+            verify(make_password, password)
+            raise PermissionDenied
 
         # First try normal Django check
-        if user.check_password(password):
+        if user.has_usable_password() and verify(check_django_password, password, user.password):
+            if upgrade_on_login() and needs_rehash(user.password):
+                user.password = verify(make_password, password)
+                user.save(update_fields=['password'])
             return user
 
         # If there's a legacy bcrypt hash, verify it
-        legacy = getattr(user, 'legacy_password', None)
-        if legacy:
-            try:
-                # legacy may be text like bcrypt hash string
-                if isinstance(legacy, str):
-                    legacy_bytes = legacy.encode('utf-8')
-                else:
-                    legacy_bytes = legacy
-                ok = bcrypt.checkpw(password.encode('utf-8'), legacy_bytes)
-                if ok:
-                    # migrate password to Django format and clear legacy
-                    user.set_password(password)
-                    user.legacy_password = None
-                    user.save()
-                    return user
-            except Exception:
-                return None
-
-        return None
+        if user.legacy_password and verify(check_legacy_password, password, user.legacy_password):
+            if upgrade_on_login():
+                # migrate password to Django format and clear legacy
+                user.password = verify(make_password, password)
+                user.legacy_password = None
+                user.save(update_fields=['password', 'legacy_password'])
+            else:
+                # Leave the conversion to the background queue (accounts.rehash).
+                enqueue([user.pk])
+            return user
+        raise PermissionDenied
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        user = await self.aget_user_by_login(username)
+        if user is None:
+            await averify(make_password, password)
+            raise PermissionDenied
+
+        if user.has_usable_password() and await averify(check_django_password, password, user.password):
+            if upgrade_on_login() and needs_rehash(user.password):
+                user.password = await averify(make_password, password)
+                await user.asave(update_fields=['password'])
+            return user
+
+        if user.legacy_password and await averify(check_legacy_password, password, user.legacy_password):
+            if upgrade_on_login():
+                user.password = await averify(make_password, password)
+                user.legacy_password = None
+                await user.asave(update_fields=['password', 'legacy_password'])
+            else:
+                await sync_to_async(enqueue)([user.pk])
+            return user
+        raise PermissionDenied
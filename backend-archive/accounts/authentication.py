@@ -0,0 +1,149 @@
+"""JWT authentication that skips signature checks and the user query for hot tokens.
+
+``CachedJWTAuthentication`` behaves like SimpleJWT's ``JWTAuthentication`` on a
+miss. It then remembers the validated token and a snapshot of the user's
+columns in a per-process LRU, keyed by a hash of the raw token. A hit rebuilds
+the user with ``Model.from_db`` (unsnapshotted fields load lazily if touched),
+so authenticating a repeat request costs no DB query and no crypto.
+
+Entries live at most ``JWT_AUTH_CACHE_TTL`` seconds and never past the token's
+``exp``. Each user also has a generation counter in the Django cache, bumped by
+``accounts.signals`` whenever the user row is saved or deleted (role change,
+password change, deactivation). An entry filled under an older generation is
+ignored, so those changes apply on the next request. With a shared cache
+backend (Redis, Memcached) this holds across processes too. With a
+process-local backend (``LocMemCache``, the default) other workers never see
+the bump. Entries then live at most ``JWT_AUTH_LOCAL_CACHE_TTL`` seconds
+(default 5), which bounds how long a demoted or deactivated user keeps access.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+SNAPSHOT_FIELDS = (
+    'id', 'username', 'email', 'first_name', 'last_name', 'role',
+    'is_active', 'is_staff', 'is_superuser', 'date_joined',
+)
+
+
+def _cache():
+    return caches[getattr(settings, 'JWT_AUTH_CACHE_ALIAS', 'default')]
+
+
+def snapshot_ttl():
+    """Seconds an entry may live; short unless generation bumps reach every process."""
+    ttl = getattr(settings, 'JWT_AUTH_CACHE_TTL', 300)
+    if isinstance(_cache(), LocMemCache):
+        ttl = min(ttl, getattr(settings, 'JWT_AUTH_LOCAL_CACHE_TTL', 5))
+    return ttl
+
+
+def _generation_key(user_id):
+    return f'auth:user-generation:{user_id}'
+
+
+def get_user_generation(user_id):
+    cache = _cache()
+    key = _generation_key(user_id)
+    generation = cache.get(key)
+    if generation is None:
+        # Seed from the clock, like the catalog versions, so a restarted cache never
+        # hands out a generation that an old entry was stored under.
+        cache.add(key, time.time_ns(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_user_generation(user_id):
+    cache = _cache()
+    key = _generation_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+class TokenCache:
+    """Thread-safe LRU of ``key -> (expires_at, value)`` with per-entry deadlines."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+token_cache = TokenCache(getattr(settings, 'JWT_AUTH_CACHE_SIZE', 10000))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # from_db() expects values in concrete-field order.
+        self.snapshot_fields = [
+            field.attname for field in self.user_model._meta.concrete_fields if field.attname in SNAPSHOT_FIELDS
+        ]
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        key = hashlib.sha256(raw_token).hexdigest()
+        entry = token_cache.get(key)
+        if entry is not None:
+            validated_token, user_id, generation, values = entry
+            if get_user_generation(user_id) == generation:
+                user = self.user_model.from_db(DEFAULT_DB_ALIAS, self.snapshot_fields, values)
+                return user, validated_token
+
+        validated_token = self.get_validated_token(raw_token)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        # Read the generation before the user row, so a save racing this fill
+        # leaves the entry already stale rather than silently current.
+        generation = get_user_generation(user_id) if user_id is not None else None
+        user = self.get_user(validated_token)
+
+        ttl = snapshot_ttl()
+        expires_at = min(time.time() + ttl, validated_token.get('exp', 0))
+        if ttl > 0 and user_id is not None and expires_at > time.time():
+            values = tuple(getattr(user, name) for name in self.snapshot_fields)
+            token_cache.set(key, (validated_token, user_id, generation, values), expires_at)
+        return user, validated_token
@@ -0,0 +1,40 @@
+"""Race-safe one-off decisions, backed by unique rows in ``SiteFlag``.
+
+``claim(name)`` returns True for exactly one caller, ever: the one whose insert
+of the flag row commits. Concurrent callers hit the unique index and get
+False. It costs one indexed lookup (plus one insert the very first time), no
+matter how many users exist.
+"""
+from django.db import IntegrityError, transaction
+
+from .models import SiteFlag
+
+FIRST_SUPER = 'first-super-assigned'
+# Set by `seed_data`: this database holds synthetic data that benchmarks may write to.
+BENCH_DATABASE = 'bench-database'
+
+
+def is_set(name):
+    return SiteFlag.objects.filter(name=name).exists()
+
+
+def claim(name):
+    if is_set(name):
+        return False
+    try:
+        with transaction.atomic():
+            SiteFlag.objects.create(name=name)
+    except IntegrityError:
+        return False
+    return True
+
+
+def mark(name):
+    """Set ``name`` without caring who set it first."""
+    if not is_set(name):
+        SiteFlag.objects.bulk_create([SiteFlag(name=name)], ignore_conflicts=True)
+
+
+def release(name):
+    """Unset ``name``, e.g. after throwaway accounts closed a window by accident."""
+    SiteFlag.objects.filter(name=name).delete()
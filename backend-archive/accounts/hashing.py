@@ -0,0 +1,115 @@
+"""Run slow password hashing off the request thread, on a bounded pool.
+
+bcrypt and PBKDF2 release the GIL while they work, so a small thread pool
+gives real parallelism while capping how many CPU-heavy checks run at once.
+The pool admits at most ``PASSWORD_VERIFY_WORKERS`` running jobs plus
+``PASSWORD_VERIFY_QUEUE_SIZE`` waiting ones; beyond that ``VerifierBusy`` is
+raised straight away, so a login burst is shed instead of tying up every
+worker behind a long hash queue.
+
+Only pure functions of their arguments run on the pool. Anything that touches
+the database (upgrading a hash, clearing ``legacy_password``) stays with the
+caller.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class VerifierBusy(Exception):
+    """The verifier pool is saturated; the caller should shed the request."""
+
+
+class VerifierPool:
+    def __init__(self, workers, queue_size):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-verify')
+
+    def submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise VerifierBusy()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def run(self, fn, *args):
+        return self.submit(fn, *args).result()
+
+    async def arun(self, fn, *args):
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                workers = getattr(settings, 'PASSWORD_VERIFY_WORKERS', None) or min(4, os.cpu_count() or 1)
+                queue_size = getattr(settings, 'PASSWORD_VERIFY_QUEUE_SIZE', workers * 8)
+                _pool = VerifierPool(workers, queue_size)
+    return _pool
+
+
+def reset_pool():
+    """Drop the shared pool so the next call picks up current settings."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = None
+
+
+def check_django_password(raw, encoded):
+    """``hashers.check_password`` without the setter, which would write to the DB."""
+    try:
+        return hashers.check_password(raw, encoded)
+    except ValueError:
+        # bcrypt refuses passwords over 72 bytes outright.
+        return False
+
+
+def check_legacy_password(raw, legacy):
+    if not raw or not legacy:
+        return False
+    if isinstance(legacy, str):
+        legacy = legacy.encode('utf-8')
+    try:
+        return bcrypt.checkpw(raw.encode('utf-8'), legacy)
+    except ValueError:
+        # Not a bcrypt hash at all.
+        return False
+
+
+def needs_rehash(encoded):
+    """True if ``encoded`` is not in the preferred hasher's current format."""
+    try:
+        hasher = hashers.identify_hasher(encoded)
+    except ValueError:
+        return False
+    return hasher.algorithm != hashers.get_hasher().algorithm or hasher.must_update(encoded)
+
+
+def verify(fn, *args):
+    return get_pool().run(fn, *args)
+
+
+async def averify(fn, *args):
+    return await get_pool().arun(fn, *args)
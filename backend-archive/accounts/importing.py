@@ -0,0 +1,139 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils.dateparse import parse_datetime
+
+from . import bootstrap
+
+UPDATE_FIELDS = ['first_name', 'last_name', 'role', 'legacy_password', 'date_joined', 'password']
+
+
+def split_name(name):
+    parts = (name or '').split(None, 1)
+    return (parts[0] if parts else ''), (parts[1] if len(parts) > 1 else '')
+
+
+def _date_joined(value):
+    if not value:
+        return None
+    try:
+        return parse_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def prepare_rows(rows):
+    """Turn legacy ``(id, name, email, password, createdAt, role)`` rows into field dicts.
+
+    Returns ``(records, skipped)``: ``records`` maps the lowercased email to its
+    fields (the last row wins for duplicate emails) and ``skipped`` lists the
+    source ids of rows without an email.
+    """
+    records, skipped = {}, []
+    for uid, name, email, pw_hash, created_at, role in rows:
+        if not email:
+            skipped.append(uid)
+            continue
+        first_name, last_name = split_name(name)
+        records[email.lower()] = {
+            'first_name': first_name,
+            'last_name': last_name,
+            'role': role or None,
+            'legacy_password': pw_hash or None,
+            'date_joined': _date_joined(created_at),
+            # An unusable password is a random marker, not a hash; building it is cheap.
+            'password': make_password(None),
+        }
+    return records, skipped
+
+
+class UserImportStats:
+    def __init__(self):
+        self.read = 0
+        self.created = 0
+        self.updated = 0
+        self.skipped = []
+        self.started = time.perf_counter()
+        self.finished = None
+
+    @property
+    def seconds(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def rows_per_second(self):
+        return self.read / self.seconds if self.seconds else 0.0
+
+
+class UserImporter:
+    """Chunked create-or-update of legacy users, matched on lowercased email.
+
+    ``chunks`` is an iterable of row lists (e.g. successive ``fetchmany``
+    results). Each chunk costs one ``IN`` query that preloads its existing
+    users, then a ``bulk_create`` and a ``bulk_update``. The whole run is a
+    single transaction, which is what SQLite can sustain. ``progress(stats)``
+    is called after every chunk.
+    """
+
+    def __init__(self, batch_size=1000, progress=None):
+        self.batch_size = batch_size
+        self.progress = progress
+
+    def run(self, chunks):
+        stats = UserImportStats()
+        with transaction.atomic():
+            for rows in chunks:
+                records, skipped = prepare_rows(rows)
+                stats.read += len(rows)
+                stats.skipped += skipped
+                self.write(records, stats)
+                if self.progress:
+                    self.progress(stats)
+        stats.finished = time.perf_counter()
+        return stats
+
+    def write(self, records, stats):
+        User = get_user_model()
+        emails = list(records)
+        # Legacy case duplicates keep a NULL email_normalized (migration 0002), so match those on their raw email.
+        users = (
+            User.objects.annotate(email_lower=Lower('email'))
+            .filter(Q(email_normalized__in=emails) | Q(email_normalized__isnull=True, email_lower__in=emails))
+            .order_by('pk')
+            .only('id', 'email', 'email_normalized', 'role', 'date_joined')
+        )
+        existing = {}
+        for user in users:
+            if user.email_normalized is not None:
+                existing[user.email_normalized] = user
+            else:
+                existing.setdefault(user.email_lower, user)
+        to_create, to_update = [], []
+        for email, fields in records.items():
+            user = existing.get(email)
+            if user is None:
+                # bulk_create skips User.save(), so fill the normalized column here.
+                user = User(username=email, email=email, email_normalized=email)
+                to_create.append(user)
+            else:
+                to_update.append(user)
+            user.first_name = fields['first_name']
+            user.last_name = fields['last_name']
+            user.role = fields['role'] or user.role
+            # Store the legacy bcrypt hash for verification at login.
+            user.legacy_password = fields['legacy_password']
+            if fields['date_joined']:
+                user.date_joined = fields['date_joined']
+            user.password = fields['password']
+
+        User.objects.bulk_create(to_create, batch_size=self.batch_size)
+        if to_create and not stats.created:
+            # bulk_create skips the post_save hook that normally closes the bootstrap window.
+            bootstrap.mark(bootstrap.FIRST_SUPER)
+        User.objects.bulk_update(to_update, UPDATE_FIELDS, batch_size=self.batch_size)
+        stats.created += len(to_create)
+        stats.updated += len(to_update)
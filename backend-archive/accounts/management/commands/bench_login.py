@@ -0,0 +1,93 @@
+import asyncio
+import json
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client
+
+BENCH_EMAIL = 'bench-login@example.invalid'
+
+
+class Command(BaseCommand):
+    help = 'Measure login throughput and latency at a fixed concurrency against the sync or async login view'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Total login attempts')
+        parser.add_argument('--concurrency', type=int, default=8, help='Logins in flight at once')
+        parser.add_argument('--async', dest='use_async', action='store_true', help='Drive /api/auth/login/async/ from one event loop')
+        parser.add_argument('--legacy', action='store_true', help='Store the password as a legacy bcrypt hash (re-seeded before every login)')
+        parser.add_argument('--bcrypt-rounds', type=int, default=10, help='Cost factor for the legacy hash')
+        parser.add_argument('--wrong-password', action='store_true', help='Benchmark failed logins instead')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        password = 'bench-password-123'
+        User.objects.filter(email=BENCH_EMAIL).delete()
+        user = User.objects.create(username=BENCH_EMAIL, email=BENCH_EMAIL, password=make_password(password))
+        self.legacy = None
+        if options['legacy']:
+            hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(options['bcrypt_rounds'])).decode('utf-8')
+            self.legacy = (user.pk, hashed)
+        body = json.dumps({'email': BENCH_EMAIL, 'password': 'nope' if options['wrong_password'] else password})
+
+        try:
+            started = time.perf_counter()
+            if options['use_async']:
+                samples = asyncio.run(self.run_async(body, options))
+            else:
+                samples = self.run_threads(body, options)
+            elapsed = time.perf_counter() - started
+        finally:
+            User.objects.filter(pk=user.pk).delete()
+        self.report(samples, elapsed, options)
+
+    def reseed(self):
+        # Make every attempt take the legacy bcrypt path rather than the migrated one.
+        pk, hashed = self.legacy
+        get_user_model().objects.filter(pk=pk).update(password='!', legacy_password=hashed)
+
+    def run_threads(self, body, options):
+        path = '/api/auth/login/'
+
+        def attempt(_):
+            if self.legacy:
+                self.reseed()
+            client = Client(SERVER_NAME='localhost')
+            t0 = time.perf_counter()
+            response = client.post(path, body, content_type='application/json')
+            return time.perf_counter() - t0, response.status_code
+
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            return list(pool.map(attempt, range(options['requests'])))
+
+    async def run_async(self, body, options):
+        path = '/api/auth/login/async/'
+        gate = asyncio.Semaphore(options['concurrency'])
+        client = AsyncClient(SERVER_NAME='localhost')
+
+        async def attempt():
+            async with gate:
+                if self.legacy:
+                    await sync_to_async(self.reseed)()
+                t0 = time.perf_counter()
+                response = await client.post(path, body, content_type='application/json')
+                return time.perf_counter() - t0, response.status_code
+
+        return await asyncio.gather(*(attempt() for _ in range(options['requests'])))
+
+    def report(self, samples, elapsed, options):
+        latencies = sorted(latency * 1000 for latency, _ in samples)
+        statuses = Counter(code for _, code in samples)
+        cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        mode = 'async' if options['use_async'] else 'sync'
+        self.stdout.write(f"{len(samples)} logins ({mode}, concurrency {options['concurrency']}) in {elapsed:.2f}s")
+        self.stdout.write(f"  throughput: {len(samples) / elapsed:,.1f} logins/sec")
+        self.stdout.write(f"  latency ms: p50 {cuts[49]:.1f}  p95 {cuts[94]:.1f}  p99 {cuts[98]:.1f}  max {latencies[-1]:.1f}")
+        self.stdout.write('  statuses: ' + ', '.join(f'{code}={count}' for code, count in sorted(statuses.items())))
@@ -2,8 +2,7 @@ import os
 import sqlite3
 from django.core.management.base import BaseCommand
 from django.conf import settings
-from django.utils.dateparse import parse_datetime
-from django.contrib.auth import get_user_model
+from accounts.importing import UserImporter
 
 
 class Command(BaseCommand):
@@ -12,6 +11,7 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument('--source', type=str, default=os.path.join(settings.BASE_DIR, '..', 'data', 'users.db'))
         parser.add_argument('--force-reset', action='store_true', help='Set unusable password for all imported users (recommended)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows fetched and written per chunk')
 
     def handle(self, *args, **options):
         src = options['source']
@@ -29,63 +29,35 @@ class Command(BaseCommand):
             self.stderr.write(self.style.ERROR(f"Failed to read users table: {e}"))
             return
 
-        rows = cursor.fetchall()
-        total = len(rows)
+        total = conn.execute('SELECT COUNT(*) FROM users').fetchone()[0]
         self.stdout.write(self.style.SUCCESS(f"Found {total} users in source DB"))
 
-        User = get_user_model()
-        created_count = 0
-        updated_count = 0
+        self.verbosity = options['verbosity']
+        batch_size = options['batch_size']
 
-        for row in rows:
-            uid, name, email, pw_hash, createdAt, role = row
-            if not email:
-                self.stderr.write(self.style.WARNING(f"Skipping user with id {uid} (missing email)"))
-                continue
+        def chunks():
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield rows
 
-            email = email.lower()
-            username = email
-            first_name = ''
-            last_name = ''
-            if name:
-                parts = name.split(None, 1)
-                first_name = parts[0]
-                if len(parts) > 1:
-                    last_name = parts[1]
-
-            try:
-                user = User.objects.get(email=email)
-                updated = True
-            except User.DoesNotExist:
-                user = User(username=username, email=email)
-                updated = False
-
-            user.first_name = first_name
-            user.last_name = last_name
-            user.role = role or user.role
-            # store legacy bcrypt hash for migration/verification later
-            user.legacy_password = pw_hash if pw_hash else None
-
-            # set date_joined if valid
-            if createdAt:
-                try:
-                    dt = parse_datetime(createdAt)
-                    if dt:
-                        user.date_joined = dt
-                except Exception:
-                    pass
-
-            # Do not set a usable password by default (security). If the option --force-reset is not given,
-            # and the pw_hash is present, keep unusable password but retain legacy_password to allow later transition.
-            user.set_unusable_password()
-            user.save()
-
-            if updated:
-                updated_count += 1
-            else:
-                created_count += 1
-
-        conn.close()
-        self.stdout.write(self.style.SUCCESS(f"Import complete. Created: {created_count}, Updated: {updated_count}."))
+        # Passwords are always left unusable; the legacy bcrypt hash is kept in legacy_password
+        # so a login backend can verify it and move the user to Django hashing.
+        importer = UserImporter(batch_size=batch_size, progress=self.report_progress)
+        try:
+            stats = importer.run(chunks())
+        finally:
+            conn.close()
+        for uid in stats.skipped:
+            self.stderr.write(self.style.WARNING(f"Skipping user with id {uid} (missing email)"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Import complete. Created: {stats.created}, Updated: {stats.updated} "
+            f"in {stats.seconds:.2f}s ({stats.rows_per_second:,.0f} rows/sec)."
+        ))
         self.stdout.write(self.style.WARNING('Passwords are not migrated to Django. legacy bcrypt hashes are stored in `legacy_password`.'))
         self.stdout.write(self.style.WARNING('Recommend asking users to reset passwords or add a login backend to validate bcrypt hashes during transition.'))
+
+    def report_progress(self, stats):
+        if self.verbosity >= 1:
+            self.stdout.write(f"  users: {stats.read} read ({stats.rows_per_second:,.0f} rows/sec)")
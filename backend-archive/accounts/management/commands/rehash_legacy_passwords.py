@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.rehash import enqueue_legacy_users, migration_status, run_jobs
+
+
+class Command(BaseCommand):
+    help = 'Queue and run background conversion of legacy bcrypt hashes, and report migration progress'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--enqueue', action='store_true', help='Queue a job for every user that still has a legacy_password')
+        parser.add_argument('--run', action='store_true', help='Process pending jobs until the queue is empty')
+        parser.add_argument('--batch-size', type=int, default=500, help='Jobs claimed and written per transaction')
+        parser.add_argument('--limit', type=int, default=None, help='Stop after this many jobs')
+        parser.add_argument('--interval', type=float, default=None, help='Keep polling the queue every N seconds (worker mode)')
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        if options['enqueue']:
+            queued = enqueue_legacy_users(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"Queued {queued} users for rehash"))
+
+        if options['run'] or options['interval']:
+            while True:
+                started = time.perf_counter()
+                done, failed = run_jobs(batch_size=options['batch_size'], limit=options['limit'], progress=self.report_progress)
+                if done or failed:
+                    elapsed = time.perf_counter() - started
+                    self.stdout.write(self.style.SUCCESS(
+                        f"Processed {done + failed} jobs ({done} done, {failed} failed) in {elapsed:.2f}s"
+                    ))
+                if not options['interval']:
+                    break
+                time.sleep(options['interval'])
+
+        status = migration_status()
+        self.stdout.write(
+            f"Legacy hashes remaining: {status['legacy_users']}; jobs pending: {status['pending']}, "
+            f"done: {status['done']}, failed: {status['failed']}"
+        )
+
+    def report_progress(self, done, failed):
+        if self.verbosity >= 2:
+            self.stdout.write(f"  {done + failed} jobs processed ({failed} failed)")
@@ -0,0 +1,36 @@
+from django.db import migrations, models
+
+
+def backfill(apps, schema_editor):
+    # Emails are unique case-sensitively, so two accounts may differ only in case;
+    # the oldest keeps the normalized value and the rest stay NULL (login by username).
+    User = apps.get_model('accounts', 'User')
+    seen = set()
+    batch = []
+    for user in User.objects.order_by('pk').only('pk', 'email').iterator(chunk_size=2000):
+        normalized = (user.email or '').strip().lower()
+        if not normalized or normalized in seen:
+            continue
+        seen.add(normalized)
+        user.email_normalized = normalized
+        batch.append(user)
+        if len(batch) >= 500:
+            User.objects.bulk_update(batch, ['email_normalized'])
+            batch = []
+    User.objects.bulk_update(batch, ['email_normalized'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='email_normalized',
+            field=models.CharField(editable=False, max_length=254, null=True, unique=True),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:39
+
+from django.db import migrations, models
+
+
+def mark_existing_install(apps, schema_editor):
+    # Registration used to make the first user `super` when the table was empty.
+    # Installs that already have users have had that moment.
+    User = apps.get_model('accounts', 'User')
+    SiteFlag = apps.get_model('accounts', 'SiteFlag')
+    if User.objects.exists():
+        SiteFlag.objects.get_or_create(name='first-super-assigned')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_password_rehash_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SiteFlag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RunPython(mark_existing_install, migrations.RunPython.noop),
+    ]
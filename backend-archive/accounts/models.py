@@ -18,5 +18,71 @@ class User(AbstractUser):
     # but allow a later transition strategy (or verification backend) if desired.
     legacy_password = models.CharField(max_length=255, blank=True, null=True)
 
+    # Lowercased copy of `email`, kept in sync on save, so logins resolve with one
+    # indexed equality lookup instead of an `email__iexact` scan. Bulk writers must set it.
+    email_normalized = models.CharField(max_length=254, unique=True, null=True, editable=False)
+
+    @staticmethod
+    def normalize_login(value):
+        return (value or '').strip().lower()
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'email' in update_fields:
+            normalized = self.normalize_login(self.email) or None
+            # Legacy accounts that differ from an older one only in case were left NULL by
+            # migration 0002; they keep that until their email stops colliding.
+            if (
+                normalized is not None and self.pk is not None and self.email_normalized is None
+                and type(self).objects.filter(email_normalized=normalized).exclude(pk=self.pk).exists()
+            ):
+                normalized = None
+            self.email_normalized = normalized
+        if update_fields is not None and 'email' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'email_normalized'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.username or self.email
+
+
+class PasswordRehashJob(models.Model):
+    """Queued conversion of a user's `legacy_password` into Django's password field.
+
+    Filled by `rehash_legacy_passwords --enqueue` and by legacy logins, drained by
+    `rehash_legacy_passwords --run`. See `accounts.rehash`.
+    """
+
+    STATUS_PENDING = 'pending'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='rehash_job')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id'], name='accounts_rehash_status_idx'),
+        ]
+
+
+class SiteFlag(models.Model):
+    """One-off, set-once markers such as "the first super user has been assigned".
+
+    The unique `name` makes claiming a flag an atomic insert; see `accounts.bootstrap`.
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
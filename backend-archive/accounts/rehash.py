@@ -0,0 +1,145 @@
+"""Background migration of legacy bcrypt hashes into Django's password field.
+
+Django's ``BCryptPasswordHasher`` stores a plain bcrypt hash as
+``bcrypt$<hash>``, so a legacy hash can be adopted as-is, without the user's
+password and without hashing anything. A job just rewrites two columns:
+``password`` and ``legacy_password``.
+
+Jobs live in ``PasswordRehashJob``. They are queued in bulk by
+``rehash_legacy_passwords --enqueue`` (and one at a time by legacy logins) and
+drained in batches by ``rehash_legacy_passwords --run``, cron or a long-running
+worker. Once a user is migrated, login is one ordinary Django password check.
+Moving them on to the preferred hasher happens at login only when
+``PASSWORD_UPGRADE_ON_LOGIN`` is enabled.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import PasswordRehashJob
+
+BCRYPT_PREFIXES = ('$2a$', '$2b$', '$2y$')
+BCRYPT_LENGTH = 60
+
+
+def upgrade_on_login():
+    return getattr(settings, 'PASSWORD_UPGRADE_ON_LOGIN', False)
+
+
+def legacy_to_django(legacy):
+    """Return the Django ``password`` value for a legacy bcrypt hash."""
+    if not legacy or not legacy.startswith(BCRYPT_PREFIXES) or len(legacy) != BCRYPT_LENGTH:
+        raise ValueError('legacy_password is not a bcrypt hash')
+    return 'bcrypt$' + legacy
+
+
+def has_django_password(encoded):
+    """True for a real Django hash; false for unusable ('!...') or empty passwords."""
+    try:
+        identify_hasher(encoded)
+    except ValueError:
+        return False
+    return True
+
+
+def enqueue(user_ids, batch_size=1000):
+    """Queue (or re-queue) a rehash job for every id in ``user_ids``."""
+    user_ids = list(user_ids)
+    now = timezone.now()
+    PasswordRehashJob.objects.bulk_create(
+        [PasswordRehashJob(user_id=pk, updated_at=now) for pk in user_ids],
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=['status', 'updated_at'],
+    )
+    return len(user_ids)
+
+
+def enqueue_legacy_users(batch_size=1000):
+    """Queue every user that still has a ``legacy_password``; return how many."""
+    User = get_user_model()
+    ids = User.objects.filter(legacy_password__isnull=False).exclude(legacy_password='').values_list('pk', flat=True)
+    total, chunk = 0, []
+    for pk in ids.iterator(chunk_size=batch_size):
+        chunk.append(pk)
+        if len(chunk) >= batch_size:
+            total += enqueue(chunk, batch_size)
+            chunk = []
+    if chunk:
+        total += enqueue(chunk, batch_size)
+    return total
+
+
+def _claim(batch_size):
+    jobs = PasswordRehashJob.objects.filter(status=PasswordRehashJob.STATUS_PENDING).order_by('id')
+    if connection.features.has_select_for_update_skip_locked:
+        # Lets several workers drain the queue without picking the same rows.
+        jobs = jobs.select_for_update(skip_locked=True, of=('self',))
+    return list(
+        jobs.select_related('user').only('id', 'status', 'attempts', 'error', 'user__id', 'user__password', 'user__legacy_password')[:batch_size]
+    )
+
+
+def run_batch(batch_size=500):
+    """Process up to ``batch_size`` pending jobs; return ``(done, failed)``."""
+    User = get_user_model()
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = _claim(batch_size)
+        users, done, failed = [], 0, 0
+        for job in jobs:
+            job.attempts += 1
+            job.updated_at = now
+            user = job.user
+            if not user.legacy_password:
+                job.status = PasswordRehashJob.STATUS_DONE
+                done += 1
+                continue
+            if has_django_password(user.password):
+                # The user already has a Django password (migrated at login or reset); the legacy hash is stale.
+                user.legacy_password = None
+            else:
+                try:
+                    user.password = legacy_to_django(user.legacy_password)
+                except ValueError as e:
+                    job.status = PasswordRehashJob.STATUS_FAILED
+                    job.error = str(e)
+                    failed += 1
+                    continue
+                user.legacy_password = None
+            users.append(user)
+            job.status = PasswordRehashJob.STATUS_DONE
+            done += 1
+        User.objects.bulk_update(users, ['password', 'legacy_password'], batch_size=batch_size)
+        PasswordRehashJob.objects.bulk_update(jobs, ['status', 'attempts', 'error', 'updated_at'], batch_size=batch_size)
+    return done, failed
+
+
+def run_jobs(batch_size=500, limit=None, progress=None):
+    """Drain the queue batch by batch; ``progress(done, failed)`` runs after each batch."""
+    done = failed = 0
+    while limit is None or done + failed < limit:
+        size = batch_size if limit is None else min(batch_size, limit - done - failed)
+        batch_done, batch_failed = run_batch(size)
+        if not batch_done and not batch_failed:
+            break
+        done += batch_done
+        failed += batch_failed
+        if progress:
+            progress(done, failed)
+    return done, failed
+
+
+def migration_status():
+    User = get_user_model()
+    counts = dict(PasswordRehashJob.objects.values_list('status').annotate(n=Count('id')).order_by())
+    return {
+        'legacy_users': User.objects.filter(legacy_password__isnull=False).exclude(legacy_password='').count(),
+        'pending': counts.get(PasswordRehashJob.STATUS_PENDING, 0),
+        'done': counts.get(PasswordRehashJob.STATUS_DONE, 0),
+        'failed': counts.get(PasswordRehashJob.STATUS_FAILED, 0),
+    }
@@ -0,0 +1,115 @@
+"""Deterministic synthetic users for scale testing (``seed_data``).
+
+Hashing a password per row would cap generation at a few hundred users per
+second. Instead, a small pool of hashes is computed once and handed out
+round-robin: cheap legacy bcrypt hashes (``legacy_password``, as the SQL.js
+import leaves them) and Django hashes for users who have already been
+migrated. User ``i`` has the password ``seed-password-<i % pool>``, so logins
+can be benchmarked against any row.
+
+bcrypt salts normally come from ``os.urandom``. Here they are drawn from the
+seed, so the same seed reproduces the same hashes.
+"""
+import base64
+import random
+import time
+
+import bcrypt
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX, make_password
+from django.db import transaction
+from django.utils import timezone
+
+from . import bootstrap
+
+SEED_DOMAIN = 'seed.example.invalid'
+FIRST_NAMES = ['Amina', 'Brian', 'Chloe', 'David', 'Esther', 'Felix', 'Grace', 'Hassan', 'Irene', 'James', 'Kevin', 'Lucy']
+LAST_NAMES = ['Otieno', 'Wanjiru', 'Kamau', 'Mwangi', 'Achieng', 'Njoroge', 'Kiptoo', 'Mutua', 'Chebet', 'Odhiambo']
+# Translate standard base64 into bcrypt's alphabet.
+_BCRYPT_B64 = bytes.maketrans(
+    b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/',
+    b'./ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789',
+)
+
+
+def seed_email(i):
+    return f'user{i:07d}@{SEED_DOMAIN}'
+
+
+def seed_password(i, pool_size):
+    return f'seed-password-{i % pool_size}'
+
+
+def bcrypt_salt(rng, rounds):
+    raw = base64.b64encode(rng.randbytes(16)).rstrip(b'=').translate(_BCRYPT_B64)
+    return b'$2b$%02d$' % rounds + raw
+
+
+def legacy_hash_pool(rng, size, rounds):
+    return [
+        bcrypt.hashpw(seed_password(k, size).encode('utf-8'), bcrypt_salt(rng, rounds)).decode('utf-8')
+        for k in range(size)
+    ]
+
+
+def django_hash_pool(rng, size):
+    return [make_password(seed_password(k, size), salt=rng.randbytes(12).hex()) for k in range(size)]
+
+
+class UserSeeder:
+    """Generate ``users`` rows; a ``legacy_ratio`` share of them keep only a legacy bcrypt hash.
+
+    The rest get a Django hash, as if already migrated. Rows carry
+    ``email_normalized``, since ``bulk_create`` skips ``User.save()``. The
+    bootstrap flag is marked too, so the first real signup does not become
+    ``super``. ``progress(label, done, total, stats)`` is called after every
+    batch.
+    """
+
+    def __init__(self, seed=1, batch_size=5000, legacy_ratio=0.8, pool_size=8, bcrypt_rounds=4, progress=None):
+        self.seed = seed
+        self.batch_size = batch_size
+        self.legacy_ratio = legacy_ratio
+        self.pool_size = pool_size
+        self.bcrypt_rounds = bcrypt_rounds
+        self.progress = progress
+
+    def run(self, users, stats):
+        if not users:
+            return stats
+        User = get_user_model()
+        rng = random.Random(f'{self.seed}:users')
+        legacy = legacy_hash_pool(rng, self.pool_size, self.bcrypt_rounds)
+        migrated = django_hash_pool(rng, self.pool_size)
+        # make_password(None) would draw a random marker; keep the run reproducible.
+        unusable = UNUSABLE_PASSWORD_PREFIX + rng.randbytes(20).hex()
+        now = timezone.now()
+
+        with transaction.atomic():
+            for start in range(0, users, self.batch_size):
+                batch = []
+                for i in range(start, min(start + self.batch_size, users)):
+                    email = seed_email(i)
+                    slot = i % self.pool_size
+                    is_legacy = rng.random() < self.legacy_ratio
+                    batch.append(User(
+                        username=email,
+                        email=email,
+                        email_normalized=email,
+                        first_name=rng.choice(FIRST_NAMES),
+                        last_name=rng.choice(LAST_NAMES),
+                        password=unusable if is_legacy else migrated[slot],
+                        legacy_password=legacy[slot] if is_legacy else None,
+                        date_joined=now,
+                    ))
+                User.objects.bulk_create(batch, batch_size=self.batch_size)
+                stats.add('users', len(batch))
+                if self.progress:
+                    self.progress('users', start + len(batch), users, stats)
+            bootstrap.mark(bootstrap.FIRST_SUPER)
+        stats.finished = time.perf_counter()
+        return stats
+
+
+def delete_seeded_users():
+    return get_user_model().objects.filter(email_normalized__endswith=f'@{SEED_DOMAIN}').delete()[0]
@@ -1,8 +1,13 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+
+from . import bootstrap
 
 User = get_user_model()
 
+DUPLICATE_EMAIL = 'A user with that email already exists.'
+
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -19,6 +24,12 @@ class RegisterSerializer(serializers.ModelSerializer):
         model = User
         fields = ['id', 'username', 'email', 'password', 'first_name', 'last_name', 'name']
 
+    def validate_email(self, value):
+        # `email` is unique case-sensitively; accounts are identified by the lowercased copy.
+        if User.objects.filter(email_normalized=User.normalize_login(value)).exists():
+            raise serializers.ValidationError(DUPLICATE_EMAIL)
+        return value
+
     def create(self, validated_data):
         password = validated_data.pop('password')
         name = validated_data.pop('name', '')
@@ -35,8 +46,14 @@ class RegisterSerializer(serializers.ModelSerializer):
 
         user = User(username=username, email=email, first_name=first_name, last_name=last_name)
         user.set_password(password)
-        # First user becomes super by default
-        if User.objects.count() == 0:
-            user.role = 'super'
-        user.save()
+        try:
+            with transaction.atomic():
+                # First user becomes super by default. Claiming the flag is a unique insert, so
+                # exactly one concurrent signup wins, and a failed save hands the claim back.
+                if bootstrap.claim(bootstrap.FIRST_SUPER):
+                    user.role = 'super'
+                user.save()
+        except IntegrityError:
+            # A concurrent signup for the same address got past validate_email first.
+            raise serializers.ValidationError({'email': [DUPLICATE_EMAIL]})
         return user
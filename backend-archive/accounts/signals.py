@@ -0,0 +1,22 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import bootstrap
+from .authentication import bump_user_generation
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_row_changed(sender, instance, **kwargs):
+    # Role, password or active-flag changes must not be served from cached JWT auth.
+    bump_user_generation(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def user_created(sender, instance, created, raw=False, **kwargs):
+    # Any account (createsuperuser, admin, shell) ends the first-signup bootstrap window.
+    if created and not raw:
+        bootstrap.mark(bootstrap.FIRST_SUPER)
@@ -1,7 +1,30 @@
-from django.test import TestCase
+import hashlib
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 import bcrypt
+from asgiref.sync import sync_to_async
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import bootstrap
+from .authentication import snapshot_ttl, token_cache
+from .hashing import VerifierBusy, VerifierPool
+from .models import PasswordRehashJob
+from .rehash import migration_status as rehash_status, run_jobs
+from .seeding import UserSeeder, seed_email, seed_password
+from shop.seeding import SeedStats
 
 User = get_user_model()
 
@@ -19,8 +42,315 @@ class LegacyAuthTests(TestCase):
         url = reverse('token_obtain_pair')
         res = self.client.post(url, {'email': self.email, 'password': self.password}, content_type='application/json')
         self.assertEqual(res.status_code, 200)
+        # the login queued a background conversion; drain the queue
+        self.assertEqual(run_jobs(), (1, 0))
         self.user.refresh_from_db()
-        # legacy_password should be cleared after successful login
+        # legacy_password should be cleared once the login has been processed
         self.assertFalse(self.user.legacy_password)
         # now user should be able to login using Django password
         self.assertTrue(self.user.check_password(self.password))
+
+    async def test_async_login_migrates_password(self):
+        res = await self.async_client.post('/api/auth/login/async/', {'email': self.email.upper(), 'password': self.password},
+                                           content_type='application/json')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()['user']['email'], self.email)
+        self.assertEqual(await sync_to_async(run_jobs)(), (1, 0))
+        await self.user.arefresh_from_db()
+        self.assertFalse(self.user.legacy_password)
+
+        res = await self.async_client.post('/api/auth/login/async/', {'email': self.email, 'password': 'wrong'},
+                                           content_type='application/json')
+        self.assertEqual(res.status_code, 401)
+
+
+class LegacyRehashTests(TestCase):
+    def setUp(self):
+        self.password = 'SecretPass123'
+        self.legacy = bcrypt.hashpw(self.password.encode('utf-8'), bcrypt.gensalt(4)).decode('utf-8')
+        for i in range(3):
+            User.objects.create(username=f'u{i}@example.com', email=f'u{i}@example.com',
+                                password='!unusable', legacy_password=self.legacy)
+        User.objects.create(username='bad@example.com', email='bad@example.com', legacy_password='plaintext?')
+
+    def test_command_converts_legacy_hashes_in_background(self):
+        out = StringIO()
+        with CaptureQueriesContext(connection) as ctx:
+            call_command('rehash_legacy_passwords', enqueue=True, run=True, batch_size=10, stdout=out)
+        self.assertIn('Queued 4 users', out.getvalue())
+        self.assertIn('Processed 4 jobs (3 done, 1 failed)', out.getvalue())
+        self.assertIn('Legacy hashes remaining: 1; jobs pending: 0, done: 3, failed: 1', out.getvalue())
+        # Writes are batched: no per-user UPDATE statements.
+        self.assertLess(len(ctx.captured_queries), 15)
+
+        user = User.objects.get(email='u1@example.com')
+        self.assertIsNone(user.legacy_password)
+        self.assertTrue(user.password.startswith('bcrypt$$2b$04$'))
+        res = self.client.post(reverse('token_obtain_pair'), {'email': 'u1@example.com', 'password': self.password},
+                               content_type='application/json')
+        self.assertEqual(res.status_code, 200)
+        # Without PASSWORD_UPGRADE_ON_LOGIN the migrated hash is left alone.
+        self.assertEqual(User.objects.get(pk=user.pk).password, user.password)
+        self.assertEqual(rehash_status()['legacy_users'], 1)
+
+    @override_settings(PASSWORD_UPGRADE_ON_LOGIN=True)
+    def test_upgrade_on_login_is_opt_in(self):
+        res = self.client.post(reverse('token_obtain_pair'), {'email': 'u0@example.com', 'password': self.password},
+                               content_type='application/json')
+        self.assertEqual(res.status_code, 200)
+        user = User.objects.get(email='u0@example.com')
+        self.assertIsNone(user.legacy_password)
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$'))
+        self.assertFalse(PasswordRehashJob.objects.exists())
+
+
+class LoginResolutionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='Mixed@Example.com', email='Mixed@Example.com', password='Passw0rd!x')
+
+    def test_normalized_email_is_maintained(self):
+        self.assertEqual(self.user.email_normalized, 'mixed@example.com')
+        self.user.email = 'New@Example.com'
+        self.user.save(update_fields=['email'])
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.email_normalized, 'new@example.com')
+
+    def test_login_resolves_user_in_one_query(self):
+        with CaptureQueriesContext(connection) as ctx:
+            res = self.client.post(reverse('token_obtain_pair'), {'email': 'MIXED@example.com', 'password': 'Passw0rd!x'},
+                                   content_type='application/json')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_wrong_password_skips_other_backends(self):
+        with mock.patch('django.contrib.auth.backends.ModelBackend.authenticate') as fallback, \
+                CaptureQueriesContext(connection) as ctx, self.assertLogs('accounts.login', 'INFO') as logs:
+            res = self.client.post(reverse('token_obtain_pair'), {'email': 'mixed@example.com', 'password': 'wrong'},
+                                   content_type='application/json')
+        self.assertEqual(res.status_code, 401)
+        fallback.assert_not_called()
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual(logs.output, ['INFO:accounts.login:login failed: 1 queries'])
+
+        res = self.client.post(reverse('token_obtain_pair'), {'username': 'Mixed@Example.com', 'password': 'Passw0rd!x'},
+                               content_type='application/json')
+        self.assertEqual(res.status_code, 200)
+
+
+class EmailCaseDuplicateTests(TestCase):
+    def register(self, email):
+        return self.client.post('/api/auth/register/', {'email': email, 'password': 'Str0ng-pass!'},
+                                content_type='application/json')
+
+    def test_email_differing_only_in_case_is_rejected(self):
+        self.assertEqual(self.register('dup@example.com').status_code, 201)
+        res = self.register('DUP@Example.com')
+        self.assertEqual(res.status_code, 400)
+        self.assertIn('email', res.json()['error'])
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_race_past_validation_is_a_validation_error(self):
+        User.objects.create_user(username='race@example.com', email='race@example.com', password='x')
+        with mock.patch('accounts.serializers.RegisterSerializer.validate_email', side_effect=lambda value: value):
+            res = self.register('RACE@example.com')
+        self.assertEqual(res.status_code, 400)
+        self.assertIn('email', res.json()['error'])
+
+    def test_legacy_case_duplicate_keeps_saving(self):
+        # As migration 0002 leaves them: the older account holds the normalized value.
+        User.objects.create_user(username='old', email='legacy@example.com', password='x')
+        User.objects.bulk_create([User(username='new', email='LEGACY@example.com', email_normalized=None)])
+        dup = User.objects.get(username='new')
+        dup.role = 'super'
+        dup.save()
+        dup.refresh_from_db()
+        self.assertEqual((dup.role, dup.email_normalized), ('super', None))
+
+        dup.email = 'distinct@example.com'
+        dup.save()
+        dup.refresh_from_db()
+        self.assertEqual(dup.email_normalized, 'distinct@example.com')
+
+
+class FirstSuperBootstrapTests(TestCase):
+    def register(self, email):
+        return self.client.post('/api/auth/register/', {'email': email, 'password': 'Str0ng-pass!', 'name': 'A B'},
+                                content_type='application/json')
+
+    def test_first_signup_becomes_super_without_counting_users(self):
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(self.register('first@example.com').json()['user']['role'], 'super')
+        self.assertFalse([q for q in ctx.captured_queries if 'COUNT(' in q['sql'].upper()])
+        self.assertEqual(self.register('second@example.com').json()['user']['role'], 'user')
+
+    def test_existing_accounts_close_the_window(self):
+        User.objects.create_user(username='admin', email='admin@example.com', password='x')
+        self.assertEqual(self.register('late@example.com').json()['user']['role'], 'user')
+
+    def test_failed_signup_does_not_consume_the_claim(self):
+        with mock.patch.object(User, 'save', side_effect=IntegrityError('boom')):
+            res = self.register('broken@example.com')
+        self.assertEqual(res.status_code, 400)
+        self.assertFalse(bootstrap.is_set(bootstrap.FIRST_SUPER))
+        self.assertEqual(self.register('ok@example.com').json()['user']['role'], 'super')
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.super = User.objects.create(username='root@example.com', email='root@example.com', role='super')
+        self.user = User.objects.create(username='member@example.com', email='member@example.com', first_name='Mem')
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+
+    def test_repeat_requests_skip_the_user_query(self):
+        first = self.client.get(reverse('profile'), **self.auth)
+        self.assertEqual(first.status_code, 200)
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse('profile'), **self.auth)
+        self.assertEqual(second.json(), first.json())
+
+    def test_role_change_and_deactivation_invalidate(self):
+        self.client.get(reverse('profile'), **self.auth)
+        res = self.client.post(reverse('set_role'), {'userId': self.user.pk, 'role': 'super'}, content_type='application/json',
+                               HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.super).access_token}')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(self.client.get(reverse('profile'), **self.auth).json()['user']['role'], 'super')
+
+        self.user.is_active = False
+        self.user.save(update_fields=['is_active'])
+        self.assertEqual(self.client.get(reverse('profile'), **self.auth).status_code, 401)
+
+    def test_entries_expire_with_the_token(self):
+        token = RefreshToken.for_user(self.user).access_token
+        token.set_exp(lifetime=timedelta(seconds=1))
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+        self.assertEqual(self.client.get(reverse('profile'), **auth).status_code, 200)
+        with mock.patch('accounts.authentication.time.time', return_value=token['exp'] + 1):
+            self.assertIsNone(token_cache.get(hashlib.sha256(str(token).encode()).hexdigest()))
+
+
+    @override_settings(JWT_AUTH_CACHE_TTL=300, JWT_AUTH_LOCAL_CACHE_TTL=5)
+    def test_process_local_cache_keeps_entries_briefly(self):
+        self.assertEqual(snapshot_ttl(), 5)
+        self.client.get(reverse('profile'), **self.auth)
+        key = hashlib.sha256(str(self.auth['HTTP_AUTHORIZATION'].split()[1]).encode()).hexdigest()
+        with mock.patch('accounts.authentication.time.time', return_value=time.time() + 6):
+            self.assertIsNone(token_cache.get(key))
+        shared = {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'shared_cache'}
+        with override_settings(CACHES={'default': shared}):
+            self.assertEqual(snapshot_ttl(), 300)
+
+
+class VerifierPoolTests(TestCase):
+    def test_saturated_pool_rejects_fast(self):
+        pool = VerifierPool(workers=1, queue_size=1)
+        release = threading.Event()
+        try:
+            running = pool.submit(release.wait)
+            queued = pool.submit(lambda: 'queued')
+            with self.assertRaises(VerifierBusy):
+                pool.submit(lambda: 'rejected')
+            release.set()
+            running.result()
+            self.assertEqual(queued.result(), 'queued')
+            # Slots are handed back once jobs finish.
+            self.assertEqual(pool.run(lambda: 'again'), 'again')
+        finally:
+            release.set()
+            pool.shutdown()
+
+    def test_login_returns_503_when_saturated(self):
+        User.objects.create(username='busy@example.com', email='busy@example.com', legacy_password='$2b$04$x')
+        busy = mock.Mock()
+        busy.run.side_effect = VerifierBusy()
+        with mock.patch('accounts.hashing.get_pool', return_value=busy):
+            res = self.client.post(reverse('token_obtain_pair'), {'email': 'busy@example.com', 'password': 'x'},
+                                   content_type='application/json')
+        self.assertEqual(res.status_code, 503)
+        self.assertEqual(res['Retry-After'], '1')
+
+    def test_form_logins_return_503_when_saturated(self):
+        User.objects.create(username='busy@example.com', email='busy@example.com', legacy_password='$2b$04$x')
+        busy = mock.Mock()
+        busy.run.side_effect = VerifierBusy()
+        with mock.patch('accounts.hashing.get_pool', return_value=busy):
+            page = self.client.post(reverse('login'), {'email': 'busy@example.com', 'password': 'x'})
+            admin = self.client.post(reverse('admin:login'), {'username': 'busy@example.com', 'password': 'x'})
+        self.assertEqual(page.status_code, 503)
+        self.assertEqual(page['Retry-After'], '1')
+        self.assertContains(page, 'try again shortly', status_code=503)
+        self.assertEqual(admin.status_code, 503)
+        self.assertEqual(admin['Retry-After'], '1')
+
+
+class ImportUsersTests(TestCase):
+    def make_source(self, path, rows):
+        conn = sqlite3.connect(path)
+        conn.execute('CREATE TABLE users (id INTEGER, name TEXT, email TEXT, password TEXT, createdAt TEXT, role TEXT)')
+        conn.executemany('INSERT INTO users VALUES (?, ?, ?, ?, ?, ?)', rows)
+        conn.commit()
+        conn.close()
+
+    def test_chunked_import_creates_and_updates(self):
+        existing = User.objects.create(username='old@example.com', email='old@example.com', role='super')
+        rows = [(i, f'User {i} Last', f'User{i}@Example.com', f'$2a$10$hash{i}', '2024-01-02T03:04:05Z', 'user') for i in range(7)]
+        rows += [(7, 'Old Timer', 'OLD@example.com', '$2a$10$old', None, None), (8, 'No Email', None, 'x', None, None)]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'users.db')
+            self.make_source(path, rows)
+            out, err = StringIO(), StringIO()
+            with CaptureQueriesContext(connection) as ctx:
+                call_command('import_users_sqljs', source=path, batch_size=3, stdout=out, stderr=err)
+
+        self.assertIn('Created: 7, Updated: 1', out.getvalue())
+        self.assertIn('id 8 (missing email)', err.getvalue())
+        # A lookup and at most two writes per chunk, not a round trip per user.
+        self.assertLessEqual(len(ctx.captured_queries), 3 * 3 + 2)
+
+        user = User.objects.get(email='user3@example.com')
+        self.assertEqual((user.username, user.first_name, user.last_name), ('user3@example.com', 'User', '3 Last'))
+        self.assertEqual(user.legacy_password, '$2a$10$hash3')
+        self.assertEqual(user.date_joined.year, 2024)
+        self.assertFalse(user.has_usable_password())
+
+        existing.refresh_from_db()
+        self.assertEqual((existing.first_name, existing.role, existing.legacy_password), ('Old', 'super', '$2a$10$old'))
+        self.assertFalse(existing.has_usable_password())
+
+    def test_updates_legacy_case_duplicates(self):
+        # Migration 0002 left the duplicate NULL; the account that held the value has since moved on.
+        User.objects.bulk_create([User(username='dup', email='dup@example.com', email_normalized=None)])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'users.db')
+            self.make_source(path, [(1, 'Dup Licate', 'Dup@Example.com', '$2a$10$dup', None, None)])
+            out = StringIO()
+            call_command('import_users_sqljs', source=path, stdout=out, stderr=StringIO())
+
+        self.assertIn('Created: 0, Updated: 1', out.getvalue())
+        user = User.objects.get()
+        self.assertEqual((user.username, user.first_name, user.legacy_password), ('dup', 'Dup', '$2a$10$dup'))
+
+
+class UserSeederTests(TestCase):
+    def test_seeded_users_can_log_in(self):
+        UserSeeder(seed=3, batch_size=16, legacy_ratio=0.5, pool_size=4).run(40, SeedStats())
+        User = get_user_model()
+        self.assertEqual(User.objects.count(), 40)
+        self.assertTrue(bootstrap.is_set(bootstrap.FIRST_SUPER))
+        legacy = User.objects.exclude(legacy_password=None).order_by('id').first()
+        migrated = User.objects.filter(legacy_password=None).order_by('id').first()
+        self.assertTrue(legacy.legacy_password.startswith('$2b$04$'))
+        for user in (legacy, migrated):
+            i = int(user.email[4:11])
+            self.assertEqual(user.email, seed_email(i))
+            self.assertEqual(user.email_normalized, user.email)
+            resp = self.client.post('/api/auth/login/', {'email': user.email, 'password': seed_password(i, 4)}, content_type='application/json')
+            self.assertEqual(resp.status_code, 200, user.email)
+
+    def test_hashes_are_deterministic(self):
+        UserSeeder(seed=3, pool_size=2).run(4, SeedStats())
+        User = get_user_model()
+        first = list(User.objects.order_by('email').values_list('password', 'legacy_password'))
+        User.objects.all().delete()
+        UserSeeder(seed=3, pool_size=2).run(4, SeedStats())
+        self.assertEqual(list(User.objects.order_by('email').values_list('password', 'legacy_password')), first)
@@ -1,6 +1,6 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status, permissions
+from rest_framework import permissions, serializers, status
 from django.contrib.auth import get_user_model
 from .serializers import UserSerializer, RegisterSerializer
 from rest_framework_simplejwt.views import TokenObtainPairView
@@ -20,21 +20,67 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
 
     def validate(self, attrs):
         # Allow using email to obtain a token by mapping it to the username field
+        # (the auth backend resolves emails itself, so no lookup is needed here)
         username_field = self.username_field
         if 'email' in attrs and username_field not in attrs:
-            email = attrs.pop('email')
-            try:
-                u = User.objects.get(email__iexact=email)
-                attrs[username_field] = getattr(u, username_field)
-            except User.DoesNotExist:
-                # leave attrs as-is; serializer will handle invalid credentials
-                pass
+            attrs[username_field] = attrs.pop('email')
         return super().validate(attrs)
 
 
+import json
+import logging
+from functools import wraps
+
+from django.contrib.auth import aauthenticate, authenticate
+from django.db import connection
+from django.http import HttpResponse, JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework.permissions import AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from .hashing import VerifierBusy
+
+BUSY_RETRY_AFTER = '1'
+BUSY_DETAIL = 'Too many login attempts in progress, retry shortly'
+
+logger = logging.getLogger('accounts.login')
+
+
+class QueryCounter:
+    """``connection.execute_wrapper`` hook that counts the queries it sees."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def shed_busy_logins(view):
+    """Answer ``VerifierBusy`` from a form login (e.g. the admin's) with a 503 instead of a server error."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except VerifierBusy:
+            response = HttpResponse(BUSY_DETAIL, status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                    content_type='text/plain; charset=utf-8')
+            response['Retry-After'] = BUSY_RETRY_AFTER
+            return response
+    return wrapper
+
+
+def login_response_data(user):
+    refresh = RefreshToken.for_user(user)
+    return {
+        'access': str(refresh.access_token),
+        'refresh': str(refresh),
+        'user': UserSerializer(user).data
+    }
+
 
 class LoginView(APIView):
     permission_classes = [AllowAny]
@@ -44,29 +90,58 @@ class LoginView(APIView):
         username = request.data.get('username')
         password = request.data.get('password')
 
-        if email and not username:
-            try:
-                u = User.objects.get(email__iexact=email)
-                username = u.username
-            except User.DoesNotExist:
-                return Response({'detail': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
-
+        # The backend resolves an email or a username in one query, so pass either straight through.
+        username = username or email
         if not username or not password:
             return Response({'detail': 'Missing credentials'}, status=status.HTTP_400_BAD_REQUEST)
 
         # Authenticate using Django backends (this will trigger legacy bcrypt backend if needed)
-        from django.contrib.auth import authenticate
-        user = authenticate(request, username=username, password=password)
+        counter, user = QueryCounter(), None
+        try:
+            with connection.execute_wrapper(counter):
+                user = authenticate(request, username=username, password=password)
+        except VerifierBusy:
+            return Response({'detail': BUSY_DETAIL},
+                            status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': BUSY_RETRY_AFTER})
+        finally:
+            logger.info('login %s: %d queries', 'ok' if user else 'failed', counter.count)
         if not user:
             return Response({'detail': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
 
-        refresh = RefreshToken.for_user(user)
-        data = {
-            'access': str(refresh.access_token),
-            'refresh': str(refresh),
-            'user': UserSerializer(user).data
-        }
-        return Response(data)
+        return Response(login_response_data(user))
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncLoginView(View):
+    """``LoginView`` for ASGI deployments: same contract, but never blocks the event loop.
+
+    Hash checks are awaited on the verifier pool through ``aauthenticate``, so
+    one worker process can keep serving other requests while logins are verified.
+    """
+
+    async def post(self, request, *args, **kwargs):
+        try:
+            payload = json.loads(request.body or b'{}')
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict):
+            return JsonResponse({'detail': 'Malformed JSON'}, status=status.HTTP_400_BAD_REQUEST)
+        email = payload.get('email')
+        username = payload.get('username') or email
+        password = payload.get('password')
+        if not username or not password:
+            return JsonResponse({'detail': 'Missing credentials'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            user = await aauthenticate(request, username=username, password=password)
+        except VerifierBusy:
+            response = JsonResponse({'detail': BUSY_DETAIL},
+                                    status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            response['Retry-After'] = BUSY_RETRY_AFTER
+            return response
+        if not user:
+            return JsonResponse({'detail': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
+        return JsonResponse(login_response_data(user))
 
 
 class RegisterView(APIView):
@@ -75,7 +150,10 @@ class RegisterView(APIView):
     def post(self, request):
         serializer = RegisterSerializer(data=request.data)
         if serializer.is_valid():
-            user = serializer.save()
+            try:
+                user = serializer.save()
+            except serializers.ValidationError as e:
+                return Response({'error': e.detail}, status=status.HTTP_400_BAD_REQUEST)
             return Response({'ok': True, 'user': UserSerializer(user).data}, status=status.HTTP_201_CREATED)
         return Response({'error': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -0,0 +1,241 @@
+"""Repeatable load runs over the HTTP surface: shop API, auth API and storefront pages.
+
+Requests go through ``django.test.Client`` on a thread pool, so the whole
+middleware stack and the configured database are exercised without a server
+process. Queries per request are read back from the ``Server-Timing`` header
+written by ``config.query_budget``, which is switched on for the run.
+
+``run_suite`` returns a JSON-serializable dict (``{'meta': ..., 'endpoints':
+{name: summary}}``). ``compare`` checks one of those against a saved baseline
+and lists every endpoint whose p95 latency, throughput or query count moved
+past the given thresholds. ``bench_endpoints`` is the command-line front end.
+
+A run writes: it creates and deletes ``@bench.example.invalid`` users and posts
+to the register endpoint. It therefore refuses to run unless the database is
+marked as a benchmark database (``seed_data`` marks it), or ``allow_writes`` is
+passed. If the first-signup window was still open, it is reopened afterwards,
+so the real first registrant still becomes ``super``.
+"""
+import itertools
+import json
+import platform
+import string
+import statistics
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts import bootstrap
+from shop.models import Product, Service, Tutorial
+
+BENCH_DOMAIN = 'bench.example.invalid'
+BENCH_EMAIL = f'bench-user@{BENCH_DOMAIN}'
+BENCH_PASSWORD = 'bench-password-123'
+
+
+class Endpoint:
+    """One request shape. ``path`` may use the ``load_fixtures()`` keys and ``{n}``; ``body`` only ``{n}``."""
+
+    def __init__(self, name, path, method='GET', auth=False, body=None, ok=(200,)):
+        self.name = name
+        self.path = path
+        self.method = method
+        self.auth = auth
+        self.body = body
+        self.ok = ok
+
+    def request(self, client, fixtures, n, headers):
+        path = self.path.format(n=n, **fixtures)
+        if self.method == 'GET':
+            return client.get(path, **headers)
+        body = json.dumps(self.body).replace('{n}', str(n)) if self.body is not None else ''
+        return client.post(path, body, content_type='application/json', **headers)
+
+
+ENDPOINTS = [
+    Endpoint('api.products', '/api/products/'),
+    Endpoint('api.products.full', '/api/products/?view=full&expand=related'),
+    Endpoint('api.products.filtered', '/api/products/?category={category}&ordering=-price'),
+    Endpoint('api.product', '/api/products/{product}/?expand=related', auth=True),
+    Endpoint('api.product_facets', '/api/products/facets/'),
+    Endpoint('api.tutorials', '/api/tutorials/'),
+    Endpoint('api.tutorial', '/api/tutorials/{tutorial}/', auth=True),
+    Endpoint('api.services', '/api/services/'),
+    Endpoint('api.search', '/api/search/?q={term}'),
+    Endpoint('auth.profile', '/api/auth/profile/', auth=True),
+    Endpoint('auth.login', '/api/auth/login/', method='POST', body={'email': BENCH_EMAIL, 'password': BENCH_PASSWORD}),
+    Endpoint('auth.register', '/api/auth/register/', method='POST', ok=(201,), body={
+        'email': f'bench-{{n}}@{BENCH_DOMAIN}', 'password': BENCH_PASSWORD, 'name': 'Bench',
+    }),
+    Endpoint('page.index', '/'),
+    Endpoint('page.shop', '/shop/'),
+    Endpoint('page.product', '/product/{product}/'),
+    Endpoint('page.tutorials', '/tutorials/'),
+    Endpoint('page.tutorial', '/tutorial/{tutorial}/'),
+]
+
+
+def select_endpoints(patterns):
+    """``ENDPOINTS`` whose name equals or starts with one of ``patterns`` (``api.``, ``page.shop``)."""
+    if not patterns:
+        return list(ENDPOINTS)
+    return [e for e in ENDPOINTS if any(e.name == p or e.name.startswith(p.rstrip('.') + '.') for p in patterns)]
+
+
+def load_fixtures():
+    """Values the endpoint paths refer to. Keys are left out when there is no such row."""
+    fixtures = {}
+    product = Product.objects.order_by('id').values('id', 'name', 'category').first()
+    if product is not None:
+        fixtures.update(product=product['id'], category=product['category'] or '', term=(product['name'] or 'kit').split()[0])
+    tutorial = Tutorial.objects.order_by('id').values_list('id', flat=True).first()
+    if tutorial is not None:
+        fixtures['tutorial'] = tutorial
+    return fixtures
+
+
+def missing_fixtures(endpoint, fixtures):
+    fields = {field for _, field, _, _ in string.Formatter().parse(endpoint.path) if field}
+    return fields - set(fixtures) - {'n'}
+
+
+def query_count(response):
+    timing = response.get('Server-Timing', '')
+    if 'desc="' not in timing:
+        return None
+    return int(timing.split('desc="', 1)[1].split()[0])
+
+
+def percentile_cuts(latencies):
+    return statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+
+
+def summarize(samples, elapsed):
+    """``samples`` are ``(seconds, status, queries, ok)`` tuples."""
+    latencies = sorted(latency * 1000 for latency, _, _, _ in samples)
+    cuts = percentile_cuts(latencies)
+    queries = [q for _, _, q, _ in samples if q is not None]
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for *_, ok in samples if not ok),
+        'rps': round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(cuts[49], 2),
+        'p95_ms': round(cuts[94], 2),
+        'p99_ms': round(cuts[98], 2),
+        'max_ms': round(latencies[-1], 2),
+        'queries_per_request': round(statistics.fmean(queries), 2) if queries else None,
+        'statuses': {str(code): count for code, count in sorted(Counter(s for _, s, _, _ in samples).items())},
+    }
+
+
+def run_endpoint(endpoint, fixtures, requests, concurrency, headers, counter):
+    local = threading.local()
+
+    def attempt(_):
+        client = getattr(local, 'client', None)
+        if client is None:
+            # Server errors (e.g. SQLite 'database is locked' under write load) count as failed requests.
+            client = local.client = Client(SERVER_NAME='localhost', raise_request_exception=False)
+        n = next(counter)
+        t0 = time.perf_counter()
+        response = endpoint.request(client, fixtures, n, headers if endpoint.auth else {})
+        latency = time.perf_counter() - t0
+        return latency, response.status_code, query_count(response), response.status_code in endpoint.ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(attempt, range(requests)))
+    return samples, time.perf_counter() - started
+
+
+def run_suite(endpoints, requests=200, concurrency=8, warmup=5, progress=None, allow_writes=False):
+    """Benchmark ``endpoints`` against the current database; returns the results dict."""
+    if not allow_writes and not bootstrap.is_set(bootstrap.BENCH_DATABASE):
+        raise ValueError(
+            'This database is not marked as a benchmark database and the run creates users. '
+            'Run seed_data on a scratch database first, or pass --allow-writes'
+        )
+    fixtures = load_fixtures()
+    if 'product' not in fixtures:
+        raise ValueError('The catalog is empty; seed or import data before benchmarking')
+    # Detail endpoints for a model with no rows are skipped rather than measured as 404s.
+    skipped = [e.name for e in endpoints if missing_fixtures(e, fixtures)]
+    endpoints = [e for e in endpoints if e.name not in skipped]
+
+    User = get_user_model()
+    first_super_open = not bootstrap.is_set(bootstrap.FIRST_SUPER)
+    cleanup_bench_users()
+    # Created through the ORM so it uses the configured (production) hasher, like real logins.
+    user = User.objects.create_user(username=BENCH_EMAIL, email=BENCH_EMAIL, password=BENCH_PASSWORD)
+    headers = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(user).access_token}'}
+    counter = itertools.count()
+
+    results = {}
+    try:
+        # Query counts come from Server-Timing, which is off outside DEBUG.
+        with override_settings(QUERY_BUDGET_SERVER_TIMING=True):
+            for endpoint in endpoints:
+                if warmup:
+                    run_endpoint(endpoint, fixtures, warmup, 1, headers, counter)
+                samples, elapsed = run_endpoint(endpoint, fixtures, requests, concurrency, headers, counter)
+                results[endpoint.name] = summarize(samples, elapsed)
+                if progress:
+                    progress(endpoint, results[endpoint.name])
+    finally:
+        cleanup_bench_users()
+        if first_super_open:
+            bootstrap.release(bootstrap.FIRST_SUPER)
+
+    return {
+        'meta': {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'requests': requests,
+            'concurrency': concurrency,
+            'warmup': warmup,
+            'skipped': skipped,
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'debug': settings.DEBUG,
+            'catalog': {
+                'products': Product.objects.count(),
+                'tutorials': Tutorial.objects.count(),
+                'services': Service.objects.count(),
+            },
+        },
+        'endpoints': results,
+    }
+
+
+def cleanup_bench_users():
+    get_user_model().objects.filter(email__endswith=f'@{BENCH_DOMAIN}').delete()
+
+
+def compare(current, baseline, max_latency_increase=0.25, max_rps_drop=0.25, max_query_increase=0.0):
+    """List regressions of ``current`` against ``baseline`` (both ``run_suite`` results).
+
+    Latency and throughput thresholds are fractions (0.25 = 25% worse p95 or
+    rps); the query threshold is an absolute increase in queries per request.
+    Endpoints missing from either run are skipped.
+    """
+    regressions = []
+    for name, now in current['endpoints'].items():
+        before = baseline.get('endpoints', {}).get(name)
+        if before is None:
+            continue
+        if before['p95_ms'] and now['p95_ms'] > before['p95_ms'] * (1 + max_latency_increase):
+            regressions.append(f"{name}: p95 {before['p95_ms']:.1f}ms -> {now['p95_ms']:.1f}ms")
+        if before['rps'] and now['rps'] < before['rps'] * (1 - max_rps_drop):
+            regressions.append(f"{name}: throughput {before['rps']:.1f} -> {now['rps']:.1f} req/s")
+        q_before, q_now = before.get('queries_per_request'), now.get('queries_per_request')
+        if q_before is not None and q_now is not None and q_now > q_before + max_query_increase:
+            regressions.append(f'{name}: queries/request {q_before:g} -> {q_now:g}')
+        if now['errors'] > before['errors']:
+            regressions.append(f"{name}: errors {before['errors']} -> {now['errors']}")
+    return regressions
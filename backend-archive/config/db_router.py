@@ -0,0 +1,133 @@
+"""Primary/replica routing: catalog reads go to replicas, everything else stays on the primary.
+
+Replicas are the aliases in ``DATABASE_REPLICA_ALIASES`` (filled from the
+``DATABASE_REPLICAS`` env var in settings). ``PrimaryReplicaRouter`` sends
+reads of models in ``REPLICA_READ_APPS`` (the ``shop`` catalog, which covers
+the API list/detail views and the storefront pages) to a random replica. All
+writes, and reads of every other app (``accounts``, sessions, auth), go to
+``default``.
+
+A request is pinned to the primary, so authors see their own writes, when:
+
+- it is not a GET/HEAD/OPTIONS request;
+- it has already written (``db_for_write`` was called);
+- it carries the ``REPLICA_PIN_COOKIE``. ``ReplicaPinMiddleware`` sets that
+  cookie for ``REPLICA_PIN_SECONDS`` (the replication lag budget) after any
+  request that wrote;
+- the read happens inside a transaction on the primary, e.g. an import that
+  reads existing rows and then writes.
+
+Pins live in a ``ContextVar``, so they are per request (and per task under
+ASGI). Outside a request, such as management commands or the shell, only the
+transaction rule applies. The middleware is async-capable. ``sync_to_async``
+copies the context into its worker thread, and the pin state is one shared
+object, so writes made there still pin the request.
+"""
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class _PinState:
+    __slots__ = ('pinned', 'wrote')
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+_state = ContextVar('replica_pin_state', default=None)
+
+
+def replica_aliases():
+    return list(getattr(settings, 'DATABASE_REPLICA_ALIASES', []))
+
+
+def pin_to_primary():
+    """Send the rest of this request's (or context's) reads to the primary."""
+    state = _state.get()
+    if state is None:
+        _state.set(_PinState(pinned=True))
+    else:
+        state.pinned = True
+
+
+def is_pinned():
+    state = _state.get()
+    return state is not None and state.pinned
+
+
+class PrimaryReplicaRouter:
+    def __init__(self):
+        self.replicas = replica_aliases()
+        self.read_apps = set(getattr(settings, 'REPLICA_READ_APPS', ['shop']))
+        self.pool = {DEFAULT_DB_ALIAS, *self.replicas}
+
+    def db_for_read(self, model, **hints):
+        if not self.replicas or model._meta.app_label not in self.read_apps:
+            return DEFAULT_DB_ALIAS
+        if is_pinned() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(self.replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = state.pinned = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary, so objects may mix freely.
+        if obj1._state.db in self.pool and obj2._state.db in self.pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Replicas get their schema through replication.
+        return db not in self.replicas
+
+
+class ReplicaPinMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.cookie = getattr(settings, 'REPLICA_PIN_COOKIE', 'db_pin')
+        self.seconds = getattr(settings, 'REPLICA_PIN_SECONDS', 5)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        state = self.pin_state(request)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.finish(state, response)
+
+    async def __acall__(self, request):
+        state = self.pin_state(request)
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.finish(state, response)
+
+    def pin_state(self, request):
+        return _PinState(pinned=request.method not in SAFE_METHODS or self.cookie in request.COOKIES)
+
+    def finish(self, state, response):
+        if state.wrote and self.seconds:
+            response.set_cookie(self.cookie, '1', max_age=self.seconds, httponly=True, samesite='Lax')
+        return response
@@ -0,0 +1,177 @@
+"""Per-request SQL accounting: query counts, DB time and query budgets.
+
+``QueryBudgetMiddleware`` installs a ``connection.execute_wrapper`` on every
+database connection for the length of a request. It counts queries and the
+time spent in them, and then:
+
+- adds ``Server-Timing: db;dur=<ms>;desc="<n> queries", app;dur=<ms>`` so the
+  numbers show up in the browser's network panel. This is only sent when
+  ``QUERY_BUDGET_SERVER_TIMING`` is on, which defaults to ``DEBUG``;
+- folds them into per-URL aggregates keyed by route pattern (``query_stats()``,
+  served to admins at ``GET /api/query-stats/``);
+- checks the view's query budget. A budget comes from ``@query_budget(n)`` on
+  a view function or class, or from ``QUERY_BUDGETS``, keyed by route
+  (``'/api/products/'``) or URL name.
+  Going over logs a warning on the ``config.query_budget`` logger, or raises
+  ``QueryBudgetExceeded`` when ``QUERY_BUDGET_STRICT`` is on (as it is under
+  ``manage.py test``), so a regression fails the test that hit it.
+
+The middleware is async-capable. Under ASGI, the wrappers are installed on the
+connections of the request's thread-sensitive worker, which is where its sync
+views and async ORM calls run.
+"""
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger('config.query_budget')
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_budget(limit):
+    """Declare that a view (function or class) runs at most ``limit`` queries per request."""
+
+    def decorator(view):
+        view.query_budget = limit
+        return view
+
+    return decorator
+
+
+class QueryRecorder:
+    """``execute_wrapper`` hook that counts queries and sums their duration."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+def record(name, queries, db_seconds, total_seconds, over_budget):
+    with _stats_lock:
+        entry = _stats.setdefault(name, {
+            'requests': 0, 'queries': 0, 'max_queries': 0, 'db_ms': 0.0, 'total_ms': 0.0, 'over_budget': 0,
+        })
+        entry['requests'] += 1
+        entry['queries'] += queries
+        entry['max_queries'] = max(entry['max_queries'], queries)
+        entry['db_ms'] += db_seconds * 1000
+        entry['total_ms'] += total_seconds * 1000
+        entry['over_budget'] += int(over_budget)
+
+
+def query_stats():
+    """Per-route totals plus per-request averages, busiest routes first."""
+    with _stats_lock:
+        entries = {name: dict(entry) for name, entry in _stats.items()}
+    for entry in entries.values():
+        n = entry['requests']
+        entry['avg_queries'] = round(entry['queries'] / n, 2)
+        entry['avg_db_ms'] = round(entry['db_ms'] / n, 2)
+        entry['avg_total_ms'] = round(entry['total_ms'] / n, 2)
+        entry['db_ms'] = round(entry['db_ms'], 2)
+        entry['total_ms'] = round(entry['total_ms'], 2)
+    return dict(sorted(entries.items(), key=lambda item: -item[1]['queries']))
+
+
+def reset_query_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def view_budget(match, route):
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    for key in (route, match.view_name):
+        if key in budgets:
+            return budgets[key]
+    budget = getattr(match.func, 'query_budget', None)
+    if budget is None:
+        # as_view() functions carry their class.
+        budget = getattr(getattr(match.func, 'view_class', None), 'query_budget', None)
+    return budget
+
+
+class QueryBudgetMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            install_recorder(stack, recorder)
+            response = self.get_response(request)
+        return self.finish(request, response, recorder, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        # Connections are per thread. Under ASGI, a request's sync code (and the async ORM)
+        # runs in its own thread-sensitive worker, so the wrappers are installed there.
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        stack = ExitStack()
+        await sync_to_async(install_recorder)(stack, recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.finish(request, response, recorder, time.perf_counter() - started)
+
+    def finish(self, request, response, recorder, total):
+        match = request.resolver_match
+        # Routes, not URL names: the frontend and the API both have e.g. 'product_detail'.
+        name = f'/{match.route}' if match else 'unresolved'
+        budget = view_budget(match, name) if match else None
+        over = budget is not None and recorder.count > budget
+        record(name, recorder.count, recorder.seconds, total, over)
+
+        if getattr(settings, 'QUERY_BUDGET_SERVER_TIMING', settings.DEBUG):
+            response['Server-Timing'] = (
+                f'db;dur={recorder.seconds * 1000:.1f};desc="{recorder.count} queries", app;dur={total * 1000:.1f}'
+            )
+        if over:
+            message = f'{request.method} {request.path} ({name}) ran {recorder.count} queries; budget is {budget}'
+            if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+
+def install_recorder(stack, recorder):
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(recorder))
+
+
+class QueryStatsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(query_stats())
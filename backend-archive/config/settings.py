@@ -3,6 +3,8 @@ from datetime import timedelta
 from pathlib import Path
 from dotenv import load_dotenv
 
+import django
+
 load_dotenv()
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -33,9 +35,14 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # Early, so static hits skip sessions, CSRF and auth.
+    'config.static_serving.StaticFilesMiddleware',
+    # Counts queries/DB time per request (Server-Timing, /api/query-stats/) and enforces QUERY_BUDGETS.
+    'config.query_budget.QueryBudgetMiddleware',
+    # Pins a request (and, via a short-lived cookie, its session) to the primary once it writes.
+    'config.db_router.ReplicaPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'config.dev_static.DevStaticMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
@@ -81,6 +88,18 @@ DATABASES = {
     }
 }
 
+# Opt-in SQLite profile for small production deployments: WAL, relaxed fsync, busy
+# timeout and larger caches on every connection (config.sqlite_backend), reused
+# across requests. BEGIN IMMEDIATE makes writers queue on busy_timeout instead of
+# failing when a read transaction tries to upgrade to a write.
+if os.getenv('SQLITE_TUNING', 'False') == 'True':
+    DATABASES['default'].update({
+        'ENGINE': 'config.sqlite_backend',
+        'CONN_MAX_AGE': int(os.getenv('SQLITE_CONN_MAX_AGE', '600')),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'} if django.VERSION >= (5, 1) else {},
+    })
+
 # If DATABASE_URL is provided, use it (useful for Postgres in production/docker)
 DATABASE_URL = os.getenv('DATABASE_URL')
 if DATABASE_URL:
@@ -90,6 +109,45 @@ if DATABASE_URL:
     except Exception:
         pass
 
+# Read replicas for catalog reads (config.db_router): comma-separated database
+# URLs, or plain SQLite file paths that reuse the primary's settings. They become
+# aliases replica1, replica2, ... and mirror the primary under `manage.py test`.
+DATABASE_REPLICA_ALIASES = []
+for _i, _replica in enumerate(filter(None, map(str.strip, os.getenv('DATABASE_REPLICAS', '').split(','))), 1):
+    if '://' in _replica:
+        import dj_database_url
+        _config = dj_database_url.parse(_replica, conn_max_age=DATABASES['default'].get('CONN_MAX_AGE', 0))
+    else:
+        _config = {**DATABASES['default'], 'NAME': _replica}
+    DATABASES[f'replica{_i}'] = {**_config, 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICA_ALIASES.append(f'replica{_i}')
+DATABASE_ROUTERS = ['config.db_router.PrimaryReplicaRouter']
+# shop reads go to a replica unless the request wrote, is a write, or carries the
+# pin cookie set for REPLICA_PIN_SECONDS (the replication lag budget) after a write.
+REPLICA_READ_APPS = ['shop']
+REPLICA_PIN_COOKIE = 'db_pin'
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', '5'))
+
+# Cache: process-local memory by default; point CACHE_BACKEND/CACHE_LOCATION at
+# memcached or redis to share entries (and hit/miss counters) between workers.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'pkat-default'),
+    }
+}
+CATALOG_CACHE_ALIAS = 'default'
+CATALOG_CACHE_TIMEOUT = int(os.getenv('CATALOG_CACHE_TIMEOUT', '300'))
+# frontend.caching: whole pages for anonymous visitors, {% cache %} fragments otherwise.
+FRONTEND_CACHE_TIMEOUT = int(os.getenv('FRONTEND_CACHE_TIMEOUT', '300'))
+
+# config.query_budget: per-view query ceilings, keyed by URL name (overrides @query_budget on the view).
+# Strict mode raises instead of logging, so `manage.py test` fails on a regression.
+QUERY_BUDGETS = {}
+QUERY_BUDGET_STRICT = os.getenv('QUERY_BUDGET_STRICT', str(TESTING)) == 'True'
+# Server-Timing exposes per-request DB timings, so it is only sent in DEBUG unless enabled explicitly.
+QUERY_BUDGET_SERVER_TIMING = os.getenv('QUERY_BUDGET_SERVER_TIMING', str(DEBUG)) == 'True'
+
 AUTH_USER_MODEL = 'accounts.User'
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -113,12 +171,43 @@ AUTHENTICATION_BACKENDS = [
     'django.contrib.auth.backends.ModelBackend',
 ]
 
+# Django's defaults plus plain bcrypt, so migrated legacy hashes ('bcrypt$<legacy hash>', see
+# accounts.rehash) verify directly. PASSWORD_UPGRADE_ON_LOGIN re-hashes them (and any outdated
+# Django hash) with the first hasher during login; off by default to keep login to one hash check.
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'django.contrib.auth.hashers.BCryptPasswordHasher',
+]
+PASSWORD_UPGRADE_ON_LOGIN = os.getenv('PASSWORD_UPGRADE_ON_LOGIN', 'False') == 'True'
+
+# Password hashes are checked on a bounded thread pool (accounts.hashing); logins beyond
+# workers + queue size get a 503 instead of queueing behind slow hashes.
+PASSWORD_VERIFY_WORKERS = int(os.getenv('PASSWORD_VERIFY_WORKERS', '0')) or None
+PASSWORD_VERIFY_QUEUE_SIZE = int(os.getenv('PASSWORD_VERIFY_QUEUE_SIZE', '32'))
+
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
 USE_I18N = True
 USE_TZ = True
 
 STATIC_URL = '/static/'
+# config.static_serving: manifest-based /static/ serving with ETag, Range and precompressed variants.
+STATIC_SERVE = os.getenv('STATIC_SERVE', 'True') == 'True'
+STATIC_MAX_AGE = int(os.getenv('STATIC_MAX_AGE', '60'))
+STATIC_AUTOREFRESH = DEBUG
+# collectstatic fingerprints files (staticfiles.json manifest) and writes .gz/.br siblings (config.static_storage).
+STATIC_ROOT = os.getenv('STATIC_ROOT', os.path.join(BASE_DIR, 'staticfiles'))
+# Parsed products.js modules (shop.jsdata); must be private to the user running the import.
+JSDATA_CACHE_DIR = os.getenv('JSDATA_CACHE_DIR', os.path.join(BASE_DIR, '.cache', 'jsdata'))
+STATIC_PRECOMPRESS = os.getenv('STATIC_PRECOMPRESS', 'True') == 'True'
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'config.static_storage.FrontendStaticStorage'},
+}
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # CORS
@@ -128,14 +217,28 @@ CORS_ALLOW_CREDENTIALS = True
 # DRF + SimpleJWT
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.AllowAny',
     ),
+    # Keyset pagination keeps list endpoints constant-time per page
+    'DEFAULT_PAGINATION_CLASS': 'shop.pagination.KeysetPagination',
+    'PAGE_SIZE': int(os.getenv('API_PAGE_SIZE', '24')),
 }
 
+# Total counts cost a full COUNT(*); clients can still ask for one with ?count=true
+CATALOG_PAGINATION_INCLUDE_COUNT = os.getenv('CATALOG_PAGINATION_INCLUDE_COUNT', 'False') == 'True'
+
 from datetime import timedelta
+# Verified access tokens and a user snapshot are kept in a per-process LRU (accounts.authentication);
+# entries expire after JWT_AUTH_CACHE_TTL seconds or at the token's exp, whichever is first.
+JWT_AUTH_CACHE_SIZE = int(os.getenv('JWT_AUTH_CACHE_SIZE', '10000'))
+JWT_AUTH_CACHE_TTL = int(os.getenv('JWT_AUTH_CACHE_TTL', '300'))
+# Cap used while JWT_AUTH_CACHE_ALIAS is process-local: revocations cannot reach other workers.
+JWT_AUTH_LOCAL_CACHE_TTL = int(os.getenv('JWT_AUTH_LOCAL_CACHE_TTL', '5'))
+JWT_AUTH_CACHE_ALIAS = 'default'
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=int(os.getenv('SIMPLE_JWT_ACCESS_TOKEN_LIFETIME_MINUTES', '60'))),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=int(os.getenv('SIMPLE_JWT_REFRESH_TOKEN_LIFETIME_DAYS', '7'))),
@@ -0,0 +1,266 @@
+"""Serve ``/static/`` straight from the WSGI/ASGI app, cheaply.
+
+``StaticFilesMiddleware`` builds a path -> file manifest once, at startup:
+from ``STATIC_ROOT`` when ``collectstatic`` has populated it, otherwise from
+the staticfiles finders (``STATICFILES_DIRS`` and app ``static/`` dirs). A
+request is then a dict lookup and a streamed ``FileResponse``. Nothing walks
+the finders or reads whole files into memory.
+
+Responses carry a strong ``ETag`` (mtime and size), ``Last-Modified`` and
+``Accept-Ranges``. ``If-None-Match`` gets a 304, and a single-range ``Range``
+request gets a 206. Fingerprinted names (``site.0123456789ab.js``, as written
+by ``ManifestStaticFilesStorage``) are cached for a year as ``immutable``.
+Other files get a short ``max-age`` and revalidate through the ETag. If a
+``.br`` or ``.gz`` sibling exists and the client accepts that encoding, it is
+sent instead.
+
+Settings: ``STATIC_SERVE`` (on/off), ``STATIC_MAX_AGE`` (seconds for unhashed
+files), ``STATIC_AUTOREFRESH`` (re-stat on hit and fall back to the finders on
+a miss; defaults to ``DEBUG`` so edits show up during development).
+
+The middleware is sync- and async-capable, so under ASGI it does not push
+every request onto a thread. A manifest hit is served inline. With
+autorefresh on, the stat and finder calls run in a worker thread.
+"""
+import mimetypes
+import os
+import re
+from email.utils import formatdate
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import parse_etags
+
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.[^/.]+$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+COMPRESSED_SUFFIXES = tuple(suffix for _, suffix in ENCODINGS)
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+class StaticAsset:
+    __slots__ = ('path', 'size', 'mtime', 'etag', 'last_modified', 'content_type', 'cache_control', 'variants')
+
+    def __init__(self, path, url_path, max_age):
+        self.path = path
+        self.content_type = mimetypes.guess_type(url_path)[0] or 'application/octet-stream'
+        if self.content_type.startswith('text/') or self.content_type in ('application/javascript', 'application/json'):
+            self.content_type += '; charset=utf-8'
+        self.cache_control = IMMUTABLE if HASHED_NAME_RE.search(url_path) else f'public, max-age={max_age}'
+        self.refresh()
+
+    def refresh(self):
+        stat = os.stat(self.path)
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime_ns
+        self.etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        self.last_modified = formatdate(stat.st_mtime, usegmt=True)
+        self.variants = [
+            (encoding, self.path + suffix, os.path.getsize(self.path + suffix))
+            for encoding, suffix in ENCODINGS
+            if os.path.isfile(self.path + suffix)
+        ]
+
+    def is_stale(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return True
+        return stat.st_mtime_ns != self.mtime or stat.st_size != self.size
+
+
+def accepted_encodings(header):
+    """Codings listed in an ``Accept-Encoding`` header, minus any with ``q=0``."""
+    accepted = set()
+    for item in header.split(','):
+        name, _, params = item.strip().partition(';')
+        q = params.strip()
+        if q.startswith('q=') and q[2:].strip() in ('0', '0.0', '0.00', '0.000'):
+            continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def iter_static_files():
+    """Yield ``(relative url path, absolute file path)`` for every static file."""
+    root = getattr(settings, 'STATIC_ROOT', None)
+    if root and os.path.isdir(root) and any(os.scandir(root)):
+        for dirpath, _, filenames in os.walk(root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                yield os.path.relpath(path, root).replace(os.sep, '/'), path
+        return
+    seen = set()
+    for finder in finders.get_finders():
+        for rel_path, storage in finder.list([]):
+            rel_path = rel_path.replace(os.sep, '/')
+            # First finder wins, like finders.find().
+            if rel_path not in seen:
+                seen.add(rel_path)
+                yield rel_path, storage.path(rel_path)
+
+
+def build_manifest(max_age):
+    manifest = {}
+    for rel_path, path in iter_static_files():
+        if rel_path.endswith(COMPRESSED_SUFFIXES) and os.path.isfile(path[:-len(os.path.splitext(path)[1])]):
+            # Served through their original's Accept-Encoding negotiation.
+            continue
+        manifest[rel_path] = StaticAsset(path, rel_path, max_age)
+    return manifest
+
+
+class StaticFilesMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        self.enabled = getattr(settings, 'STATIC_SERVE', True) and bool(settings.STATIC_URL)
+        self.prefix = '/' + (settings.STATIC_URL or '').lstrip('/')
+        self.max_age = getattr(settings, 'STATIC_MAX_AGE', 60)
+        self.autorefresh = getattr(settings, 'STATIC_AUTOREFRESH', settings.DEBUG)
+        self.manifest = build_manifest(self.max_age) if self.enabled else {}
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if self.enabled and request.path.startswith(self.prefix):
+            response = self.serve(request, request.path[len(self.prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if self.enabled and request.path.startswith(self.prefix):
+            rel_path = request.path[len(self.prefix):]
+            if self.autorefresh:
+                response = await sync_to_async(self.serve, thread_sensitive=False)(request, rel_path)
+            else:
+                response = self.serve(request, rel_path)
+            if response is not None:
+                return response
+        return await self.get_response(request)
+
+    def lookup(self, rel_path):
+        asset = self.manifest.get(rel_path)
+        if not self.autorefresh:
+            return asset
+        if asset is not None:
+            if not asset.is_stale():
+                return asset
+            self.manifest.pop(rel_path, None)
+        path = finders.find(rel_path)
+        if not path or os.path.isdir(path):
+            return None
+        asset = self.manifest[rel_path] = StaticAsset(path, rel_path, self.max_age)
+        return asset
+
+    def serve(self, request, rel_path):
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        try:
+            asset = self.lookup(rel_path)
+        except OSError:
+            asset = None
+        if asset is None:
+            return None
+
+        range_header = request.META.get('HTTP_RANGE')
+        if range_header and not self.if_range_matches(request, asset):
+            range_header = None
+
+        # Ranges are only served from the identity file; otherwise prefer a precompressed sibling.
+        path, size, encoding = asset.path, asset.size, None
+        if not range_header:
+            accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+            for name, variant_path, variant_size in asset.variants:
+                if name in accepted:
+                    path, size, encoding = variant_path, variant_size, name
+                    break
+        # Each encoding is its own representation, so it gets its own strong ETag.
+        etag = f'{asset.etag[:-1]}-{encoding}"' if encoding else asset.etag
+
+        headers = {
+            'ETag': etag,
+            'Last-Modified': asset.last_modified,
+            'Cache-Control': asset.cache_control,
+            'Accept-Ranges': 'bytes',
+        }
+        if asset.variants:
+            headers['Vary'] = 'Accept-Encoding'
+
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match and (etag in parse_etags(if_none_match) or if_none_match.strip() == '*'):
+            response = HttpResponseNotModified()
+            for name, value in headers.items():
+                response[name] = value
+            return response
+
+        if range_header:
+            return self.serve_range(request, asset, range_header, headers)
+
+        if request.method == 'HEAD':
+            response = HttpResponse(content_type=asset.content_type)
+        else:
+            response = FileResponse(open(path, 'rb'), content_type=asset.content_type)
+        response['Content-Length'] = str(size)
+        if encoding:
+            response['Content-Encoding'] = encoding
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    @staticmethod
+    def if_range_matches(request, asset):
+        if_range = request.META.get('HTTP_IF_RANGE')
+        return not if_range or if_range in (asset.etag, asset.last_modified)
+
+    def serve_range(self, request, asset, range_header, headers):
+        match = RANGE_RE.match(range_header.strip())
+        if not match or match.groups() == ('', ''):
+            # Multi-range or malformed: ignore it and send the whole file, as RFC 9110 allows.
+            request.META.pop('HTTP_RANGE', None)
+            return self.serve(request, request.path[len(self.prefix):])
+        first, last = match.groups()
+        if first == '':
+            length = min(int(last), asset.size)
+            start, end = asset.size - length, asset.size - 1
+        else:
+            start = int(first)
+            end = min(int(last), asset.size - 1) if last else asset.size - 1
+        if start >= asset.size or start > end:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{asset.size}'
+            return response
+
+        length = end - start + 1
+        if request.method == 'HEAD':
+            response = HttpResponse(status=206, content_type=asset.content_type)
+        else:
+            response = StreamingHttpResponse(
+                self.read_range(asset.path, start, length), status=206, content_type=asset.content_type,
+            )
+        response['Content-Length'] = str(length)
+        response['Content-Range'] = f'bytes {start}-{end}/{asset.size}'
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    @staticmethod
+    def read_range(path, start, length):
+        with open(path, 'rb') as fh:
+            fh.seek(start)
+            while length > 0:
+                chunk = fh.read(min(CHUNK_SIZE, length))
+                if not chunk:
+                    break
+                length -= len(chunk)
+                yield chunk
@@ -0,0 +1,96 @@
+"""Fingerprinted, precompressed static files for ``collectstatic``.
+
+``FrontendStaticStorage`` is Django's ``ManifestStaticFilesStorage``: every
+collected file also gets a content-hashed copy (``site.0123456789ab.js``) and
+``staticfiles.json`` maps original names to hashed ones, so ``{% static %}``
+emits URLs that can be cached as ``immutable`` by ``config.static_serving``.
+After hashing, text assets are written out again as ``.gz`` (and ``.br`` when
+the optional ``brotli`` package is installed) for the middleware to negotiate.
+
+Without a manifest (tests, a fresh checkout before ``collectstatic``),
+``{% static %}`` falls back to the plain name instead of raising.
+"""
+import gzip
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # optional: gzip alone is still a large win
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {
+    '.css', '.js', '.mjs', '.map', '.json', '.svg', '.html', '.txt', '.xml', '.ico', '.webmanifest',
+}
+# Tiny files are not worth a second round trip through the encoder or an extra inode.
+MIN_COMPRESS_SIZE = 256
+# Keep a variant only if it saves at least this fraction of the original.
+MIN_SAVING = 0.05
+
+
+def is_compressible(path):
+    return os.path.splitext(path)[1].lower() in COMPRESSIBLE_EXTENSIONS
+
+
+def compress_file(path, force=False):
+    """Write ``.gz``/``.br`` siblings for ``path``; return the encodings written.
+
+    A sibling that is already newer than its source is left alone unless
+    ``force`` is set. One that would not save ``MIN_SAVING`` is removed, so the
+    middleware never prefers a variant that is larger than the original.
+    """
+    with open(path, 'rb') as fh:
+        data = fh.read()
+    if len(data) < MIN_COMPRESS_SIZE:
+        return []
+    mtime = os.stat(path).st_mtime_ns
+    encoders = [('gzip', '.gz', lambda raw: gzip.compress(raw, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        encoders.append(('br', '.br', lambda raw: brotli.compress(raw, quality=11)))
+    written = []
+    for encoding, suffix, encode in encoders:
+        target = path + suffix
+        if not force and os.path.exists(target) and os.stat(target).st_mtime_ns >= mtime:
+            written.append(encoding)
+            continue
+        compressed = encode(data)
+        if len(compressed) > len(data) * (1 - MIN_SAVING):
+            if os.path.exists(target):
+                os.remove(target)
+            continue
+        with open(target, 'wb') as fh:
+            fh.write(compressed)
+        written.append(encoding)
+    return written
+
+
+def compress_tree(root, force=False):
+    """Compress every eligible file under ``root``; return ``(files, variants)`` counts."""
+    files = variants = 0
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            if not is_compressible(name):
+                continue
+            written = compress_file(os.path.join(dirpath, name), force=force)
+            files += 1
+            variants += len(written)
+    return files, variants
+
+
+class FrontendStaticStorage(ManifestStaticFilesStorage):
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Not collected yet: serve the unhashed file (the finders still have it).
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run or not getattr(settings, 'STATIC_PRECOMPRESS', True):
+            return
+        compress_tree(self.location)
@@ -6,6 +6,9 @@ from django.contrib.auth import views as auth_views
 import importlib.util
 import os
 
+from accounts.views import shed_busy_logins
+from config.query_budget import QueryStatsView
+
 # Ensure backend directory is on sys.path so we can load view modules by file path
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -15,10 +18,14 @@ frontend_spec = importlib.util.spec_from_file_location('frontend_views', fronten
 frontend_views = importlib.util.module_from_spec(frontend_spec)
 frontend_spec.loader.exec_module(frontend_views)
 
+# The admin login authenticates through LegacyBcryptBackend too, so it sheds load the same way.
+admin.site.login = shed_busy_logins(admin.site.login)
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/', include('accounts.urls')),
     path('api/', include('shop.urls')),
+    path('api/query-stats/', QueryStatsView.as_view(), name='query_stats'),
     path('logout/', auth_views.LogoutView.as_view(next_page='/'), name='logout'),
 
     # Frontend routes
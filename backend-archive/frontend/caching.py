@@ -0,0 +1,75 @@
+"""Rendering cache for the server-rendered storefront.
+
+Anonymous visitors all see the same HTML, so ``catalog_page`` stores whole
+responses and serves repeats straight from the cache: no ORM query, no
+template. Signed-in users get a per-user header, so their pages are rendered.
+The expensive parts (product grids, tutorial lists) are wrapped in
+``{% cache %}`` fragments, and the views pass lazy querysets, so a fragment hit
+never reaches the database either.
+
+Both kinds of key embed the catalog version counters from ``shop.cache``. The
+``shop.signals`` handlers bump those on every ``Product``/``Tutorial`` write, so
+an edit shows up on the next request. Old entries are never read again and
+age out after ``FRONTEND_CACHE_TIMEOUT`` seconds.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.http import HttpResponse
+
+from shop.cache import get_cache, get_version
+
+
+def cache_timeout():
+    return getattr(settings, 'FRONTEND_CACHE_TIMEOUT', 300)
+
+
+def catalog_stamp(*models):
+    return '.'.join(str(get_version(model)) for model in models)
+
+
+def fragment_context(*models):
+    """Template context for ``{% cache fragment_timeout '<name>' catalog_stamp %}``."""
+    return {'catalog_stamp': catalog_stamp(*models), 'fragment_timeout': cache_timeout()}
+
+
+def is_anonymous(request):
+    # No session cookie means no login, and nothing has to be read to know it.
+    if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+        return True
+    return not request.user.is_authenticated
+
+
+def page_cache_key(models, request):
+    digest = hashlib.md5(request.get_full_path().encode('utf-8'), usedforsecurity=False).hexdigest()
+    return f'frontend:page:{models[0]._meta.label_lower}:{catalog_stamp(*models)}:{digest}'
+
+
+def catalog_page(*models):
+    """Cache a view's full response for anonymous GET/HEAD requests, keyed on ``models``' versions."""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or not is_anonymous(request):
+                return view(request, *args, **kwargs)
+
+            cache = get_cache()
+            key = page_cache_key(models, request)
+            cached = cache.get(key)
+            if cached is not None:
+                content_type, body = cached
+                response = HttpResponse(body, content_type=content_type)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming and not response.cookies:
+                cache.set(key, (response['Content-Type'], response.content), cache_timeout())
+                response['X-Cache'] = 'MISS'
+            return response
+
+        return wrapped
+
+    return decorator
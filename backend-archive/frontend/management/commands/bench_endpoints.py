@@ -0,0 +1,72 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from config.benchmark import ENDPOINTS, compare, run_suite, select_endpoints
+
+
+class Command(BaseCommand):
+    help = 'Load-test the shop API, auth API and storefront pages; report latency, throughput and queries per request'
+
+    def add_arguments(self, parser):
+        parser.add_argument('endpoints', nargs='*', help='Endpoint names or prefixes (api, auth, page, api.products, ...); default: all')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per endpoint')
+        parser.add_argument('--concurrency', type=int, default=8, help='Requests in flight at once')
+        parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per endpoint first (fills caches)')
+        parser.add_argument('--save', metavar='PATH', help='Write the results as JSON')
+        parser.add_argument('--baseline', metavar='PATH', help='Compare against results saved earlier with --save')
+        parser.add_argument('--max-latency-increase', type=float, default=0.25, help='Allowed p95 growth vs the baseline (fraction)')
+        parser.add_argument('--max-rps-drop', type=float, default=0.25, help='Allowed throughput loss vs the baseline (fraction)')
+        parser.add_argument('--max-query-increase', type=float, default=0.0, help='Allowed growth in queries/request vs the baseline')
+        parser.add_argument(
+            '--allow-writes', action='store_true',
+            help='Run even though the database is not marked as a benchmark database (seed_data marks it)',
+        )
+        parser.add_argument('--list', action='store_true', help='List the endpoints and exit')
+
+    def handle(self, *args, **options):
+        if options['list']:
+            for endpoint in ENDPOINTS:
+                auth = ' (auth)' if endpoint.auth else ''
+                self.stdout.write(f'{endpoint.name:24} {endpoint.method:4} {endpoint.path}{auth}')
+            return
+
+        endpoints = select_endpoints(options['endpoints'])
+        if not endpoints:
+            raise CommandError('No endpoint matches ' + ', '.join(options['endpoints']))
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as fh:
+                baseline = json.load(fh)
+
+        self.stdout.write(
+            f"{'endpoint':24} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'q/req':>6} {'errors':>6}"
+        )
+        try:
+            results = run_suite(
+                endpoints, requests=options['requests'], concurrency=options['concurrency'],
+                warmup=options['warmup'], progress=self.report, allow_writes=options['allow_writes'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['save']:
+            with open(options['save'], 'w', encoding='utf-8') as fh:
+                json.dump(results, fh, indent=2)
+            self.stdout.write(f"Saved results to {options['save']}")
+
+        if baseline is not None:
+            regressions = compare(
+                results, baseline, max_latency_increase=options['max_latency_increase'],
+                max_rps_drop=options['max_rps_drop'], max_query_increase=options['max_query_increase'],
+            )
+            if regressions:
+                raise CommandError('Regressions against the baseline:\n  ' + '\n  '.join(regressions))
+            self.stdout.write(self.style.SUCCESS('No regressions against the baseline'))
+
+    def report(self, endpoint, summary):
+        queries = summary['queries_per_request']
+        self.stdout.write(
+            f"{endpoint.name:24} {summary['rps']:8.1f} {summary['p50_ms']:8.1f} {summary['p95_ms']:8.1f} "
+            f"{summary['p99_ms']:8.1f} {'-' if queries is None else f'{queries:g}':>6} {summary['errors']:>6}"
+        )
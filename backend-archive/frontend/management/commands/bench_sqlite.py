@@ -0,0 +1,145 @@
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from config.sqlite_backend.base import pragma_statements
+
+SCHEMA = [
+    'CREATE TABLE item (id INTEGER PRIMARY KEY, name TEXT NOT NULL, category TEXT NOT NULL, price INTEGER NOT NULL, body TEXT)',
+    'CREATE INDEX item_category_price ON item (category, price, id)',
+]
+READ_SQL = 'SELECT id, name, price FROM item WHERE category = ? ORDER BY price, id LIMIT 20'
+CATEGORIES = [f'category-{n}' for n in range(12)]
+
+
+class Profile:
+    """How a Django process talks to SQLite: ``stock`` settings, or the ``tuned`` backend with CONN_MAX_AGE."""
+
+    def __init__(self, name, pragmas, persistent, immediate):
+        self.name = name
+        self.pragmas = pragmas
+        self.persistent = persistent
+        self.immediate = immediate
+
+    def connect(self, path):
+        # isolation_level=None: transactions are explicit, as Django manages them.
+        conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA foreign_keys = ON')
+        for statement in self.pragmas:
+            conn.execute(statement)
+        return conn
+
+
+PROFILES = [
+    # Stock settings: rollback journal, synchronous=FULL, a new connection per request.
+    Profile('stock', [], persistent=False, immediate=False),
+    Profile('tuned', pragma_statements(), persistent=True, immediate=True),
+]
+
+
+class Command(BaseCommand):
+    help = 'Compare concurrent SQLite read/write throughput with stock settings and the tuned config.sqlite_backend profile'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=20000, help='Rows in the benchmark table')
+        parser.add_argument('--readers', type=int, default=6, help='Reader threads (one list query per request)')
+        parser.add_argument('--writers', type=int, default=2, help='Writer threads (one INSERT + UPDATE transaction per request)')
+        parser.add_argument('--seconds', type=float, default=5.0, help='Duration of each profile run')
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{options['readers']} readers, {options['writers']} writers, {options['seconds']:g}s per profile, {options['rows']} rows"
+        )
+        self.stdout.write(f"{'profile':8} {'reads/s':>9} {'writes/s':>9} {'read p95':>9} {'write p95':>10} {'errors':>7}")
+        results = {}
+        for profile in PROFILES:
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, 'bench.sqlite3')
+                self.prepare(path, options['rows'])
+                results[profile.name] = result = self.run_profile(profile, path, options)
+            self.stdout.write(
+                f"{profile.name:8} {result['reads']:9.0f} {result['writes']:9.0f} "
+                f"{result['read_p95']:8.1f}ms {result['write_p95']:8.1f}ms {result['errors']:7}"
+            )
+        stock, tuned = results['stock'], results['tuned']
+        self.stdout.write(self.style.SUCCESS(
+            f"tuned vs stock: reads x{tuned['reads'] / max(stock['reads'], 1):.1f}, "
+            f"writes x{tuned['writes'] / max(stock['writes'], 1):.1f}"
+        ))
+
+    def prepare(self, path, rows):
+        conn = sqlite3.connect(path, isolation_level=None)
+        for statement in SCHEMA:
+            conn.execute(statement)
+        conn.execute('BEGIN')
+        conn.executemany(
+            'INSERT INTO item (name, category, price, body) VALUES (?, ?, ?, ?)',
+            ((f'item {n}', CATEGORIES[n % len(CATEGORIES)], (n * 7919) % 100000, 'x' * 200) for n in range(rows)),
+        )
+        conn.execute('COMMIT')
+        conn.close()
+
+    def run_profile(self, profile, path, options):
+        deadline = time.perf_counter() + options['seconds']
+        lock = threading.Lock()
+        samples = {'read': [], 'write': []}
+        errors = [0]
+
+        def worker(kind, n):
+            conn = profile.connect(path) if profile.persistent else None
+            latencies, failed, i = [], 0, 0
+            while time.perf_counter() < deadline:
+                i += 1
+                t0 = time.perf_counter()
+                request_conn = conn or profile.connect(path)
+                try:
+                    if kind == 'read':
+                        request_conn.execute(READ_SQL, (CATEGORIES[(n + i) % len(CATEGORIES)],)).fetchall()
+                    else:
+                        # A deferred transaction reads first, then has to upgrade its lock to write.
+                        request_conn.execute('BEGIN IMMEDIATE' if profile.immediate else 'BEGIN')
+                        request_conn.execute('SELECT price FROM item WHERE id = ?', (i % options['rows'] + 1,)).fetchone()
+                        request_conn.execute(
+                            'INSERT INTO item (name, category, price, body) VALUES (?, ?, ?, ?)',
+                            (f'new {n}-{i}', CATEGORIES[i % len(CATEGORIES)], i, 'y' * 200),
+                        )
+                        request_conn.execute('UPDATE item SET price = price + 1 WHERE id = ?', (i % options['rows'] + 1,))
+                        request_conn.execute('COMMIT')
+                    latencies.append((time.perf_counter() - t0) * 1000)
+                except sqlite3.OperationalError:
+                    failed += 1
+                    if request_conn.in_transaction:
+                        request_conn.execute('ROLLBACK')
+                finally:
+                    if conn is None:
+                        request_conn.close()
+            if conn is not None:
+                conn.close()
+            with lock:
+                samples[kind].extend(latencies)
+                errors[0] += failed
+
+        threads = [threading.Thread(target=worker, args=('read', n)) for n in range(options['readers'])]
+        threads += [threading.Thread(target=worker, args=('write', n)) for n in range(options['writers'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        def p95(values):
+            return statistics.quantiles(values, n=100)[94] if len(values) > 1 else (values[0] if values else 0.0)
+
+        return {
+            'reads': len(samples['read']) / elapsed,
+            'writes': len(samples['write']) / elapsed,
+            'read_p95': p95(samples['read']),
+            'write_p95': p95(samples['write']),
+            'errors': errors[0],
+        }
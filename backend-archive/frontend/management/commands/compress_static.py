@@ -0,0 +1,25 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from config.static_storage import brotli, compress_tree
+
+
+class Command(BaseCommand):
+    help = 'Write .gz (and .br, if brotli is installed) siblings for text assets under STATIC_ROOT'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--root', default=None, help='Directory to compress (default: STATIC_ROOT)')
+        parser.add_argument('--force', action='store_true', help='Recompress even when the variants are up to date')
+
+    def handle(self, *args, **options):
+        root = options['root'] or settings.STATIC_ROOT
+        if not root:
+            raise CommandError('STATIC_ROOT is not set; pass --root or run collectstatic first')
+        started = time.perf_counter()
+        files, variants = compress_tree(root, force=options['force'])
+        encodings = 'gzip, br' if brotli is not None else 'gzip (install brotli for .br)'
+        self.stdout.write(self.style.SUCCESS(
+            f"Compressed {files} files into {variants} variants [{encodings}] in {time.perf_counter() - started:.2f}s"
+        ))
@@ -0,0 +1,79 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TransactionTestCase
+
+from accounts import bootstrap
+from accounts.models import User
+from config.benchmark import compare, run_suite, select_endpoints
+from shop.cache import get_cache
+from shop.models import Product
+
+
+def result(**endpoints):
+    return {'meta': {}, 'endpoints': endpoints}
+
+
+def summary(p95=10.0, rps=100.0, queries=2.0, errors=0):
+    return {'p95_ms': p95, 'rps': rps, 'queries_per_request': queries, 'errors': errors}
+
+
+class CompareTests(SimpleTestCase):
+    def test_within_thresholds(self):
+        baseline = result(a=summary())
+        self.assertEqual(compare(result(a=summary(p95=12.0, rps=80.0)), baseline), [])
+
+    def test_reports_each_regression(self):
+        baseline = result(a=summary(), b=summary())
+        current = result(a=summary(p95=20.0, rps=50.0), b=summary(queries=7.0, errors=1), c=summary())
+        regressions = compare(current, baseline)
+        self.assertEqual(len(regressions), 4)
+        self.assertIn('b: queries/request 2 -> 7', regressions)
+
+    def test_select_by_prefix(self):
+        names = [e.name for e in select_endpoints(['page', 'api.products'])]
+        self.assertIn('page.shop', names)
+        self.assertIn('api.products.full', names)
+        self.assertNotIn('api.tutorials', names)
+
+
+class BenchEndpointsTests(TransactionTestCase):
+    # Outside a transaction, catalog reads go to DATABASE_REPLICAS mirrors when those are configured.
+    databases = '__all__'
+
+    def setUp(self):
+        get_cache().clear()
+        Product.objects.create(name='Sensor Kit', price='10.00', category='Kits', image_url='')
+
+    def test_run_suite_measures_and_cleans_up(self):
+        endpoints = select_endpoints(['api.products', 'page.shop', 'auth.profile', 'page.tutorial'])
+        results = run_suite(endpoints, requests=3, concurrency=2, warmup=1, allow_writes=True)
+        self.assertEqual(results['meta']['skipped'], ['page.tutorial'])
+        for name in ('api.products', 'page.shop', 'auth.profile'):
+            self.assertEqual(results['endpoints'][name]['requests'], 3)
+            self.assertEqual(results['endpoints'][name]['errors'], 0)
+            self.assertIsNotNone(results['endpoints'][name]['queries_per_request'])
+        self.assertFalse(User.objects.filter(email__endswith='@bench.example.invalid').exists())
+        # Bench users must not use up the first-signup super role.
+        self.assertFalse(bootstrap.is_set(bootstrap.FIRST_SUPER))
+
+    def test_refuses_unmarked_database(self):
+        with self.assertRaisesMessage(CommandError, 'not marked as a benchmark database'):
+            call_command('bench_endpoints', 'api.products', requests=1, warmup=0, stdout=StringIO())
+        self.assertFalse(User.objects.exists())
+        bootstrap.mark(bootstrap.BENCH_DATABASE)
+        call_command('bench_endpoints', 'api.products', requests=1, warmup=0, stdout=StringIO())
+
+    def test_command_fails_on_regression(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as fh:
+            json.dump(result(**{'api.products': summary(p95=10.0, rps=100.0, queries=-1.0)}), fh)
+        self.addCleanup(os.remove, fh.name)
+        with self.assertRaisesMessage(CommandError, 'api.products: queries/request'):
+            call_command(
+                'bench_endpoints', 'api.products', requests=2, warmup=0, baseline=fh.name, allow_writes=True,
+                stdout=StringIO(),
+            )
@@ -0,0 +1,121 @@
+import contextvars
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connections, router, transaction
+from django.test import TransactionTestCase, override_settings
+
+from config.db_router import PrimaryReplicaRouter, pin_to_primary
+from shop.cache import get_cache
+from shop.models import Product
+
+REPLICA = 'replica_test'
+
+
+class ReplicaRoutingTests(TransactionTestCase):
+    """Primary and replica are two separate SQLite files, so it is visible which one answered."""
+
+    @classmethod
+    def setUpClass(cls):
+        # The replica alias only exists for this class, so it is declared here
+        # rather than in ``databases`` (which the runner reads up front).
+        cls.tmp = tempfile.mkdtemp()
+        cls.replica_path = os.path.join(cls.tmp, 'replica.sqlite3')
+        cls.template_path = os.path.join(cls.tmp, 'migrated.sqlite3')
+        primary = connections['default'].settings_dict
+        connections.settings[REPLICA] = {
+            **primary, 'NAME': cls.replica_path, 'TEST': {**primary['TEST'], 'NAME': None, 'MIRROR': None},
+        }
+        call_command('migrate', database=REPLICA, verbosity=0)
+        connections[REPLICA].close()
+        shutil.copyfile(cls.replica_path, cls.template_path)
+        cls.databases = {'default', REPLICA}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+        shutil.rmtree(cls.tmp)
+
+    def setUp(self):
+        # Each test starts from a freshly migrated, empty replica.
+        connections[REPLICA].close()
+        shutil.copyfile(self.template_path, self.replica_path)
+        routing = override_settings(
+            DATABASE_REPLICA_ALIASES=[REPLICA],
+            DATABASE_ROUTERS=['config.db_router.PrimaryReplicaRouter'],
+        )
+        routing.enable()
+        self.addCleanup(routing.disable)
+        get_cache().clear()
+        self.addCleanup(get_cache().clear)
+        Product.objects.create(name='Primary Board', price='10.00', category='Boards')
+        # bulk_create skips signals, which would write to the primary.
+        Product.objects.using(REPLICA).bulk_create([Product(name='Replica Board', price='10.00', category='Boards')])
+
+    def names(self, response):
+        return [item['name'] for item in response.json()['results']]
+
+    def test_catalog_reads_go_to_the_replica(self):
+        self.assertEqual(router.db_for_read(Product), REPLICA)
+        self.assertEqual(list(Product.objects.values_list('name', flat=True)), ['Replica Board'])
+        self.assertEqual(self.names(self.client.get('/api/products/')), ['Replica Board'])
+        self.assertIn('Replica Board', self.client.get('/shop/').content.decode())
+
+    def test_writes_and_accounts_stay_on_the_primary(self):
+        User = get_user_model()
+        self.assertEqual(router.db_for_write(Product), 'default')
+        self.assertEqual(router.db_for_read(User), 'default')
+        User.objects.create_user(username='reader@example.com', email='reader@example.com', password='pass12345')
+        self.assertFalse(User.objects.using(REPLICA).exists())
+        response = self.client.post(
+            '/api/auth/login/', {'email': 'reader@example.com', 'password': 'pass12345'}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_writers_read_their_own_writes(self):
+        response = self.client.post(
+            '/api/products/', {'name': 'New Board', 'price': '12.00', 'category': 'Boards'}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertIn('db_pin', response.cookies)
+        self.assertFalse(Product.objects.using(REPLICA).filter(name='New Board').exists())
+        # The pin cookie sends this client's next reads to the primary...
+        self.assertIn('New Board', self.names(self.client.get('/api/products/')))
+        # ...while other visitors keep reading the replica (past the catalog cache).
+        self.client.cookies.clear()
+        get_cache().clear()
+        self.assertNotIn('New Board', self.names(self.client.get('/api/products/')))
+
+    async def test_writers_are_pinned_under_asgi(self):
+        response = await self.async_client.post(
+            '/api/products/', {'name': 'Async Board', 'price': '12.00', 'category': 'Boards'},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertIn('db_pin', response.cookies)
+
+    def test_reads_inside_a_primary_transaction_use_the_primary(self):
+        with transaction.atomic():
+            self.assertEqual(router.db_for_read(Product), 'default')
+        self.assertEqual(router.db_for_read(Product), REPLICA)
+
+    def test_pin_to_primary(self):
+        def pinned_read():
+            pin_to_primary()
+            return router.db_for_read(Product)
+
+        # In a copied context, so the pin does not outlive the test.
+        self.assertEqual(contextvars.copy_context().run(pinned_read), 'default')
+        self.assertEqual(router.db_for_read(Product), REPLICA)
+
+    def test_replicas_are_not_migrated(self):
+        router_ = PrimaryReplicaRouter()
+        self.assertFalse(router_.allow_migrate(REPLICA, 'shop'))
+        self.assertTrue(router_.allow_migrate('default', 'shop'))
@@ -0,0 +1,57 @@
+from django.test import Client, TestCase
+
+from accounts.models import User
+from shop.cache import get_cache
+from shop.models import Product, Tutorial
+
+
+class PageCacheTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.client = Client()
+        self.product = Product.objects.create(name='Relay Board', price='250.00', category='Modules', image_url='')
+        self.tutorial = Tutorial.objects.create(title='Wiring 101', excerpt='Basics', content='Step one')
+
+    def test_anonymous_repeat_is_served_without_queries(self):
+        first = self.client.get('/shop/')
+        self.assertEqual(first['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            second = self.client.get('/shop/')
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.content, first.content)
+        self.assertIn('text/html', second['Content-Type'])
+
+    def test_catalog_write_invalidates_pages(self):
+        self.client.get('/shop/')
+        self.client.get(f'/product/{self.product.pk}/')
+        self.client.get('/tutorials/')
+        self.product.name = 'Relay Board v2'
+        self.product.save()
+
+        resp = self.client.get('/shop/')
+        self.assertEqual(resp['X-Cache'], 'MISS')
+        self.assertContains(resp, 'Relay Board v2')
+        self.assertContains(self.client.get(f'/product/{self.product.pk}/'), 'Relay Board v2')
+        # Tutorial pages are keyed on the Tutorial version only.
+        self.assertEqual(self.client.get('/tutorials/')['X-Cache'], 'HIT')
+
+    def test_missing_object_is_not_cached(self):
+        self.assertEqual(self.client.get('/product/999999/').status_code, 404)
+        self.assertEqual(self.client.get('/product/999999/').status_code, 404)
+
+    def test_signed_in_users_get_their_header_and_cached_fragments(self):
+        user = User.objects.create_user(email='cache@example.com', username='cache@example.com', password='pw', first_name='Ada')
+        self.client.get('/shop/')
+        self.client.force_login(user)
+
+        resp = self.client.get('/shop/')
+        self.assertNotIn('X-Cache', resp)
+        self.assertContains(resp, 'Welcome, Ada')
+        self.assertContains(resp, 'Relay Board')
+        # The product grid comes from its fragment; only the session and user are read.
+        with self.assertNumQueries(2):
+            resp = self.client.get('/shop/')
+        self.assertContains(resp, 'Relay Board')
+
+        Product.objects.create(name='Servo Pack', price='90.00', category='Modules', image_url='')
+        self.assertContains(self.client.get('/shop/'), 'Servo Pack')
@@ -0,0 +1,87 @@
+from django.test import Client, TestCase, override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import User
+from config.query_budget import QueryBudgetExceeded, query_stats, reset_query_stats
+from shop.cache import get_cache
+from shop.models import Product, Tutorial
+
+
+def query_count(response):
+    # Server-Timing: db;dur=0.4;desc="3 queries", app;dur=5.1
+    return int(response['Server-Timing'].split('desc="')[1].split()[0])
+
+
+@override_settings(QUERY_BUDGET_SERVER_TIMING=True)
+class QueryBudgetTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        reset_query_stats()
+        self.client = Client()
+        self.user = User.objects.create_user(email='budget@example.com', username='budget@example.com', password='pw')
+        for i in range(5):
+            Product.objects.create(name=f'Kit {i}', price='10.00', category='Kits', image_url='')
+            Tutorial.objects.create(title=f'Guide {i}', excerpt='Short', content='Long')
+        self.product = Product.objects.first()
+        self.tutorial = Tutorial.objects.first()
+
+    def pages(self):
+        return ['/', '/shop/', f'/product/{self.product.pk}/', '/tutorials/', f'/tutorial/{self.tutorial.pk}/', '/cart/']
+
+    def test_pages_stay_within_budget(self):
+        # Budgets are declared on the views and enforced strictly under the test runner.
+        for path in self.pages():
+            get_cache().clear()
+            self.assertEqual(self.client.get(path).status_code, 200, path)
+        self.client.force_login(self.user)
+        for path in self.pages() + ['/student-hub/']:
+            get_cache().clear()
+            resp = self.client.get(path)
+            self.assertEqual(resp.status_code, 200, path)
+            self.assertLessEqual(query_count(resp), 3, path)
+
+    def test_api_lists_do_not_grow_with_rows(self):
+        token = RefreshToken.for_user(self.user).access_token
+        api = Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+        for path in ['/api/products/?view=full&expand=related', '/api/tutorials/', '/api/services/',
+                     f'/api/products/{self.product.pk}/?expand=related']:
+            get_cache().clear()
+            self.assertEqual(api.get(path).status_code, 200, path)
+
+    def test_server_timing_and_aggregates(self):
+        resp = self.client.get('/cart/')
+        self.assertTrue(resp['Server-Timing'].startswith('db;dur='))
+        self.client.get('/cart/')
+        self.assertEqual(query_stats()['/cart/']['requests'], 2)
+
+        admin = User.objects.create_user(email='ops@example.com', username='ops@example.com', password='pw', is_staff=True)
+        token = RefreshToken.for_user(admin).access_token
+        self.assertEqual(self.client.get('/api/query-stats/').status_code, 401)
+        stats = self.client.get('/api/query-stats/', HTTP_AUTHORIZATION=f'Bearer {token}').json()
+        self.assertIn('/cart/', stats)
+        self.assertIn('avg_queries', stats['/cart/'])
+
+    @override_settings(QUERY_BUDGET_SERVER_TIMING=False)
+    def test_server_timing_is_opt_in(self):
+        self.assertNotIn('Server-Timing', self.client.get('/cart/'))
+        self.assertEqual(query_stats()['/cart/']['requests'], 1)
+
+    @override_settings(QUERY_BUDGETS={'/shop/': 0})
+    def test_exceeding_a_budget_fails_in_strict_mode(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get('/shop/')
+
+    @override_settings(QUERY_BUDGETS={'shop': 0}, QUERY_BUDGET_STRICT=False)
+    def test_exceeding_a_budget_logs_otherwise(self):
+        with self.assertLogs('config.query_budget', 'WARNING') as logs:
+            resp = self.client.get('/shop/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn('budget is 0', logs.output[0])
+        self.assertEqual(query_stats()['/shop/']['over_budget'], 1)
+
+    async def test_counts_queries_under_asgi(self):
+        # The async chain keeps the middleware async and still sees the view's queries.
+        resp = await self.async_client.get('/shop/')
+        self.assertEqual(resp.status_code, 200)
+        self.assertGreater(query_count(resp), 0)
+        self.assertEqual(query_stats()['/shop/']['requests'], 1)
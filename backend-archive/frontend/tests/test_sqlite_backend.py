@@ -0,0 +1,49 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase
+
+from config.sqlite_backend.base import DatabaseWrapper, pragma_statements
+
+
+class TunedSQLiteBackendTests(SimpleTestCase):
+    def wrapper(self, path, pragmas=None):
+        settings_dict = {
+            **connection.settings_dict,
+            'ENGINE': 'config.sqlite_backend',
+            'NAME': path,
+            'OPTIONS': {'pragmas': pragmas} if pragmas else {},
+        }
+        wrapper = DatabaseWrapper(settings_dict, alias='tuned')
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_new_connections_are_tuned(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            wrapper = self.wrapper(os.path.join(tmp, 'tuned.sqlite3'), pragmas={'cache_size': -2000, 'mmap_size': None})
+            self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'wal')
+            self.assertEqual(self.pragma(wrapper, 'synchronous'), 1)
+            self.assertEqual(self.pragma(wrapper, 'busy_timeout'), 5000)
+            self.assertEqual(self.pragma(wrapper, 'temp_store'), 2)
+            self.assertEqual(self.pragma(wrapper, 'cache_size'), -2000)
+            self.assertEqual(self.pragma(wrapper, 'foreign_keys'), 1)
+            wrapper.close()
+
+    def test_rejects_malformed_pragmas(self):
+        with self.assertRaises(ImproperlyConfigured):
+            pragma_statements({'journal_mode': 'WAL; DROP TABLE x'})
+
+    def test_benchmark_runs_both_profiles(self):
+        out = StringIO()
+        call_command('bench_sqlite', rows=200, readers=2, writers=1, seconds=0.2, stdout=out)
+        self.assertIn('stock', out.getvalue())
+        self.assertIn('tuned vs stock', out.getvalue())
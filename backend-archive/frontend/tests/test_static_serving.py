@@ -0,0 +1,122 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+from asgiref.sync import iscoroutinefunction
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+
+from config.static_serving import IMMUTABLE, HASHED_NAME_RE, StaticFilesMiddleware
+from config.static_storage import compress_file
+
+
+class StaticServingTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.body = b'body { color: red; }\n' * 20
+        self.write('app/site.css', self.body)
+        self.write('app/site.css.gz', gzip.compress(self.body))
+        self.write('app/site.0123456789ab.css', self.body)
+        self.factory = RequestFactory()
+        with override_settings(STATIC_ROOT=self.root, STATIC_AUTOREFRESH=False):
+            self.middleware = StaticFilesMiddleware(lambda request: HttpResponse('app'))
+
+    def write(self, rel_path, data):
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as fh:
+            fh.write(data)
+
+    def get(self, path, **headers):
+        return self.middleware(self.factory.get(path, **headers))
+
+    def test_serves_file_with_validators(self):
+        resp = self.get('/static/app/site.css')
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(b''.join(resp.streaming_content), self.body)
+        self.assertIn('text/css', resp['Content-Type'])
+        self.assertTrue(resp['ETag'])
+        self.assertEqual(resp['Cache-Control'], 'public, max-age=60')
+
+    def test_if_none_match_returns_304(self):
+        etag = self.get('/static/app/site.css')['ETag']
+        resp = self.get('/static/app/site.css', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp['ETag'], etag)
+
+    def test_range_request(self):
+        resp = self.get('/static/app/site.css', HTTP_RANGE='bytes=0-9')
+        self.assertEqual(resp.status_code, 206)
+        self.assertEqual(resp['Content-Range'], f'bytes 0-9/{len(self.body)}')
+        self.assertEqual(b''.join(resp.streaming_content), self.body[:10])
+
+        resp = self.get('/static/app/site.css', HTTP_RANGE='bytes=-5')
+        self.assertEqual(b''.join(resp.streaming_content), self.body[-5:])
+
+        resp = self.get('/static/app/site.css', HTTP_RANGE=f'bytes={len(self.body)}-')
+        self.assertEqual(resp.status_code, 416)
+        self.assertEqual(resp['Content-Range'], f'bytes */{len(self.body)}')
+
+    def test_hashed_name_is_immutable(self):
+        resp = self.get('/static/app/site.0123456789ab.css')
+        self.assertEqual(resp['Cache-Control'], IMMUTABLE)
+
+    def test_precompressed_variant(self):
+        plain = self.get('/static/app/site.css')
+        resp = self.get('/static/app/site.css', HTTP_ACCEPT_ENCODING='br;q=0, gzip')
+        self.assertEqual(resp['Content-Encoding'], 'gzip')
+        self.assertEqual(resp['Vary'], 'Accept-Encoding')
+        self.assertEqual(gzip.decompress(b''.join(resp.streaming_content)), self.body)
+        self.assertNotEqual(resp['ETag'], plain['ETag'])
+        # The .gz file is not addressable as an asset of its own.
+        self.assertEqual(self.get('/static/app/site.css.gz').content, b'app')
+
+    def test_unknown_path_falls_through(self):
+        self.assertEqual(self.get('/static/app/missing.css').content, b'app')
+        self.assertEqual(self.get('/products/').content, b'app')
+
+    async def test_async_chain_stays_async(self):
+        async def app(request):
+            return HttpResponse('app')
+
+        with override_settings(STATIC_ROOT=self.root, STATIC_AUTOREFRESH=False):
+            middleware = StaticFilesMiddleware(app)
+        self.assertTrue(iscoroutinefunction(middleware))
+        resp = await middleware(self.factory.get('/static/app/site.css'))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual((await middleware(self.factory.get('/products/'))).content, b'app')
+
+
+class CollectStaticPipelineTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def test_collectstatic_fingerprints_and_precompresses(self):
+        with override_settings(STATIC_ROOT=self.root, STATIC_AUTOREFRESH=False):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            url = Template("{% load static %}{% static 'frontend/css/globals.css' %}").render(Context())
+            self.assertRegex(url, HASHED_NAME_RE)
+            hashed = os.path.join(self.root, url[len('/static/'):])
+            self.assertTrue(os.path.exists(hashed + '.gz'))
+
+            middleware = StaticFilesMiddleware(lambda request: HttpResponse('app'))
+            resp = middleware(RequestFactory().get(url, HTTP_ACCEPT_ENCODING='gzip'))
+        self.assertEqual(resp['Cache-Control'], IMMUTABLE)
+        self.assertEqual(resp['Content-Encoding'], 'gzip')
+
+    def test_static_tag_without_manifest_uses_plain_name(self):
+        with override_settings(STATIC_ROOT=self.root):
+            url = Template("{% load static %}{% static 'frontend/js/site.js' %}").render(Context())
+        self.assertEqual(url, '/static/frontend/js/site.js')
+
+    def test_incompressible_file_gets_no_variant(self):
+        path = os.path.join(self.root, 'noise.js')
+        with open(path, 'wb') as fh:
+            fh.write(os.urandom(4096))
+        self.assertEqual(compress_file(path), [])
+        self.assertFalse(os.path.exists(path + '.gz'))
@@ -1,36 +1,58 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from shop.models import Product, Tutorial
 from django.contrib.auth import authenticate, login
+from accounts.hashing import VerifierBusy
 from accounts.models import User
+from accounts.views import BUSY_RETRY_AFTER
+from config.query_budget import query_budget
+from frontend.caching import catalog_page, fragment_context
 
+# Product grids only render these; skip the large text columns.
+CARD_FIELDS = ('id', 'name', 'price', 'image_url')
+TUTORIAL_CARD_FIELDS = ('id', 'title', 'excerpt')
 
+# Catalog pages are cached whole for anonymous visitors (frontend.caching). Their
+# querysets stay lazy so a cached {% cache %} fragment never runs them either.
+
+
+@query_budget(3)
+@catalog_page(Product)
 def index(request):
-    products = Product.objects.all()[:6]
-    return render(request, 'frontend/index.html', {'products': products})
+    products = Product.objects.only(*CARD_FIELDS)[:6]
+    return render(request, 'frontend/index.html', {'products': products, **fragment_context(Product)})
 
 
+@query_budget(3)
+@catalog_page(Product)
 def shop(request):
-    products = Product.objects.all()
-    return render(request, 'frontend/shop.html', {'products': products})
+    products = Product.objects.only(*CARD_FIELDS)
+    return render(request, 'frontend/shop.html', {'products': products, **fragment_context(Product)})
 
 
+@query_budget(3)
+@catalog_page(Product)
 def product_detail(request, pk):
     product = get_object_or_404(Product, pk=pk)
-    return render(request, 'frontend/product_detail.html', {'product': product})
+    return render(request, 'frontend/product_detail.html', {'product': product, **fragment_context(Product)})
 
 
+@query_budget(3)
+@catalog_page(Tutorial)
 def tutorials(request):
-    tutorials = Tutorial.objects.all()
-    return render(request, 'frontend/tutorials.html', {'tutorials': tutorials})
+    tutorials = Tutorial.objects.only(*TUTORIAL_CARD_FIELDS)
+    return render(request, 'frontend/tutorials.html', {'tutorials': tutorials, **fragment_context(Tutorial)})
 
 
+@query_budget(3)
+@catalog_page(Tutorial)
 def tutorial_detail(request, pk):
     tutorial = get_object_or_404(Tutorial, pk=pk)
     return render(request, 'frontend/tutorial_detail.html', {
-        'tutorial': tutorial
+        'tutorial': tutorial, **fragment_context(Tutorial)
     })
 
 
+@query_budget(2)
 def student_hub(request):
     # Server-side protection for student hub — redirect unauthenticated users to login with redirect back
     if not request.user.is_authenticated:
@@ -38,6 +60,7 @@ def student_hub(request):
     return render(request, 'frontend/student_hub.html')
 
 
+@query_budget(2)
 def cart(request):
     return render(request, 'frontend/cart.html')
 
@@ -48,7 +71,15 @@ def login_view(request):
     if request.method == 'POST':
         email = request.POST.get('email')
         password = request.POST.get('password')
-        user = authenticate(request, username=email, password=password)
+        try:
+            user = authenticate(request, username=email, password=password)
+        except VerifierBusy:
+            # Password checks are saturated: shed the login like the API does.
+            response = render(request, 'frontend/login.html', {
+                'redirect': redirect_to, 'error': 'Too many people are logging in right now. Please try again shortly.'
+            }, status=503)
+            response['Retry-After'] = BUSY_RETRY_AFTER
+            return response
         if user:
             login(request, user)
             return redirect(redirect_to)
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class ShopConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'shop'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .search import search_index_post_migrate
+
+        # Table rebuilds in later migrations drop the FTS sync triggers; put them back.
+        post_migrate.connect(search_index_post_migrate, sender=self)
@@ -0,0 +1,175 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+
+STATS_HITS_KEY = 'catalog:stats:hits'
+STATS_MISSES_KEY = 'catalog:stats:misses'
+
+
+def get_cache():
+    return caches[getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')]
+
+
+def _version_key(model):
+    return f'catalog:version:{model._meta.label_lower}'
+
+
+def get_version(model):
+    """Return the current cache version for ``model``.
+
+    A missing counter (first use, eviction, cache restart) is seeded from the
+    clock rather than from 1, so entries written under an older counter can
+    never be mistaken for fresh ones.
+    """
+    cache = get_cache()
+    key = _version_key(model)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(*models):
+    cache = get_cache()
+    for model in models:
+        key = _version_key(model)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def invalidate(*models):
+    """Bump ``models`` now and again once the surrounding transaction commits.
+
+    The first bump stops this process serving the old entry; the second makes
+    sure a response cached by a reader that raced the open transaction is
+    superseded once the write is visible to other connections. With read
+    replicas, a third bump after ``REPLICA_PIN_SECONDS`` supersedes anything
+    cached from a replica that had not caught up yet.
+    """
+    bump_version(*models)
+    transaction.on_commit(lambda: bump_version(*models))
+    lag = getattr(settings, 'REPLICA_PIN_SECONDS', 0)
+    if getattr(settings, 'DATABASE_REPLICA_ALIASES', None) and lag:
+        transaction.on_commit(lambda: _bump_later(lag, models))
+
+
+# Delayed bumps: model -> monotonic deadline. One timer runs per model however many
+# writes land inside the window; each write only pushes the deadline back.
+_delayed = {}
+_delayed_lock = threading.Lock()
+
+
+def _bump_later(delay, models):
+    deadline = time.monotonic() + delay
+    with _delayed_lock:
+        idle = [model for model in models if model not in _delayed]
+        for model in models:
+            _delayed[model] = deadline
+    for model in idle:
+        _start_timer(delay, model)
+
+
+def _start_timer(delay, model):
+    timer = threading.Timer(delay, _fire_delayed, (model,))
+    timer.daemon = True
+    timer.start()
+
+
+def _fire_delayed(model):
+    with _delayed_lock:
+        remaining = _delayed[model] - time.monotonic()
+        if remaining <= 0:
+            del _delayed[model]
+    if remaining > 0:
+        _start_timer(remaining, model)
+    else:
+        bump_version(model)
+
+
+def _count(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def cache_stats():
+    cache = get_cache()
+    hits = cache.get(STATS_HITS_KEY) or 0
+    misses = cache.get(STATS_MISSES_KEY) or 0
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 4) if total else 0.0,
+    }
+
+
+def reset_cache_stats():
+    get_cache().delete_many([STATS_HITS_KEY, STATS_MISSES_KEY])
+
+
+def response_cache_key(models, request):
+    versions = ':'.join(str(get_version(model)) for model in models)
+    digest = hashlib.md5(
+        f'{request.accepted_media_type}|{request.get_full_path()}'.encode('utf-8'),
+        usedforsecurity=False,
+    ).hexdigest()
+    return f'catalog:response:{models[0]._meta.label_lower}:{versions}:{digest}'
+
+
+class CatalogCacheMixin:
+    """Serve rendered JSON for ``list``/``retrieve`` from the cache.
+
+    Keys embed the version counter of every model in ``cache_models``; the
+    signal handlers in ``shop.signals`` bump those counters on every write, so
+    a stale entry is simply never looked up again and ages out on its own.
+    Cache hits return the stored bytes without touching the ORM or the
+    serializer. Permission checks still run first, in ``APIView.initial``.
+    """
+
+    cache_models = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def get_cache_models(self):
+        return self.cache_models or (self.queryset.model,)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if request.accepted_renderer.format != 'json':
+            return handler(request, *args, **kwargs)
+
+        key = response_cache_key(self.get_cache_models(), request)
+        body = get_cache().get(key)
+        if body is not None:
+            _count(STATS_HITS_KEY)
+            response = HttpResponse(body, content_type=request.accepted_media_type)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        _count(STATS_MISSES_KEY)
+        self._response_cache_key = key
+        return handler(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = getattr(self, '_response_cache_key', None)
+        if key and response.status_code == 200:
+            response.render()
+            get_cache().set(key, response.content, getattr(settings, 'CATALOG_CACHE_TIMEOUT', 300))
+            response['X-Cache'] = 'MISS'
+        return response
@@ -0,0 +1,163 @@
+"""Streaming readers for catalog feeds.
+
+Both readers yield ``(kind, record)`` pairs, where ``kind`` is ``'product'``,
+``'tutorial'`` or ``'service'``, while holding at most one record plus one read
+buffer in memory. A single JSON value may grow the buffer to at most
+``MAX_VALUE_SIZE`` characters; past that the element is treated as malformed
+rather than read to the end of the file.
+"""
+import json
+
+KINDS = {
+    'products': 'product',
+    'tutorials': 'tutorial',
+    'services': 'service',
+}
+NDJSON_EXTENSIONS = ('.ndjson', '.jsonl')
+CHUNK_SIZE = 1 << 16
+MAX_VALUE_SIZE = 16 << 20
+
+_WHITESPACE = ' \t\n\r'
+
+
+class FeedError(ValueError):
+    pass
+
+
+class _Reader:
+    """Forward-only view over a text stream with an on-demand buffer."""
+
+    def __init__(self, fh, chunk_size, max_value_size=MAX_VALUE_SIZE):
+        self.fh = fh
+        self.chunk_size = chunk_size
+        self.max_value_size = max_value_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.bytes_read = 0
+
+    def fill(self):
+        if self.eof:
+            return False
+        chunk = self.fh.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.bytes_read += len(chunk)
+        # Drop what has already been consumed before growing the buffer.
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def offset(self):
+        """Position in the stream of the next unconsumed character."""
+        return self.bytes_read - len(self.buffer) + self.pos
+
+    def peek(self):
+        """Next non-whitespace character, or '' at end of input."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise FeedError(f'Expected {char!r} at offset {self.offset()}')
+        self.pos += 1
+
+    def value(self, decoder):
+        """Decode one complete JSON value, reading more input as needed."""
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if len(self.buffer) - self.pos > self.max_value_size:
+                    raise FeedError(
+                        f'Invalid JSON value at offset {self.offset()} '
+                        f'(no complete value within {self.max_value_size} characters)'
+                    )
+                if self.fill():
+                    continue
+                raise FeedError(f'Truncated or invalid JSON value at offset {self.offset()}')
+            # A number that ends exactly at the buffer edge may continue in
+            # the next chunk; only trust it once more input (or EOF) is seen.
+            if end == len(self.buffer) and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_feed(fh, chunk_size=CHUNK_SIZE, max_value_size=MAX_VALUE_SIZE):
+    """Yield records from ``{"products": [...], "tutorials": [...], ...}``.
+
+    Only the three catalog arrays are walked element by element; any other
+    top-level value is decoded and discarded.
+    """
+    reader = _Reader(fh, chunk_size, max_value_size)
+    decoder = json.JSONDecoder()
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+    while True:
+        key = reader.value(decoder)
+        reader.expect(':')
+        kind = KINDS.get(key)
+        if kind and reader.peek() == '[':
+            reader.expect('[')
+            if reader.peek() == ']':
+                reader.pos += 1
+            else:
+                index = 0
+                while True:
+                    record = reader.value(decoder)
+                    if not isinstance(record, dict):
+                        raise FeedError(f'{key}[{index}]: expected an object, got {type(record).__name__}')
+                    yield kind, record
+                    index += 1
+                    if reader.peek() == ',':
+                        reader.pos += 1
+                        continue
+                    reader.expect(']')
+                    break
+        else:
+            reader.value(decoder)
+        if reader.peek() == ',':
+            reader.pos += 1
+            continue
+        reader.expect('}')
+        return
+
+
+def iter_ndjson_feed(fh):
+    """Yield records from newline-delimited JSON.
+
+    Each line is one object with a ``type`` (or ``kind``) of ``product``,
+    ``tutorial`` or ``service``; blank lines are ignored.
+    """
+    for lineno, line in enumerate(fh, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise FeedError(f'Line {lineno}: {e}')
+        if not isinstance(record, dict):
+            raise FeedError(f'Line {lineno}: expected an object, got {type(record).__name__}')
+        kind = record.pop('type', None) or record.pop('kind', None)
+        kind = KINDS.get(kind, kind)
+        if kind not in KINDS.values():
+            raise FeedError(f'Line {lineno}: unknown record type {kind!r}')
+        yield kind, record
+
+
+def iter_feed(path, chunk_size=CHUNK_SIZE):
+    with open(path, 'r', encoding='utf-8') as fh:
+        if path.lower().endswith(NDJSON_EXTENSIONS):
+            yield from iter_ndjson_feed(fh)
+        else:
+            yield from iter_json_feed(fh, chunk_size)
@@ -0,0 +1,303 @@
+import hashlib
+import json
+import time
+from array import array
+from itertools import chain
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import invalidate
+from .models import ImportFingerprint, Product, Service, Tutorial
+
+
+def _price(value):
+    try:
+        return Decimal(str(value if value not in (None, '') else 0)).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        return Decimal('0.00')
+
+
+def product_fields(record):
+    return {
+        'name': (record.get('name') or '')[:255],
+        'price': _price(record.get('price', 0)),
+        'category': record.get('category') or '',
+        'image_url': record.get('image') or '',
+        'description': record.get('description') or '',
+        'specifications': record.get('specifications') or '',
+    }
+
+
+def tutorial_fields(record):
+    return {
+        'title': (record.get('title') or '')[:255],
+        'excerpt': record.get('excerpt') or '',
+        'category': record.get('category') or '',
+        'thumbnail': record.get('thumbnail') or '',
+        'content': record.get('content') or '',
+    }
+
+
+def service_fields(record):
+    return {
+        'title': (record.get('title') or '')[:255],
+        'description': record.get('description') or '',
+        'icon': record.get('icon') or '',
+        'price': str(record.get('price') or ''),
+    }
+
+
+def fingerprint(fields, extra=None):
+    payload = json.dumps([fields, extra], sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class ImportStats:
+    LABELS = ('products', 'tutorials', 'services')
+
+    def __init__(self):
+        self.created = {}
+        self.updated = {}
+        self.deleted = {}
+        self.unchanged = {}
+        self.links_added = 0
+        self.links_removed = 0
+        self.changes = []
+        self.started = time.perf_counter()
+        self.finished = None
+
+    @property
+    def links(self):
+        return self.links_added + self.links_removed
+
+    @property
+    def rows(self):
+        return sum(self.created.values()) + sum(self.updated.values()) + sum(self.deleted.values()) + self.links
+
+    @property
+    def seconds(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def summary(self):
+        parts = [
+            f"{label}: {self.created.get(label, 0)} created, {self.updated.get(label, 0)} updated, "
+            f"{self.deleted.get(label, 0)} deleted, {self.unchanged.get(label, 0)} unchanged"
+            for label in self.LABELS
+        ]
+        parts.append(f'related links: +{self.links_added} -{self.links_removed}')
+        return '; '.join(parts) + f' in {self.seconds:.2f}s ({self.rows_per_second:,.0f} rows/sec)'
+
+
+class CatalogImporter:
+    """Set-based, streaming sync of products, tutorials and services.
+
+    Records arrive as ``(kind, record)`` pairs and are buffered per kind into
+    batches of ``batch_size``. Each batch is matched on its natural key
+    (product ``name``, tutorial/service ``title``) against existing rows with
+    one ``IN`` query, then written with ``bulk_create``/``bulk_update``. Memory
+    therefore holds one batch of record bodies at a time, plus the natural keys
+    and integer ``related`` edges needed once the feed has been read. Then the
+    ``related`` through-table is diffed against the feed and only missing or
+    stale links are inserted or deleted. Everything runs in one transaction.
+
+    Every written record leaves an ``ImportFingerprint``. With
+    ``incremental=True`` records whose fingerprint is unchanged are skipped and
+    previously imported records missing from the feed are deleted, so an
+    unchanged feed costs a handful of reads. Deletion only covers kinds that
+    appear in the feed, so a products-only feed (or a fallback that lost a
+    section) leaves tutorials and services alone; ``prune_absent_kinds=True``
+    also empties kinds the feed does not mention. ``dry_run=True`` computes the same
+    plan, records it in ``stats.changes`` and rolls it back.
+    ``progress(kind, count, stats)`` is called after every batch.
+
+    Bulk writes bypass model signals, so ``updated_at`` is stamped here and the
+    catalog cache versions are bumped explicitly when anything changed.
+    """
+
+    SPECS = {
+        'product': (Product, 'name', product_fields),
+        'tutorial': (Tutorial, 'title', tutorial_fields),
+        'service': (Service, 'title', service_fields),
+    }
+
+    def __init__(self, batch_size=500, incremental=False, dry_run=False, progress=None, prune_absent_kinds=False):
+        self.batch_size = batch_size
+        self.incremental = incremental
+        self.prune_absent_kinds = prune_absent_kinds
+        self.dry_run = dry_run
+        self.progress = progress
+
+    def run(self, products, tutorials, services):
+        return self.run_stream(chain(
+            (('product', record) for record in products),
+            (('tutorial', record) for record in tutorials),
+            (('service', record) for record in services),
+        ))
+
+    def run_stream(self, records):
+        stats = ImportStats()
+        self.now = timezone.now()
+        self.id_map = {}
+        self.edges_from, self.edges_to = array('q'), array('q')
+        self.changed_products = set()
+        self.seen = {kind: set() for kind in self.SPECS}
+        processed = dict.fromkeys(self.SPECS, 0)
+        batches = {kind: [] for kind in self.SPECS}
+
+        with transaction.atomic():
+            for kind, record in records:
+                batch = batches[kind]
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    processed[kind] += self.flush(kind, batch, stats)
+                    batch.clear()
+                    if self.progress:
+                        self.progress(kind, processed[kind], stats)
+            for kind, batch in batches.items():
+                if batch:
+                    processed[kind] += self.flush(kind, batch, stats)
+                    if self.progress:
+                        self.progress(kind, processed[kind], stats)
+            if self.incremental:
+                for kind in self.SPECS:
+                    if processed[kind] or self.prune_absent_kinds:
+                        self.delete_missing(kind, stats)
+            self.sync_related(stats)
+            if self.dry_run:
+                transaction.set_rollback(True)
+            elif stats.rows:
+                invalidate(Product, Tutorial, Service)
+        stats.finished = time.perf_counter()
+        return stats
+
+    def flush(self, kind, batch, stats):
+        """Upsert one batch of records of ``kind``; return how many were read."""
+        model, key, to_fields = self.SPECS[kind]
+        label = kind + 's'
+
+        # Last record wins for duplicate keys, like sequential update_or_create.
+        rows, digests, source_ids = {}, {}, {}
+        for record in batch:
+            fields = to_fields(record)
+            natural_key = fields[key]
+            extra = None
+            if kind == 'product':
+                related = sorted({int(rid) for rid in record.get('related') or []})
+                extra = related
+                if record.get('id') is not None:
+                    sid = int(record['id'])
+                    source_ids.setdefault(natural_key, []).append(sid)
+                    for rid in related:
+                        self.edges_from.append(sid)
+                        self.edges_to.append(rid)
+            rows[natural_key] = fields
+            digests[natural_key] = fingerprint(fields, extra)
+        self.seen[kind].update(rows)
+
+        keys = list(rows)
+        existing = dict(model.objects.filter(**{f'{key}__in': keys}).order_by('-pk').values_list(key, 'pk'))
+        known = dict(ImportFingerprint.objects.filter(kind=kind, key__in=keys).values_list('key', 'digest'))
+
+        to_create, to_update, unchanged = [], [], 0
+        for natural_key, fields in rows.items():
+            if natural_key not in existing:
+                to_create.append(model(**fields, updated_at=self.now))
+            elif self.incremental and known.get(natural_key) == digests[natural_key]:
+                unchanged += 1
+            else:
+                obj = model(**fields, updated_at=self.now)
+                obj.pk = existing[natural_key]
+                to_update.append(obj)
+
+        model.objects.bulk_create(to_create, batch_size=self.batch_size)
+        if to_update:
+            update_fields = [name for name in next(iter(rows.values())) if name != key] + ['updated_at']
+            model.objects.bulk_update(to_update, update_fields, batch_size=self.batch_size)
+
+        written = to_create + to_update
+        ImportFingerprint.objects.bulk_create(
+            [ImportFingerprint(kind=kind, key=getattr(obj, key), digest=digests[getattr(obj, key)]) for obj in written],
+            batch_size=self.batch_size,
+            update_conflicts=True,
+            unique_fields=['kind', 'key'],
+            update_fields=['digest', 'updated_at'],
+        )
+
+        stats.created[label] = stats.created.get(label, 0) + len(to_create)
+        stats.updated[label] = stats.updated.get(label, 0) + len(to_update)
+        stats.unchanged[label] = stats.unchanged.get(label, 0) + unchanged
+        if self.dry_run:
+            stats.changes += [(kind, 'create', getattr(obj, key)) for obj in to_create]
+            stats.changes += [(kind, 'update', getattr(obj, key)) for obj in to_update]
+
+        if kind == 'product':
+            pks = dict(existing)
+            pks.update({obj.name: obj.pk for obj in to_create})
+            for natural_key, sids in source_ids.items():
+                for sid in sids:
+                    self.id_map[sid] = pks[natural_key]
+            self.changed_products.update(obj.pk for obj in written)
+        return len(batch)
+
+    def delete_missing(self, kind, stats):
+        """Delete previously imported records of ``kind`` that left the feed."""
+        model, key, _ = self.SPECS[kind]
+        seen = self.seen[kind]
+        known = ImportFingerprint.objects.filter(kind=kind).values_list('key', flat=True)
+        removed = [natural_key for natural_key in known.iterator() if natural_key not in seen]
+        for start in range(0, len(removed), self.batch_size):
+            chunk = removed[start:start + self.batch_size]
+            model.objects.filter(**{f'{key}__in': chunk}).delete()
+            ImportFingerprint.objects.filter(kind=kind, key__in=chunk).delete()
+        label = kind + 's'
+        stats.deleted[label] = stats.deleted.get(label, 0) + len(removed)
+        if self.dry_run:
+            stats.changes += [(kind, 'delete', natural_key) for natural_key in removed]
+
+    def sync_related(self, stats):
+        """Bring the symmetrical ``related`` links of changed products in line with the feed."""
+        through = Product.related.through
+        touched = self.changed_products
+        if not touched:
+            return
+
+        wanted = set()
+        for sid, rid in zip(self.edges_from, self.edges_to):
+            src, dst = self.id_map.get(sid), self.id_map.get(rid)
+            if src is None or dst is None or src == dst:
+                continue
+            if src in touched or dst in touched:
+                wanted.add((src, dst))
+                wanted.add((dst, src))
+
+        current = {}
+        pks = sorted(touched)
+        for start in range(0, len(pks), self.batch_size):
+            chunk = pks[start:start + self.batch_size]
+            for lookup in ('from_product_id__in', 'to_product_id__in'):
+                rows = through.objects.filter(**{lookup: chunk}).values_list('pk', 'from_product_id', 'to_product_id')
+                current.update({(src, dst): pk for pk, src, dst in rows})
+
+        stale = sorted(set(current) - wanted)
+        stale_ids = [current[edge] for edge in stale]
+        for start in range(0, len(stale_ids), self.batch_size):
+            through.objects.filter(pk__in=stale_ids[start:start + self.batch_size]).delete()
+        missing = sorted(wanted - set(current))
+        through.objects.bulk_create(
+            [through(from_product_id=src, to_product_id=dst) for src, dst in missing],
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+
+        # Products outside the changed set whose links moved still change shape.
+        moved = sorted({pk for edge in stale + missing for pk in edge} - touched)
+        for start in range(0, len(moved), self.batch_size):
+            Product.objects.filter(pk__in=moved[start:start + self.batch_size]).update(updated_at=self.now)
+        stats.links_added = len(missing)
+        stats.links_removed = len(stale)
@@ -0,0 +1,234 @@
+"""Read the catalog out of ``src/data/products.js`` without running JavaScript.
+
+The data module is a list of declarations such as
+``export const products = [{id: 1, name: "...", related: [2, 3]}, ...];``.
+Only literal values are understood: objects (bare, quoted or numeric keys),
+arrays, strings in all three quote styles (templates without ``${}``),
+numbers, ``true``/``false``/``null``/``undefined``, comments and trailing
+commas. Anything else raises ``JSDataError`` rather than being guessed at.
+
+Parsed modules are cached as JSON in ``JSDATA_CACHE_DIR``, keyed on a SHA-256
+of the source bytes, so repeated imports of an unchanged file skip parsing.
+The directory is created 0700 and ignored unless it is private to the current
+user, since its entries are imported as catalog data.
+"""
+import hashlib
+import json
+import os
+import re
+
+from django.conf import settings
+
+from .feeds import KINDS, FeedError
+
+CACHE_FORMAT = 2
+
+_SKIP_RE = re.compile(r'(?:\s+|//[^\n]*|/\*.*?\*/)*', re.DOTALL)
+_TOKEN_RE = re.compile(
+    r'''(?P<string>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'|`(?:[^`\\$]|\\.|\$(?!\{))*`)'''
+    r'|(?P<number>[+-]?(?:0[xX][0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?))'
+    r'|(?P<name>[A-Za-z_$][\w$]*)'
+    r'|(?P<punct>[{}\[\]:,;=])',
+    re.DOTALL,
+)
+_ESCAPE_RE = re.compile(r'\\(u\{[0-9a-fA-F]+\}|u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|\r\n|.)', re.DOTALL)
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', 'v': '\v', '0': '\0', '\n': '', '\r\n': '', '\r': ''}
+_CONSTANTS = {'true': True, 'false': False, 'null': None, 'undefined': None}
+_DECLARATIONS = ('const', 'let', 'var')
+
+
+class JSDataError(FeedError):
+    pass
+
+
+def _unescape(match):
+    code = match.group(1)
+    if code[0] == 'u' and len(code) > 1:
+        return chr(int(code[2:-1] if code[1] == '{' else code[1:], 16))
+    if code[0] == 'x' and len(code) > 1:
+        return chr(int(code[1:], 16))
+    return _ESCAPES.get(code, code)
+
+
+def _string(raw):
+    body = raw[1:-1]
+    if raw[0] == '`':
+        body = body.replace('\r\n', '\n')
+    if '\\' not in body:
+        return body
+    text = _ESCAPE_RE.sub(_unescape, body)
+    # \uD83D\uDE00 style pairs decode to lone surrogates; join them.
+    if any('\ud800' <= ch <= '\udfff' for ch in text):
+        text = text.encode('utf-16', 'surrogatepass').decode('utf-16')
+    return text
+
+
+def _number(raw):
+    sign = -1 if raw[0] == '-' else 1
+    digits = raw.lstrip('+-')
+    if digits[:2] in ('0x', '0X'):
+        return sign * int(digits, 16)
+    if '.' in digits or 'e' in digits or 'E' in digits:
+        return sign * float(digits)
+    return sign * int(digits)
+
+
+class _Parser:
+    def __init__(self, text):
+        self.text = text
+        self.pos = 0
+
+    def error(self, message):
+        line = self.text.count('\n', 0, self.pos) + 1
+        return JSDataError(f'line {line}: {message}')
+
+    def next(self):
+        """Return the next ``(kind, text)`` token, or ``(None, '')`` at the end."""
+        self.pos = _SKIP_RE.match(self.text, self.pos).end()
+        if self.pos >= len(self.text):
+            return None, ''
+        match = _TOKEN_RE.match(self.text, self.pos)
+        if match is None:
+            raise self.error(f'unexpected {self.text[self.pos]!r}')
+        self.pos = match.end()
+        return match.lastgroup, match.group()
+
+    def expect(self, punct):
+        kind, token = self.next()
+        if kind != 'punct' or token != punct:
+            raise self.error(f'expected {punct!r}, found {token!r}')
+
+    def value(self, token=None):
+        kind, token = token or self.next()
+        if kind == 'string':
+            return _string(token)
+        if kind == 'number':
+            return _number(token)
+        if kind == 'name' and token in _CONSTANTS:
+            return _CONSTANTS[token]
+        if token == '[':
+            return self.array()
+        if token == '{':
+            return self.object()
+        raise self.error(f'unsupported value {token!r}')
+
+    def array(self):
+        items = []
+        while True:
+            token = self.next()
+            if token[1] == ']':
+                return items
+            items.append(self.value(token))
+            kind, token = self.next()
+            if token == ']':
+                return items
+            if token != ',':
+                raise self.error(f"expected ',' or ']', found {token!r}")
+
+    def object(self):
+        obj = {}
+        while True:
+            kind, token = self.next()
+            if token == '}':
+                return obj
+            if kind == 'string':
+                key = _string(token)
+            elif kind in ('name', 'number'):
+                key = token
+            else:
+                raise self.error(f'unsupported key {token!r}')
+            self.expect(':')
+            obj[key] = self.value()
+            kind, token = self.next()
+            if token == '}':
+                return obj
+            if token != ',':
+                raise self.error(f"expected ',' or '}}', found {token!r}")
+
+    def module(self):
+        names = {}
+        while True:
+            kind, token = self.next()
+            if kind is None:
+                return names
+            if token == ';':
+                continue
+            if token == 'export':
+                kind, token = self.next()
+            if token not in _DECLARATIONS:
+                raise self.error(f'unsupported statement {token!r}')
+            while True:
+                kind, name = self.next()
+                if kind != 'name':
+                    raise self.error(f'expected a name, found {name!r}')
+                self.expect('=')
+                names[name] = self.value()
+                kind, token = self.next()
+                if token != ',':
+                    break
+            if kind is not None and token != ';':
+                # No semicolon: the token starts the next statement.
+                self.pos -= len(token)
+
+
+def parse_js_module(text):
+    """Return ``{name: value}`` for every top-level declaration in ``text``."""
+    return _Parser(text).module()
+
+
+def _cache_dir(cache_dir):
+    """Create (0700) and return the cache directory, or ``None`` if it is not private to this user."""
+    cache_dir = cache_dir or getattr(settings, 'JSDATA_CACHE_DIR', None)
+    if not cache_dir:
+        return None
+    try:
+        os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+        stat = os.stat(cache_dir)
+    except OSError:
+        return None
+    # Entries are trusted as catalog data, so nobody else may be able to plant one.
+    if hasattr(os, 'getuid') and (stat.st_uid != os.getuid() or stat.st_mode & 0o077):
+        return None
+    return cache_dir
+
+
+def load_js_data(path, cache_dir=None, use_cache=True):
+    """Parse the JS data module at ``path``, reusing a cached result for identical content."""
+    with open(path, 'rb') as fh:
+        raw = fh.read()
+    cache_dir = _cache_dir(cache_dir) if use_cache else None
+    if cache_dir is None:
+        return parse_js_module(raw.decode('utf-8-sig'))
+
+    prefix = 'jsdata-' + hashlib.sha256(os.path.abspath(path).encode('utf-8')).hexdigest()[:16] + '-'
+    cache_file = os.path.join(cache_dir, prefix + hashlib.sha256(raw).hexdigest() + '.json')
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as fh:
+            cached = json.load(fh)
+    except (OSError, ValueError):
+        cached = None
+    if cached and cached.get('format') == CACHE_FORMAT:
+        return cached['data']
+
+    data = parse_js_module(raw.decode('utf-8-sig'))
+    tmp = f'{cache_file}.{os.getpid()}.tmp'
+    try:
+        with os.fdopen(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w', encoding='utf-8') as fh:
+            json.dump({'format': CACHE_FORMAT, 'data': data}, fh, separators=(',', ':'))
+        os.replace(tmp, cache_file)
+        # Drop entries for earlier versions of the same source.
+        for name in os.listdir(cache_dir):
+            if name.startswith(prefix) and name.endswith('.json') and name != os.path.basename(cache_file):
+                os.remove(os.path.join(cache_dir, name))
+    except OSError:
+        # The cache is an optimisation; a read-only cache dir is not an error.
+        pass
+    return data
+
+
+def iter_records(data):
+    """Yield ``(kind, record)`` pairs from parsed module data, like ``iter_feed``."""
+    for name, kind in KINDS.items():
+        for record in data.get(name) or ():
+            yield kind, record
+
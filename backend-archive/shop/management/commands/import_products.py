@@ -1,17 +1,31 @@
 import os
 from django.core.management.base import BaseCommand
 from django.conf import settings
-from shop.models import Product, Tutorial, Service
+from shop.feeds import KINDS, NDJSON_EXTENSIONS, FeedError, iter_feed
+from shop.importing import CatalogImporter
+from shop.jsdata import JSDataError, iter_records, load_js_data
 
 # Note: js2py can have compatibility issues on some Python versions.
 # Import it inside the command and handle ImportError to avoid crashing Django at import time.
 
 
 class Command(BaseCommand):
-    help = 'Import products/tutorials/services from src/data/products.js'
+    help = 'Import products/tutorials/services from src/data/products.js, a JSON feed or an NDJSON feed'
 
     def add_arguments(self, parser):
         parser.add_argument('--source', type=str, default=os.path.join(settings.BASE_DIR, '..', 'src', 'data', 'products.js'))
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per bulk INSERT/UPDATE statement')
+        parser.add_argument('--incremental', action='store_true', help='Only write records whose content hash changed and delete records that left the feed')
+        parser.add_argument(
+            '--prune-absent-kinds', action='store_true',
+            help='With --incremental, also delete imported tutorials/services/products when the feed has none of that kind',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Report what would change without writing anything')
+        parser.add_argument(
+            '--parser', choices=('native', 'js2py', 'json'), default='native',
+            help='How to read a .js source: parse the literals natively (cached), evaluate it with js2py, or use the JSON file next to it',
+        )
+        parser.add_argument('--no-cache', action='store_true', help='Re-parse a .js source even if a cached parse is still valid')
 
     def handle(self, *args, **options):
         src = options['source']
@@ -19,130 +33,88 @@ class Command(BaseCommand):
             self.stderr.write(self.style.ERROR(f"Source file not found: {src}"))
             return
 
+        if src.lower().endswith(('.json',) + NDJSON_EXTENSIONS):
+            records = iter_feed(src)
+        else:
+            records = self.load_js(src, options['parser'], not options['no_cache'])
+        if records is None:
+            return
+
+        self.verbosity = options['verbosity']
+        importer = CatalogImporter(
+            batch_size=options['batch_size'],
+            incremental=options['incremental'],
+            dry_run=options['dry_run'],
+            prune_absent_kinds=options['prune_absent_kinds'],
+            progress=self.report_progress,
+        )
+        try:
+            stats = importer.run_stream(records)
+        except FeedError as e:
+            self.stderr.write(self.style.ERROR(f"Failed to parse feed {src}: {e}."))
+            return
+        if options['dry_run']:
+            for kind, action, key in stats.changes:
+                self.stdout.write(f"  {action:<6} {kind:<8} {key}")
+            self.stdout.write(stats.summary())
+            self.stdout.write(self.style.WARNING('Dry run: no changes were written.'))
+            return
+        self.stdout.write(stats.summary())
+        self.stdout.write(self.style.SUCCESS('Import complete.'))
+
+    def report_progress(self, kind, count, stats):
+        if self.verbosity >= 1:
+            self.stdout.write(f"  {kind}s: {count} read ({stats.rows_per_second:,.0f} rows/sec)")
+
+    def load_js(self, src, parser='native', use_cache=True):
+        """Read products.js with the chosen parser, falling back to the JSON feed next to it."""
+        if parser == 'native':
+            try:
+                data = load_js_data(src, use_cache=use_cache)
+            except (OSError, UnicodeError, JSDataError) as e:
+                self.stderr.write(self.style.WARNING(f"Failed to parse JS file: {e}. Trying JSON fallback."))
+            else:
+                self.report_counts(data)
+                return iter_records(data)
+        elif parser == 'js2py':
+            records = self.load_js2py(src)
+            if records is not None:
+                return records
+
+        # If the JS path didn't produce results, stream the JSON fallback instead
+        json_path = os.path.splitext(src)[0] + '.json'
+        if not os.path.exists(json_path):
+            json_path = os.path.join(settings.BASE_DIR, '..', 'src', 'data', 'products.json')
+
+        if not os.path.exists(json_path):
+            self.stderr.write(self.style.ERROR(f"Neither JS parsing nor JSON fallback found a data source (tried {json_path}). Skipping import."))
+            return None
+        self.stdout.write(self.style.SUCCESS(f"Streaming {json_path}"))
+        return iter_feed(json_path)
+
+    def load_js2py(self, src):
+        """Evaluate products.js with js2py; slow, kept for sources the native parser rejects."""
         with open(src, 'r', encoding='utf-8') as f:
             js_code = f.read()
 
-        # Try to import js2py at runtime; if unavailable or incompatible, fall back to a JSON source.
-        data = None
+        # Import js2py at runtime; if unavailable or incompatible, the caller falls back to JSON.
         try:
             import js2py
-            # Create an export object for easy retrieval
-            wrapper = js_code + '\nvar __EXPORT__ = { products: products, tutorials: tutorials, services: services }; __EXPORT__'
-            try:
-                res = js2py.eval_js(wrapper)
-                # Convert to Python-friendly structures
-                products = res['products'].to_list() if 'products' in res else []
-                tutorials = res['tutorials'].to_list() if 'tutorials' in res else []
-                services = res['services'].to_list() if 'services' in res else []
-            except Exception as e:
-                self.stderr.write(self.style.WARNING(f"Failed to parse JS file with js2py: {e}. Trying JSON fallback."))
-                products = tutorials = services = None
         except Exception as e:
             self.stderr.write(self.style.WARNING(f"js2py is not available or failed to import: {e}. Trying JSON fallback."))
-            products = tutorials = services = None
-
-        # If js2py path didn't produce results, attempt to load a JSON fallback
-        if products is None or tutorials is None or services is None:
-            import json
-            json_path = os.path.splitext(src)[0] + '.json'
-            if not os.path.exists(json_path):
-                json_path = os.path.join(settings.BASE_DIR, '..', 'src', 'data', 'products.json')
-
-            if not os.path.exists(json_path):
-                self.stderr.write(self.style.ERROR(f"Neither js2py parsing nor JSON fallback found a data source (tried {json_path}). Skipping import."))
-                return
-
-            with open(json_path, 'r', encoding='utf-8') as jf:
-                try:
-                    data = json.load(jf)
-                except Exception as e:
-                    self.stderr.write(self.style.ERROR(f"Failed to parse JSON file {json_path}: {e}."))
-                    return
-
-            products = data.get('products', [])
-            tutorials = data.get('tutorials', [])
-            services = data.get('services', [])
-
-        self.stdout.write(self.style.SUCCESS(f"Importing {len(products)} products, {len(tutorials)} tutorials, {len(services)} services"))
-
-        # Create/update products
-        id_map = {}
-        for p in products:
-            # p may be a dict (JSON) or js2py object — normalize to plain dict
-            if isinstance(p, dict):
-                pd = p
-            else:
-                try:
-                    pd = {k: p[k].to_python() for k in p.keys()}
-                except Exception:
-                    pd = dict(p)
-
-            prod, created = Product.objects.update_or_create(
-                name=pd.get('name', '')[:255],
-                defaults={
-                    'price': float(pd.get('price', 0)),
-                    'category': pd.get('category', ''),
-                    'image_url': pd.get('image', ''),
-                    'description': pd.get('description', ''),
-                    'specifications': pd.get('specifications', ''),
-                }
-            )
-            id_map[int(pd.get('id'))] = prod
-
-        # Second pass to handle related links
-        for p in products:
-            if isinstance(p, dict):
-                pd = p
-            else:
-                try:
-                    pd = {k: p[k].to_python() for k in p.keys()}
-                except Exception:
-                    pd = dict(p)
-
-            prod = id_map.get(int(pd.get('id')))
-            related_ids = pd.get('related', []) or []
-            prod.related.clear()
-            for rid in related_ids:
-                if int(rid) in id_map:
-                    prod.related.add(id_map[int(rid)])
-
-        # Tutorials
-        for t in tutorials:
-            if isinstance(t, dict):
-                td = t
-            else:
-                try:
-                    td = {k: t[k].to_python() for k in t.keys()}
-                except Exception:
-                    td = dict(t)
-
-            Tutorial.objects.update_or_create(
-                title=td.get('title', '')[:255],
-                defaults={
-                    'excerpt': td.get('excerpt', ''),
-                    'category': td.get('category', ''),
-                    'thumbnail': td.get('thumbnail', ''),
-                    'content': td.get('content', ''),
-                }
-            )
-
-        # Services
-        for s in services:
-            if isinstance(s, dict):
-                sd = s
-            else:
-                try:
-                    sd = {k: s[k].to_python() for k in s.keys()}
-                except Exception:
-                    sd = dict(s)
-
-            Service.objects.update_or_create(
-                title=sd.get('title', '')[:255],
-                defaults={
-                    'description': sd.get('description', ''),
-                    'icon': sd.get('icon', ''),
-                    'price': sd.get('price', ''),
-                }
-            )
-
-        self.stdout.write(self.style.SUCCESS('Import complete.'))
+            return None
+        # js2py does not understand ES modules; plain declarations are enough here.
+        js_code = js_code.replace('export const ', 'var ').replace('export let ', 'var ')
+        exports = ', '.join(f'{name}: typeof {name} === "undefined" ? [] : {name}' for name in KINDS)
+        try:
+            # to_dict() converts the whole tree to plain Python values in one go.
+            data = js2py.eval_js(f'{js_code}\n({{{exports}}})').to_dict()
+        except Exception as e:
+            self.stderr.write(self.style.WARNING(f"Failed to parse JS file with js2py: {e}. Trying JSON fallback."))
+            return None
+        self.report_counts(data)
+        return iter_records(data)
+
+    def report_counts(self, data):
+        products, tutorials, services = (len(data.get(name) or ()) for name in KINDS)
+        self.stdout.write(self.style.SUCCESS(f"Importing {products} products, {tutorials} tutorials, {services} services"))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from shop.search import missing_search_triggers, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Recreate the SQLite full-text sync triggers and refill the search index from the catalog'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Database alias to rebuild')
+        parser.add_argument('--check', action='store_true', help='Only report missing triggers; exit non-zero if any')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        missing = missing_search_triggers(using)
+        if options['check']:
+            if missing:
+                raise CommandError('Missing search triggers: ' + ', '.join(missing))
+            self.stdout.write(self.style.SUCCESS('Search triggers are in place.'))
+            return
+        if not rebuild_search_index(using):
+            self.stdout.write('Nothing to rebuild: this database keeps its search columns current itself.')
+            return
+        if missing:
+            self.stdout.write(f"Recreated triggers: {', '.join(missing)}")
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt.'))
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts import bootstrap
+from accounts.seeding import SEED_DOMAIN, UserSeeder, delete_seeded_users
+from shop.models import Product, Service, Tutorial
+from shop.seeding import CatalogSeeder, SeedStats
+
+
+class Command(BaseCommand):
+    help = 'Generate a deterministic synthetic catalog and user base in bulk, for scale and performance testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=1000, help='Products to create')
+        parser.add_argument('--tutorials', type=int, default=200, help='Tutorials to create')
+        parser.add_argument('--services', type=int, default=20, help='Services to create')
+        parser.add_argument('--users', type=int, default=1000, help=f'Users to create (emails userNNNNNNN@{SEED_DOMAIN})')
+        parser.add_argument('--related', type=int, default=4, help='Related-link offsets per product (each product gets twice as many neighbours)')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed; the same seed and volumes give the same rows')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk INSERT batch')
+        parser.add_argument('--legacy-ratio', type=float, default=0.8, help='Share of users with only a legacy bcrypt hash')
+        parser.add_argument('--hash-pool', type=int, default=8, help='Distinct password hashes reused across users')
+        parser.add_argument('--bcrypt-rounds', type=int, default=4, help='Cost factor of the pooled legacy bcrypt hashes')
+        parser.add_argument('--flush', action='store_true', help='Delete all products, tutorials and services first')
+
+    def handle(self, *args, **options):
+        if not 0 <= options['legacy_ratio'] <= 1:
+            raise CommandError('--legacy-ratio must be between 0 and 1')
+        if not 4 <= options['bcrypt_rounds'] <= 31:
+            raise CommandError('--bcrypt-rounds must be between 4 and 31')
+        self.verbosity = options['verbosity']
+
+        if options['flush']:
+            for model in (Product, Tutorial, Service):
+                deleted = model.objects.all().delete()[0]
+                self.stdout.write(f"Deleted {deleted} {model._meta.verbose_name_plural} rows (with dependents)")
+        if options['users']:
+            # Seeded users are always replaced, since their emails are fixed by index.
+            deleted = delete_seeded_users()
+            if deleted:
+                self.stdout.write(f"Deleted {deleted} previously seeded user rows (with dependents)")
+
+        stats = SeedStats()
+        CatalogSeeder(
+            seed=options['seed'], batch_size=options['batch_size'], related=options['related'],
+            progress=self.report_progress,
+        ).run(products=options['products'], tutorials=options['tutorials'], services=options['services'], stats=stats)
+        UserSeeder(
+            seed=options['seed'], batch_size=options['batch_size'], legacy_ratio=options['legacy_ratio'],
+            pool_size=options['hash_pool'], bcrypt_rounds=options['bcrypt_rounds'], progress=self.report_progress,
+        ).run(options['users'], stats)
+
+        bootstrap.mark(bootstrap.BENCH_DATABASE)
+
+        counts = ', '.join(f'{label}: {count}' for label, count in stats.counts.items())
+        self.stdout.write(f"Created {counts} in {stats.seconds:.2f}s ({stats.rows_per_second:,.0f} rows/sec)")
+        if options['users']:
+            self.stdout.write(f"Seeded users log in with seed-password-<n % {options['hash_pool']}> (user n = userNNNNNNN@{SEED_DOMAIN})")
+        self.stdout.write(self.style.SUCCESS('Seed complete.'))
+
+    def report_progress(self, label, done, total, stats):
+        if self.verbosity >= 2 or (self.verbosity >= 1 and done == total):
+            self.stdout.write(f"  {label}: {done}/{total} ({stats.rows_per_second:,.0f} rows/sec)")
@@ -0,0 +1,132 @@
+from django.db import migrations
+
+# The search index lives outside the ORM: an FTS5 table kept in sync by
+# triggers on SQLite, and generated tsvector columns with GIN indexes on
+# Postgres. See shop/search.py for the query side.
+#
+# On SQLite, FTS rowids are derived from the source row so triggers can
+# update/delete by rowid: products use id * 2, tutorials id * 2 + 1.
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE shop_search USING fts5(
+        title, category, body,
+        prefix='2 3 4',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER shop_product_search_ai AFTER INSERT ON shop_product BEGIN
+        INSERT INTO shop_search(rowid, title, category, body)
+        VALUES (new.id * 2, new.name, new.category, new.description || ' ' || new.specifications);
+    END
+    """,
+    """
+    CREATE TRIGGER shop_product_search_au
+    AFTER UPDATE OF name, category, description, specifications ON shop_product BEGIN
+        DELETE FROM shop_search WHERE rowid = old.id * 2;
+        INSERT INTO shop_search(rowid, title, category, body)
+        VALUES (new.id * 2, new.name, new.category, new.description || ' ' || new.specifications);
+    END
+    """,
+    """
+    CREATE TRIGGER shop_product_search_ad AFTER DELETE ON shop_product BEGIN
+        DELETE FROM shop_search WHERE rowid = old.id * 2;
+    END
+    """,
+    """
+    CREATE TRIGGER shop_tutorial_search_ai AFTER INSERT ON shop_tutorial BEGIN
+        INSERT INTO shop_search(rowid, title, category, body)
+        VALUES (new.id * 2 + 1, new.title, new.category, new.excerpt || ' ' || new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER shop_tutorial_search_au
+    AFTER UPDATE OF title, category, excerpt, content ON shop_tutorial BEGIN
+        DELETE FROM shop_search WHERE rowid = old.id * 2 + 1;
+        INSERT INTO shop_search(rowid, title, category, body)
+        VALUES (new.id * 2 + 1, new.title, new.category, new.excerpt || ' ' || new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER shop_tutorial_search_ad AFTER DELETE ON shop_tutorial BEGIN
+        DELETE FROM shop_search WHERE rowid = old.id * 2 + 1;
+    END
+    """,
+    """
+    INSERT INTO shop_search(rowid, title, category, body)
+    SELECT id * 2, name, category, description || ' ' || specifications FROM shop_product
+    """,
+    """
+    INSERT INTO shop_search(rowid, title, category, body)
+    SELECT id * 2 + 1, title, category, excerpt || ' ' || content FROM shop_tutorial
+    """,
+]
+
+SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS shop_product_search_ai',
+    'DROP TRIGGER IF EXISTS shop_product_search_au',
+    'DROP TRIGGER IF EXISTS shop_product_search_ad',
+    'DROP TRIGGER IF EXISTS shop_tutorial_search_ai',
+    'DROP TRIGGER IF EXISTS shop_tutorial_search_au',
+    'DROP TRIGGER IF EXISTS shop_tutorial_search_ad',
+    'DROP TABLE IF EXISTS shop_search',
+]
+
+POSTGRES_FORWARD = [
+    """
+    ALTER TABLE shop_product ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(category, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(description, '') || ' ' || coalesce(specifications, '')), 'C')
+    ) STORED
+    """,
+    'CREATE INDEX shop_product_search_idx ON shop_product USING GIN (search_vector)',
+    """
+    ALTER TABLE shop_tutorial ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(category, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(excerpt, '') || ' ' || coalesce(content, '')), 'C')
+    ) STORED
+    """,
+    'CREATE INDEX shop_tutorial_search_idx ON shop_tutorial USING GIN (search_vector)',
+]
+
+POSTGRES_BACKWARD = [
+    'DROP INDEX IF EXISTS shop_product_search_idx',
+    'ALTER TABLE shop_product DROP COLUMN IF EXISTS search_vector',
+    'DROP INDEX IF EXISTS shop_tutorial_search_idx',
+    'ALTER TABLE shop_tutorial DROP COLUMN IF EXISTS search_vector',
+]
+
+
+def _run(schema_editor, statements):
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _run(schema_editor, SQLITE_FORWARD)
+    elif vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_FORWARD)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _run(schema_editor, SQLITE_BACKWARD)
+    elif vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_BACKWARD)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shop', '0002_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -9,6 +9,16 @@ class Product(models.Model):
     description = models.TextField(blank=True)
     specifications = models.TextField(blank=True)
     related = models.ManyToManyField('self', blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        # Trailing `id` matches the keyset pagination key, (column, id).
+        indexes = [
+            models.Index(fields=['category', 'id'], name='shop_product_category_idx'),
+            models.Index(fields=['category', 'price', 'id'], name='shop_product_cat_price_idx'),
+            models.Index(fields=['price', 'id'], name='shop_product_price_idx'),
+            models.Index(fields=['name', 'id'], name='shop_product_name_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -20,6 +30,12 @@ class Tutorial(models.Model):
     category = models.CharField(max_length=100, blank=True)
     thumbnail = models.URLField(blank=True)
     content = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['category', 'id'], name='shop_tutorial_category_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -30,6 +46,28 @@ class Service(models.Model):
     description = models.TextField(blank=True)
     icon = models.CharField(max_length=100, blank=True)
     price = models.CharField(max_length=100, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return self.title
+
+
+class ImportFingerprint(models.Model):
+    """Content hash of the last imported version of a catalog record.
+
+    Lets ``import_products --incremental`` skip records that did not change
+    and delete rows that disappeared from the feed.
+    """
+
+    kind = models.CharField(max_length=20)
+    key = models.CharField(max_length=255)
+    digest = models.CharField(max_length=40)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'key'], name='shop_importfingerprint_kind_key_uniq'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind}:{self.key}'
@@ -0,0 +1,197 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Cursor (keyset) pagination over the primary key.
+
+    Each page is fetched with ``WHERE id > <last id> ORDER BY id LIMIT n+1``
+    (or the mirror image when walking backwards), so the cost of a page does
+    not depend on how deep into the catalog the client is. Cursors are opaque
+    base64 tokens; clients should only ever echo back the ``next`` and
+    ``previous`` links they were given.
+
+    Views may sort by another column through ``get_ordering()`` (e.g.
+    ``'-price'``); the key then becomes ``(column, id)``, with ``id`` breaking
+    ties so the order stays stable.
+
+    The total row count is a full ``COUNT(*)`` and is therefore off by default.
+    Pass ``?count=true`` (or set ``CATALOG_PAGINATION_INCLUDE_COUNT``) to get it.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    count_query_param = 'count'
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self):
+        self.page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE') or 24
+        self.include_count_default = getattr(settings, 'CATALOG_PAGINATION_INCLUDE_COUNT', False)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.limit = self.get_page_size(request)
+        self.ordering = self.get_ordering(view)
+        self.count = queryset.count() if self.wants_count(request) else None
+
+        cursor = self.decode_cursor(request)
+        if cursor is None:
+            forward, position = True, None
+        else:
+            forward, position = cursor
+
+        field, descending = self.split_ordering(self.ordering)
+        # Walking backwards is the same query with the sort flipped.
+        descending = descending != (not forward)
+        if field == 'pk':
+            qs = queryset.order_by('-pk' if descending else 'pk')
+        else:
+            prefix = '-' if descending else ''
+            qs = queryset.order_by(prefix + field, prefix + 'pk')
+        if position is not None:
+            qs = qs.filter(self.position_filter(field, descending, position))
+
+        rows = list(qs[:self.limit + 1])
+        has_more = len(rows) > self.limit
+        rows = rows[:self.limit]
+
+        if forward:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        else:
+            rows.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+
+        self.page = rows
+        return rows
+
+    def get_ordering(self, view):
+        getter = getattr(view, 'get_ordering', None)
+        return getter() if getter else 'pk'
+
+    @staticmethod
+    def split_ordering(ordering):
+        descending = ordering.startswith('-')
+        field = ordering.lstrip('-')
+        return ('pk' if field == 'id' else field), descending
+
+    @staticmethod
+    def position_filter(field, descending, position):
+        op = 'lt' if descending else 'gt'
+        pk, value = position
+        if field == 'pk':
+            return Q(**{f'pk__{op}': pk})
+        return Q(**{f'{field}__{op}': value}) | Q(**{field: value, f'pk__{op}': pk})
+
+    def get_page_size(self, request):
+        raw = request.query_params.get(self.page_size_query_param)
+        if raw:
+            try:
+                size = int(raw)
+            except ValueError:
+                size = 0
+            if size > 0:
+                return min(size, self.max_page_size)
+        return self.page_size
+
+    def wants_count(self, request):
+        raw = request.query_params.get(self.count_query_param)
+        if raw is None:
+            return self.include_count_default
+        return raw.lower() in ('1', 'true', 'yes')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            direction = payload['d']
+            position = (int(payload['k']), payload.get('v'))
+            ordering = payload.get('o', 'pk')
+        except (TypeError, ValueError, KeyError, AttributeError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        # A cursor only makes sense for the ordering it was issued under.
+        if direction not in ('next', 'prev') or ordering != self.ordering:
+            raise NotFound(self.invalid_cursor_message)
+        return direction == 'next', position
+
+    def encode_cursor(self, direction, row):
+        payload = {'d': direction, 'k': row.pk}
+        field, _ = self.split_ordering(self.ordering)
+        if self.ordering != 'pk':
+            payload['o'] = self.ordering
+        if field != 'pk':
+            payload['v'] = str(getattr(row, field))
+        encoded = base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor('next', self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor('prev', self.page[0])
+
+    def get_paginated_response(self, data):
+        body = OrderedDict()
+        if self.count is not None:
+            body['count'] = self.count
+        body['next'] = self.get_next_link()
+        body['previous'] = self.get_previous_link()
+        body['results'] = data
+        return Response(body)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {'type': 'integer', 'example': 123},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Opaque pagination cursor.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Number of results per page (max {self.max_page_size}).',
+                'schema': {'type': 'integer'},
+            },
+            {
+                'name': self.count_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Include the total row count.',
+                'schema': {'type': 'boolean'},
+            },
+        ]
@@ -0,0 +1,224 @@
+import re
+
+from django.db import connection, connections
+from django.db.models import Q
+
+from .models import Product, Tutorial
+
+KINDS = ('product', 'tutorial')
+MAX_TERMS = 8
+
+# SQLite sync triggers for the FTS5 table created by migration 0003. A later
+# migration that rebuilds shop_product or shop_tutorial (any AlterField on
+# SQLite) drops them with the old table, so they are recreated after every
+# migrate by ``ensure_search_triggers`` (see ``ShopConfig.ready``).
+SQLITE_TRIGGERS = {
+    'shop_product_search_ai': """
+        CREATE TRIGGER IF NOT EXISTS shop_product_search_ai AFTER INSERT ON shop_product BEGIN
+            INSERT INTO shop_search(rowid, title, category, body)
+            VALUES (new.id * 2, new.name, new.category, new.description || ' ' || new.specifications);
+        END
+    """,
+    'shop_product_search_au': """
+        CREATE TRIGGER IF NOT EXISTS shop_product_search_au
+        AFTER UPDATE OF name, category, description, specifications ON shop_product BEGIN
+            DELETE FROM shop_search WHERE rowid = old.id * 2;
+            INSERT INTO shop_search(rowid, title, category, body)
+            VALUES (new.id * 2, new.name, new.category, new.description || ' ' || new.specifications);
+        END
+    """,
+    'shop_product_search_ad': """
+        CREATE TRIGGER IF NOT EXISTS shop_product_search_ad AFTER DELETE ON shop_product BEGIN
+            DELETE FROM shop_search WHERE rowid = old.id * 2;
+        END
+    """,
+    'shop_tutorial_search_ai': """
+        CREATE TRIGGER IF NOT EXISTS shop_tutorial_search_ai AFTER INSERT ON shop_tutorial BEGIN
+            INSERT INTO shop_search(rowid, title, category, body)
+            VALUES (new.id * 2 + 1, new.title, new.category, new.excerpt || ' ' || new.content);
+        END
+    """,
+    'shop_tutorial_search_au': """
+        CREATE TRIGGER IF NOT EXISTS shop_tutorial_search_au
+        AFTER UPDATE OF title, category, excerpt, content ON shop_tutorial BEGIN
+            DELETE FROM shop_search WHERE rowid = old.id * 2 + 1;
+            INSERT INTO shop_search(rowid, title, category, body)
+            VALUES (new.id * 2 + 1, new.title, new.category, new.excerpt || ' ' || new.content);
+        END
+    """,
+    'shop_tutorial_search_ad': """
+        CREATE TRIGGER IF NOT EXISTS shop_tutorial_search_ad AFTER DELETE ON shop_tutorial BEGIN
+            DELETE FROM shop_search WHERE rowid = old.id * 2 + 1;
+        END
+    """,
+}
+SQLITE_REBUILD = [
+    'DELETE FROM shop_search',
+    """
+    INSERT INTO shop_search(rowid, title, category, body)
+    SELECT id * 2, name, category, description || ' ' || specifications FROM shop_product
+    """,
+    """
+    INSERT INTO shop_search(rowid, title, category, body)
+    SELECT id * 2 + 1, title, category, excerpt || ' ' || content FROM shop_tutorial
+    """,
+]
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(query):
+    return _TERM_RE.findall(query or '')[:MAX_TERMS]
+
+
+def search_catalog(query, kinds=KINDS, limit=20):
+    """Ranked full-text search over products and tutorials.
+
+    Every term must match; the last one is treated as a prefix so partial
+    input works for search-as-you-type. Returns a list of dicts with
+    ``type``, ``id``, ``title``, ``category``, ``snippet`` and ``score``
+    (higher is better), best match first.
+    """
+    terms = tokenize(query)
+    kinds = [kind for kind in kinds if kind in KINDS]
+    if not terms or not kinds:
+        return []
+    if connection.vendor == 'sqlite':
+        return _search_sqlite(terms, kinds, limit)
+    if connection.vendor == 'postgresql':
+        return _search_postgres(terms, kinds, limit)
+    return _search_fallback(terms, kinds, limit)
+
+
+def _search_sqlite(terms, kinds, limit):
+    # Quote every term so user input can never be read as FTS5 syntax.
+    match = ' '.join('"%s"' % term for term in terms) + '*'
+    sql = (
+        "SELECT rowid, title, category, "
+        "snippet(shop_search, 2, '<mark>', '</mark>', '…', 12), "
+        "bm25(shop_search, 10.0, 4.0, 1.0) AS rank "
+        "FROM shop_search WHERE shop_search MATCH %s"
+    )
+    params = [match]
+    if len(kinds) == 1:
+        sql += ' AND (rowid & 1) = %s'
+        params.append(0 if kinds[0] == 'product' else 1)
+    sql += ' ORDER BY rank LIMIT %s'
+    params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    return [
+        {
+            'type': 'tutorial' if rowid & 1 else 'product',
+            'id': rowid >> 1,
+            'title': title,
+            'category': category,
+            'snippet': snippet,
+            'score': round(-rank, 6),
+        }
+        for rowid, title, category, snippet, rank in rows
+    ]
+
+
+def _search_postgres(terms, kinds, limit):
+    tsquery = ' & '.join(term for term in terms) + ':*'
+    selects = []
+    if 'product' in kinds:
+        selects.append(
+            "SELECT 'product' AS kind, id, name AS title, category, description AS body, "
+            "ts_rank(search_vector, q) AS rank "
+            "FROM shop_product, to_tsquery('simple', %s) q WHERE search_vector @@ q"
+        )
+    if 'tutorial' in kinds:
+        selects.append(
+            "SELECT 'tutorial' AS kind, id, title, category, excerpt AS body, "
+            "ts_rank(search_vector, q) AS rank "
+            "FROM shop_tutorial, to_tsquery('simple', %s) q WHERE search_vector @@ q"
+        )
+    # Headlines are only built for the rows that survive the LIMIT.
+    sql = (
+        "SELECT kind, id, title, category, "
+        "ts_headline('simple', body, to_tsquery('simple', %s), "
+        "'StartSel=<mark>, StopSel=</mark>, MaxWords=24, MinWords=8'), rank "
+        "FROM (" + ' UNION ALL '.join(selects) + " ORDER BY rank DESC LIMIT %s) hits "
+        "ORDER BY rank DESC"
+    )
+    params = [tsquery] + [tsquery] * len(selects) + [limit]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    return [
+        {
+            'type': kind,
+            'id': pk,
+            'title': title,
+            'category': category,
+            'snippet': snippet,
+            'score': round(float(rank), 6),
+        }
+        for kind, pk, title, category, snippet, rank in rows
+    ]
+
+
+def _search_fallback(terms, kinds, limit):
+    """``icontains`` scan for databases without a native full-text index; covers the same columns."""
+    results = []
+    if 'product' in kinds:
+        condition = Q()
+        for term in terms:
+            condition &= (
+                Q(name__icontains=term) | Q(category__icontains=term)
+                | Q(description__icontains=term) | Q(specifications__icontains=term)
+            )
+        for pk, name, category in Product.objects.filter(condition).values_list('id', 'name', 'category')[:limit]:
+            results.append({'type': 'product', 'id': pk, 'title': name, 'category': category, 'snippet': '', 'score': 0.0})
+    if 'tutorial' in kinds:
+        condition = Q()
+        for term in terms:
+            condition &= (
+                Q(title__icontains=term) | Q(category__icontains=term)
+                | Q(excerpt__icontains=term) | Q(content__icontains=term)
+            )
+        for pk, title, category in Tutorial.objects.filter(condition).values_list('id', 'title', 'category')[:limit]:
+            results.append({'type': 'tutorial', 'id': pk, 'title': title, 'category': category, 'snippet': '', 'score': 0.0})
+    return results[:limit]
+
+
+def missing_search_triggers(using='default'):
+    """Names of SQLite sync triggers that are gone, or ``None`` when there is no FTS index to keep."""
+    conn = connections[using]
+    if conn.vendor != 'sqlite' or 'shop_search' not in conn.introspection.table_names():
+        return None
+    names = list(SQLITE_TRIGGERS)
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name IN (%s)" % ', '.join(['%s'] * len(names)),
+            names,
+        )
+        present = {name for (name,) in cursor.fetchall()}
+    return [name for name in SQLITE_TRIGGERS if name not in present]
+
+
+def ensure_search_triggers(using='default'):
+    """Recreate missing sync triggers and, if any were missing, rebuild the index; returns their names."""
+    missing = missing_search_triggers(using)
+    if missing:
+        rebuild_search_index(using)
+    return missing or []
+
+
+def rebuild_search_index(using='default'):
+    """Recreate the SQLite sync triggers and refill ``shop_search`` from the catalog tables."""
+    conn = connections[using]
+    if conn.vendor != 'sqlite':
+        # Postgres uses generated columns, which stay current on their own.
+        return False
+    with conn.cursor() as cursor:
+        for sql in list(SQLITE_TRIGGERS.values()) + SQLITE_REBUILD:
+            cursor.execute(sql)
+    return True
+
+
+def search_index_post_migrate(sender, using='default', **kwargs):
+    ensure_search_triggers(using)
@@ -0,0 +1,185 @@
+"""Deterministic synthetic catalog for scale testing (``seed_data``).
+
+Every value comes from one ``random.Random(seed)``, so a seed and a set of
+volumes always produce the same rows. Rows are built in batches and written
+with ``bulk_create``. Only primary keys are kept between batches (an ``array``
+of 8-byte ints), so memory stays flat at a million products.
+
+The ``related`` graph is circulant. A fixed set of ``k`` distinct offsets is
+drawn from the seed, all below ``n / 2``, and product ``i`` links to
+``i + offset (mod n)`` in both directions. Every product then has exactly
+``2k`` neighbours spread across the catalog. No two offsets can yield the
+same pair, so the through rows can be streamed without a global
+duplicate check.
+"""
+import random
+import time
+from array import array
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .cache import invalidate
+from .models import Product, Service, Tutorial
+
+CATEGORIES = [
+    'Arduino', 'Raspberry Pi', 'Sensors', 'Motors', 'Power', 'Displays', 'Robotics Kits',
+    'DIY Kits', 'Wireless', 'Tools', 'Cables', 'Components',
+]
+ADJECTIVES = [
+    'Compact', 'Smart', 'Industrial', 'Mini', 'Pro', 'Rugged', 'Precision', 'Solar', 'Wireless', 'Dual',
+    'Modular', 'Low-Power', 'High-Torque', 'Digital', 'Analog', 'Programmable',
+]
+NOUNS = [
+    'Relay Board', 'Servo', 'Stepper Driver', 'Sensor Kit', 'Controller', 'Display', 'Motor', 'Battery Pack',
+    'Breadboard', 'Camera Module', 'GPS Module', 'Buck Converter', 'Robot Chassis', 'Keypad', 'Encoder', 'Shield',
+]
+WORDS = (
+    'automation voltage current sensor board module pin signal motor speed torque control power supply circuit '
+    'wireless bluetooth wifi serial interface microcontroller firmware library project beginner advanced kit '
+    'robot arm wheel chassis battery charge solar panel display screen pixel led light sound buzzer relay '
+    'switch input output analog digital temperature humidity pressure distance ultrasonic infrared camera'
+).split()
+TOPICS = ['Getting Started', 'Wiring', 'Programming', 'Troubleshooting', 'Projects', 'Power Management']
+SERVICE_NAMES = ['Installation', 'Repair', 'Consulting', 'Training', 'Prototyping', 'Maintenance', 'Design', 'Audit']
+
+
+def sentence(rng, words=12):
+    text = ' '.join(rng.choices(WORDS, k=words))
+    return text[0].upper() + text[1:] + '.'
+
+
+def paragraph(rng, sentences=3):
+    return ' '.join(sentence(rng, rng.randint(8, 16)) for _ in range(sentences))
+
+
+def circulant_offsets(rng, n, k):
+    """``k`` distinct offsets in ``[1, n / 2)``, so no two produce the same undirected edge."""
+    limit = (n - 1) // 2
+    return sorted(rng.sample(range(1, limit + 1), min(k, limit))) if limit > 0 else []
+
+
+class SeedStats:
+    def __init__(self):
+        self.counts = {}
+        self.started = time.perf_counter()
+        self.finished = None
+
+    @property
+    def rows(self):
+        return sum(self.counts.values())
+
+    @property
+    def seconds(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def add(self, label, count):
+        self.counts[label] = self.counts.get(label, 0) + count
+
+
+class CatalogSeeder:
+    """Generate ``products``/``tutorials``/``services`` rows plus ``related`` links.
+
+    ``related`` is the number of offsets per product, so each product ends up
+    with ``2 * related`` neighbours. ``progress(label, done, total, stats)`` is
+    called after every batch. Like ``CatalogImporter``, bulk writes skip model
+    signals, so ``updated_at`` is stamped here and the catalog cache versions
+    are bumped once at the end.
+    """
+
+    def __init__(self, seed=1, batch_size=5000, related=4, progress=None):
+        self.seed = seed
+        self.batch_size = batch_size
+        self.related = related
+        self.progress = progress
+
+    def run(self, products=0, tutorials=0, services=0, stats=None):
+        stats = stats or SeedStats()
+        rng = random.Random(self.seed)
+        self.now = timezone.now()
+        with transaction.atomic():
+            pks = self.write(Product, 'products', products, self.product, rng, stats)
+            self.link(pks, rng, stats)
+            self.write(Tutorial, 'tutorials', tutorials, self.tutorial, rng, stats)
+            self.write(Service, 'services', services, self.service, rng, stats)
+            if products or tutorials or services:
+                invalidate(Product, Tutorial, Service)
+        stats.finished = time.perf_counter()
+        return stats
+
+    def write(self, model, label, total, build, rng, stats):
+        pks = array('q')
+        for start in range(0, total, self.batch_size):
+            batch = [build(rng, i) for i in range(start, min(start + self.batch_size, total))]
+            model.objects.bulk_create(batch, batch_size=self.batch_size)
+            pks.extend(obj.pk for obj in batch)
+            stats.add(label, len(batch))
+            if self.progress:
+                self.progress(label, start + len(batch), total, stats)
+        return pks
+
+    def product(self, rng, i):
+        category = CATEGORIES[i % len(CATEGORIES)]
+        return Product(
+            name=f'{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {i:07d}',
+            price=Decimal(rng.randint(100, 5_000_000)) / 100,
+            category=category,
+            image_url=f'https://example.com/img/products/{i % 500}.jpg',
+            description=paragraph(rng, rng.randint(2, 4)),
+            specifications='; '.join(f'{rng.choice(WORDS)}: {rng.randint(1, 240)}' for _ in range(4)),
+            updated_at=self.now,
+        )
+
+    def tutorial(self, rng, i):
+        topic = TOPICS[i % len(TOPICS)]
+        return Tutorial(
+            title=f'{topic}: {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {i:07d}',
+            excerpt=sentence(rng, 14),
+            category=topic,
+            thumbnail=f'https://example.com/img/tutorials/{i % 200}.jpg',
+            content=paragraph(rng, rng.randint(4, 8)),
+            updated_at=self.now,
+        )
+
+    def service(self, rng, i):
+        return Service(
+            title=f'{SERVICE_NAMES[i % len(SERVICE_NAMES)]} {i:06d}',
+            description=paragraph(rng, 2),
+            icon=f'icon-{i % 24}',
+            price=f'From KSh {rng.randint(10, 500) * 100:,}',
+            updated_at=self.now,
+        )
+
+    def link(self, pks, rng, stats):
+        # Link rows go straight to executemany: building millions of through-model
+        # instances would cost more than the INSERTs themselves.
+        through = Product.related.through
+        qn = connection.ops.quote_name
+        sql = 'INSERT INTO {} ({}, {}) VALUES (%s, %s)'.format(
+            qn(through._meta.db_table),
+            qn(through._meta.get_field('from_product').column),
+            qn(through._meta.get_field('to_product').column),
+        )
+        n = len(pks)
+        offsets = circulant_offsets(rng, n, self.related)
+        total = 2 * n * len(offsets)
+        rows, done = [], 0
+        with connection.cursor() as cursor:
+            for i in range(n):
+                src = pks[i]
+                for offset in offsets:
+                    dst = pks[(i + offset) % n]
+                    rows.append((src, dst))
+                    rows.append((dst, src))
+                if len(rows) >= self.batch_size or i == n - 1:
+                    cursor.executemany(sql, rows)
+                    done += len(rows)
+                    stats.add('related links', len(rows))
+                    rows = []
+                    if self.progress:
+                        self.progress('related links', done, total, stats)
@@ -2,21 +2,57 @@ from rest_framework import serializers
 from .models import Product, Tutorial, Service
 
 
-class ProductSerializer(serializers.ModelSerializer):
+def requested_expansions(request):
+    """Return the set of relations named in ``?expand=a,b`` for this request."""
+    if request is None:
+        return set()
+    raw = request.query_params.get('expand', '')
+    return {name.strip() for name in raw.split(',') if name.strip()}
+
+
+class SparseFieldsetMixin:
+    """Trim the output to ``context['fields']`` when the view selected a subset."""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selected = self.context.get('fields')
+        if selected is None:
+            return fields
+        return {name: field for name, field in fields.items() if name in selected}
+
+
+class ProductSummarySerializer(serializers.ModelSerializer):
+    """Compact product shape used when embedding related products."""
+
+    class Meta:
+        model = Product
+        fields = ['id', 'name', 'price', 'image_url']
+        read_only_fields = fields
+
+
+class ProductSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     related = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
 
     class Meta:
         model = Product
         fields = ['id', 'name', 'price', 'category', 'image_url', 'description', 'specifications', 'related']
+        # What a grid/card needs; the default for the product list endpoint.
+        card_fields = ['id', 'name', 'price', 'category', 'image_url']
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if 'related' in fields and 'related' in requested_expansions(self.context.get('request')):
+            fields['related'] = ProductSummarySerializer(many=True, read_only=True)
+        return fields
 
 
-class TutorialSerializer(serializers.ModelSerializer):
+class TutorialSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Tutorial
         fields = ['id', 'title', 'excerpt', 'category', 'thumbnail', 'content']
 
 
-class ServiceSerializer(serializers.ModelSerializer):
+class ServiceSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Service
         fields = ['id', 'title', 'description', 'icon', 'price']
@@ -0,0 +1,30 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import invalidate
+from .models import Product, Service, Tutorial
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Tutorial)
+@receiver(post_save, sender=Service)
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Tutorial)
+@receiver(post_delete, sender=Service)
+def catalog_row_changed(sender, **kwargs):
+    invalidate(sender)
+
+
+@receiver(m2m_changed, sender=Product.related.through)
+def product_related_changed(sender, instance, action, pk_set=None, **kwargs):
+    # `related` is symmetrical, so both ends of every link changed shape. Touch
+    # their updated_at so ETags/Last-Modified move along with the response.
+    if action == 'pre_clear':
+        instance._cleared_related_ids = set(instance.related.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    touched = {instance.pk} | set(pk_set or ()) | getattr(instance, '_cleared_related_ids', set())
+    Product.objects.filter(pk__in=touched).update(updated_at=timezone.now())
+    invalidate(Product)
@@ -0,0 +1,557 @@
+import json
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.apps import apps
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models.signals import post_migrate
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts import bootstrap
+from accounts.models import User
+
+from . import cache as cache_module, search
+from .cache import cache_stats, get_cache, get_version, reset_cache_stats
+from .feeds import FeedError, iter_json_feed, iter_ndjson_feed
+from .importing import CatalogImporter
+from .jsdata import JSDataError, load_js_data, parse_js_module
+from .models import Product, Service, Tutorial
+from .seeding import CatalogSeeder
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        for i in range(7):
+            Product.objects.create(name=f'Product {i}', price='10.00', category='DIY Kits')
+
+    def test_walks_forward_and_back_with_cursors(self):
+        url = reverse('products')
+        first = self.client.get(url, {'page_size': 3}).json()
+        self.assertEqual(len(first['results']), 3)
+        self.assertIsNone(first['previous'])
+        self.assertNotIn('count', first)
+
+        second = self.client.get(first['next']).json()
+        self.assertEqual([p['name'] for p in second['results']], ['Product 3', 'Product 4', 'Product 5'])
+
+        back = self.client.get(second['previous']).json()
+        self.assertEqual(back['results'], first['results'])
+
+        last = self.client.get(second['next']).json()
+        self.assertEqual(len(last['results']), 1)
+        self.assertIsNone(last['next'])
+
+    def test_optional_total_count(self):
+        res = self.client.get(reverse('products'), {'count': 'true', 'page_size': 2}).json()
+        self.assertEqual(res['count'], 7)
+
+    def test_garbage_cursor_is_404(self):
+        res = self.client.get(reverse('products'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(res.status_code, 404)
+
+
+class ProductRelatedQueryTests(TestCase):
+    def make_catalog(self, n):
+        products = [Product.objects.create(name=f'Item {i}', price='5.00') for i in range(n)]
+        for i, product in enumerate(products):
+            product.related.add(*products[max(0, i - 3):i])
+        return products
+
+    def test_list_query_count_is_independent_of_size(self):
+        # validators aggregate + page + one batched prefetch for `related`
+        self.make_catalog(3)
+        with self.assertNumQueries(3):
+            small = self.client.get(reverse('products'), {'view': 'full'}).json()
+        self.make_catalog(15)
+        with self.assertNumQueries(3):
+            large = self.client.get(reverse('products'), {'view': 'full'}).json()
+        self.assertEqual(len(small['results']), 3)
+        self.assertEqual(len(large['results']), 18)
+        self.assertEqual(sorted(large['results'][1]['related']), [large['results'][0]['id'], large['results'][2]['id']])
+
+    def test_expand_related_embeds_summaries(self):
+        self.make_catalog(4)
+        with self.assertNumQueries(3):
+            res = self.client.get(reverse('products'), {'fields': 'related', 'expand': 'related'}).json()
+        related = res['results'][0]['related']
+        self.assertEqual(set(related[0]), {'id', 'name', 'price', 'image_url'})
+
+
+class CatalogCacheTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        reset_cache_stats()
+        self.product = Product.objects.create(name='Cached', price='1.00')
+
+    def test_second_read_is_served_from_cache(self):
+        first = self.client.get(reverse('products'))
+        self.assertEqual(first['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse('products'))
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(cache_stats(), {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
+
+    def test_writes_invalidate_only_their_model(self):
+        self.client.get(reverse('products'))
+        self.client.get('/api/tutorials/')
+        Tutorial.objects.create(title='New tutorial')
+        self.assertEqual(self.client.get(reverse('products'))['X-Cache'], 'HIT')
+        self.assertEqual(self.client.get('/api/tutorials/')['X-Cache'], 'MISS')
+
+    def test_related_changes_invalidate_products(self):
+        other = Product.objects.create(name='Other', price='2.00')
+        self.client.get(reverse('products'), {'fields': 'related'})
+        self.product.related.add(other)
+        res = self.client.get(reverse('products'), {'fields': 'related'})
+        self.assertEqual(res['X-Cache'], 'MISS')
+        self.assertEqual(res.json()['results'][0]['related'], [other.pk])
+
+    @override_settings(DATABASE_REPLICA_ALIASES=['replica1'], REPLICA_PIN_SECONDS=5)
+    def test_replica_lag_bump_is_one_timer_per_model(self):
+        with mock.patch('shop.cache.threading.Timer') as timer, self.captureOnCommitCallbacks(execute=True):
+            for i in range(20):
+                Product.objects.create(name=f'Bulk {i}', price='1.00')
+        self.assertEqual(timer.call_count, 1)
+        version = get_version(Product)
+        # The timer re-arms while writes keep pushing the deadline back, then bumps once.
+        with mock.patch('shop.cache.time.monotonic', return_value=0.0), mock.patch('shop.cache._start_timer') as rearm:
+            cache_module._fire_delayed(Product)
+        rearm.assert_called_once()
+        with mock.patch('shop.cache.time.monotonic', return_value=float('inf')):
+            cache_module._fire_delayed(Product)
+        self.assertEqual(get_version(Product), version + 1)
+        self.assertNotIn(Product, cache_module._delayed)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.product = Product.objects.create(name='Tagged', price='3.00')
+
+    def test_list_revalidates_with_etag(self):
+        first = self.client.get(reverse('products'))
+        self.assertTrue(first['ETag'].startswith('"'))
+        self.assertIn('Last-Modified', first)
+        with self.assertNumQueries(0):
+            again = self.client.get(reverse('products'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(again.content, b'')
+
+    def test_last_modified_short_circuits(self):
+        first = self.client.get(reverse('products'))
+        again = self.client.get(reverse('products'), HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+        self.assertEqual(again.status_code, 304)
+
+    def test_writes_change_the_etag(self):
+        first = self.client.get(reverse('products'))
+        self.product.related.add(Product.objects.create(name='Linked', price='1.00'))
+        again = self.client.get(reverse('products'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 200)
+        self.assertNotEqual(again['ETag'], first['ETag'])
+
+    def test_detail_etag(self):
+        user = User.objects.create_user(email='etag@example.com', username='etag@example.com', password='pass123')
+        auth = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(user).access_token}'}
+        url = f'/api/products/{self.product.pk}/'
+        first = self.client.get(url, **auth)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'], **auth).status_code, 304)
+        self.product.name = 'Renamed'
+        self.product.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'], **auth).status_code, 200)
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        Product.objects.create(name='Card', price='4.00', category='Kits', description='x' * 5000, specifications='y' * 5000)
+
+    def test_list_defaults_to_card_representation(self):
+        with self.assertNumQueries(2) as ctx:
+            res = self.client.get(reverse('products')).json()
+        self.assertEqual(set(res['results'][0]), {'id', 'name', 'price', 'category', 'image_url'})
+        self.assertNotIn('description', ctx.captured_queries[-1]['sql'])
+
+    def test_fields_parameter_selects_columns(self):
+        res = self.client.get(reverse('products'), {'fields': 'name,description'}).json()
+        self.assertEqual(set(res['results'][0]), {'id', 'name', 'description'})
+        full = self.client.get(reverse('products'), {'view': 'full'}).json()
+        self.assertIn('specifications', full['results'][0])
+
+    def test_unknown_field_is_rejected(self):
+        res = self.client.get(reverse('products'), {'fields': 'name,secret'})
+        self.assertEqual(res.status_code, 400)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.uno = Product.objects.create(name='Arduino UNO Starter Kit', price='60.00', category='DIY Kits',
+                                          description='Complete starter kit', specifications='ATmega328P, USB')
+        Product.objects.create(name='Raspberry Pi 4', price='85.00', category='DIY Kits', description='Single-board computer')
+        self.tutorial = Tutorial.objects.create(title='Getting started with Arduino', category='Basics',
+                                                excerpt='Blink an LED', content='Wire the LED to pin 13')
+
+    def search(self, **params):
+        return self.client.get(reverse('search'), params).json()['results']
+
+    def test_ranked_results_across_types(self):
+        hits = self.search(q='arduino')
+        self.assertEqual({(h['type'], h['id']) for h in hits}, {('product', self.uno.pk), ('tutorial', self.tutorial.pk)})
+        self.assertGreaterEqual(hits[0]['score'], hits[-1]['score'])
+
+    def test_prefix_and_type_filter(self):
+        hits = self.search(q='atmega3', type='product')
+        self.assertEqual([h['id'] for h in hits], [self.uno.pk])
+        self.assertEqual(self.search(q='ardu', type='tutorial')[0]['id'], self.tutorial.pk)
+
+    def test_index_follows_writes(self):
+        self.uno.name = 'Genuino Board'
+        self.uno.save()
+        self.assertEqual(self.search(q='genuino')[0]['id'], self.uno.pk)
+        self.tutorial.delete()
+        self.assertEqual(self.search(q='blink'), [])
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.assertEqual(self.search(q='"OR NOT ('), [])
+
+
+class SearchIndexMaintenanceTests(TestCase):
+    def search(self, q):
+        return [h['id'] for h in self.client.get(reverse('search'), {'q': q}).json()['results']]
+
+    def test_dropped_triggers_are_restored_after_migrate(self):
+        # What a table rebuild in a later SQLite migration does to them.
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TRIGGER shop_product_search_ai')
+        stale = Product.objects.create(name='Orphan Sensor', price='1.00')
+        self.assertEqual(self.search('orphan'), [])
+        with self.assertRaisesMessage(CommandError, 'shop_product_search_ai'):
+            call_command('rebuild_search_index', check=True, stdout=StringIO())
+
+        post_migrate.send(sender=apps.get_app_config('shop'), app_config=apps.get_app_config('shop'), using='default')
+        self.assertEqual(self.search('orphan'), [stale.pk])
+        fresh = Product.objects.create(name='Orphan Relay', price='1.00')
+        self.assertEqual(sorted(self.search('orphan')), sorted([stale.pk, fresh.pk]))
+        call_command('rebuild_search_index', check=True, stdout=StringIO())
+
+    def test_command_rebuilds(self):
+        product = Product.objects.create(name='Rebuilt Servo', price='1.00')
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM shop_search')
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('Search index rebuilt.', out.getvalue())
+        self.assertEqual(self.search('servo'), [product.pk])
+
+    def test_fallback_covers_the_indexed_columns(self):
+        product = Product.objects.create(name='Board', price='1.00', specifications='ATmega328P')
+        tutorial = Tutorial.objects.create(title='Wiring', content='Solder the header pins')
+        self.assertEqual([h['id'] for h in search._search_fallback(['atmega'], ['product'], 5)], [product.pk])
+        self.assertEqual([h['id'] for h in search._search_fallback(['solder'], ['tutorial'], 5)], [tutorial.pk])
+
+
+class CatalogFilterTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        prices = [('Kits', '30.00'), ('Kits', '10.00'), ('Sensors', '20.00'), ('Sensors', '10.00'), ('Modules', '50.00')]
+        for i, (category, price) in enumerate(prices):
+            Product.objects.create(name=f'P{i}', price=price, category=category)
+
+    def names(self, **params):
+        return [p['name'] for p in self.client.get(reverse('products'), params).json()['results']]
+
+    def test_category_and_price_filters(self):
+        self.assertEqual(self.names(category='Kits'), ['P0', 'P1'])
+        self.assertEqual(self.names(category='Kits,Modules', min_price='20'), ['P0', 'P4'])
+        self.assertEqual(self.names(max_price='10'), ['P1', 'P3'])
+        self.assertEqual(self.client.get(reverse('products'), {'min_price': 'abc'}).status_code, 400)
+
+    def test_ordering_pages_on_column_then_id(self):
+        first = self.client.get(reverse('products'), {'ordering': '-price', 'page_size': 2}).json()
+        self.assertEqual([p['name'] for p in first['results']], ['P4', 'P0'])
+        second = self.client.get(first['next']).json()
+        self.assertEqual([p['name'] for p in second['results']], ['P2', 'P3'])
+        third = self.client.get(second['next']).json()
+        self.assertEqual([p['name'] for p in third['results']], ['P1'])
+        back = self.client.get(third['previous']).json()
+        self.assertEqual(back['results'], second['results'])
+
+    def test_cursor_is_bound_to_its_ordering(self):
+        first = self.client.get(reverse('products'), {'ordering': 'price', 'page_size': 2}).json()
+        cursor = first['next'].split('cursor=')[1].split('&')[0]
+        res = self.client.get(reverse('products'), {'ordering': 'name', 'cursor': cursor})
+        self.assertEqual(res.status_code, 404)
+        self.assertEqual(self.client.get(reverse('products'), {'ordering': 'description'}).status_code, 400)
+
+    def test_facets_use_a_single_group_by(self):
+        with self.assertNumQueries(1):
+            res = self.client.get(reverse('product_facets'), {'category': 'Kits', 'min_price': '15'}).json()
+        self.assertEqual(res['categories'], [
+            {'category': 'Kits', 'count': 1},
+            {'category': 'Modules', 'count': 1},
+            {'category': 'Sensors', 'count': 1},
+        ])
+
+
+def make_feed(n_products, price=10):
+    products = [
+        {'id': i, 'name': f'Feed {i}', 'price': price, 'category': 'Kits', 'image': '', 'description': 'd',
+         'specifications': 's', 'related': [j for j in (i - 1, i + 1) if 1 <= j <= n_products]}
+        for i in range(1, n_products + 1)
+    ]
+    tutorials = [{'id': 1, 'title': 'Intro', 'excerpt': 'e', 'category': 'Basics', 'content': 'c'}]
+    services = [{'id': 1, 'title': 'Repairs', 'description': 'd', 'icon': 'wrench', 'price': 'From 500'}]
+    return products, tutorials, services
+
+
+class CatalogImporterTests(TestCase):
+    def test_upserts_by_natural_key_and_rewrites_links(self):
+        CatalogImporter().run(*make_feed(3))
+        products, tutorials, services = make_feed(3, price=12)
+        products[1]['related'] = [1]
+        products[2]['related'] = []
+        stats = CatalogImporter().run(products, tutorials, services)
+
+        self.assertEqual(stats.created, {'products': 0, 'tutorials': 0, 'services': 0})
+        self.assertEqual(stats.updated, {'products': 3, 'tutorials': 1, 'services': 1})
+        self.assertEqual(Product.objects.count(), 3)
+        self.assertEqual(set(Product.objects.values_list('price', flat=True)), {Decimal('12.00')})
+        first, second, third = Product.objects.order_by('name')
+        self.assertEqual(list(first.related.all()), [second])
+        # `related` is symmetrical: the 2 <-> 3 link is gone from both ends
+        self.assertEqual(list(second.related.all()), [first])
+        self.assertEqual(list(third.related.all()), [])
+
+    def test_query_count_does_not_grow_with_feed_size(self):
+        def queries_for(n):
+            Product.objects.all().delete()
+            with CaptureQueriesContext(connection) as ctx:
+                CatalogImporter(batch_size=1000).run(*make_feed(n))
+            return len(ctx)
+
+        # (kept under SQLite's bind-parameter limit so batches are not split)
+        self.assertEqual(queries_for(5), queries_for(60))
+
+    def test_management_command_reads_json_feed(self):
+        products, tutorials, services = make_feed(2)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'products.json')
+            with open(path, 'w', encoding='utf-8') as fh:
+                json.dump({'products': products, 'tutorials': tutorials, 'services': services}, fh)
+            out = StringIO()
+            call_command('import_products', source=path, stdout=out, stderr=StringIO())
+        self.assertIn('rows/sec', out.getvalue())
+        self.assertEqual(Product.objects.count(), 2)
+        self.assertEqual(Service.objects.get().icon, 'wrench')
+
+
+class IncrementalImportTests(TestCase):
+    def test_unchanged_feed_is_a_no_op(self):
+        CatalogImporter().run(*make_feed(20))
+        with CaptureQueriesContext(connection) as ctx:
+            stats = CatalogImporter(incremental=True).run(*make_feed(20))
+        self.assertEqual(stats.rows, 0)
+        self.assertEqual(stats.unchanged, {'products': 20, 'tutorials': 1, 'services': 1})
+        self.assertFalse([q for q in ctx.captured_queries if not q['sql'].startswith(('SELECT', 'SAVEPOINT', 'RELEASE'))])
+
+    def test_only_changed_rows_and_edges_are_written(self):
+        CatalogImporter().run(*make_feed(5))
+        products, tutorials, services = make_feed(5)
+        products[0]['description'] = 'changed'
+        products[3]['related'] = [3]
+        del products[4]
+        before = dict(Product.objects.values_list('name', 'updated_at'))
+        stats = CatalogImporter(incremental=True).run(products, tutorials, services)
+
+        self.assertEqual(stats.updated['products'], 2)
+        self.assertEqual(stats.deleted['products'], 1)
+        self.assertEqual(stats.unchanged['products'], 2)
+        self.assertFalse(Product.objects.filter(name='Feed 5').exists())
+        after = dict(Product.objects.values_list('name', 'updated_at'))
+        self.assertEqual(after['Feed 2'], before['Feed 2'])
+        self.assertEqual(sorted(Product.objects.get(name='Feed 4').related.values_list('name', flat=True)), ['Feed 3'])
+
+    def test_feed_without_a_kind_leaves_that_kind_alone(self):
+        CatalogImporter().run(*make_feed(3))
+        products, _, _ = make_feed(3)
+        stats = CatalogImporter(incremental=True).run(products, [], [])
+        self.assertEqual(stats.deleted, {'products': 0})
+        self.assertEqual((Tutorial.objects.count(), Service.objects.count()), (1, 1))
+
+        stats = CatalogImporter(incremental=True, prune_absent_kinds=True).run(products, [], [])
+        self.assertEqual(stats.deleted, {'products': 0, 'tutorials': 1, 'services': 1})
+        self.assertEqual((Tutorial.objects.count(), Service.objects.count()), (0, 0))
+
+    def test_dry_run_reports_without_writing(self):
+        CatalogImporter().run(*make_feed(3))
+        products, tutorials, services = make_feed(3)
+        products[1]['name'] = 'Renamed'
+        stats = CatalogImporter(incremental=True, dry_run=True).run(products, tutorials, services)
+        self.assertIn(('product', 'create', 'Renamed'), stats.changes)
+        self.assertIn(('product', 'delete', 'Feed 2'), stats.changes)
+        self.assertTrue(Product.objects.filter(name='Feed 2').exists())
+        self.assertFalse(Product.objects.filter(name='Renamed').exists())
+
+
+class StreamingFeedTests(TestCase):
+    def test_json_feed_streams_across_chunk_boundaries(self):
+        products, tutorials, services = make_feed(4)
+        products[0]['price'] = 1234567
+        document = json.dumps({'meta': {'skip': [1, 2, {'deep': True}]}, 'products': products,
+                               'version': 12345, 'tutorials': tutorials, 'services': services}, indent=1)
+        records = list(iter_json_feed(StringIO(document), chunk_size=7))
+        self.assertEqual([kind for kind, _ in records], ['product'] * 4 + ['tutorial', 'service'])
+        self.assertEqual(records[0][1], products[0])
+
+    def test_truncated_json_feed_raises(self):
+        with self.assertRaises(FeedError):
+            list(iter_json_feed(StringIO('{"products": [{"name": "a"}, {"name": '), chunk_size=4))
+
+    def test_non_object_records_raise(self):
+        with self.assertRaisesMessage(FeedError, 'products[1]: expected an object, got int'):
+            list(iter_json_feed(StringIO('{"products": [{"name": "a"}, 1]}')))
+        with self.assertRaisesMessage(FeedError, 'Line 2: expected an object, got list'):
+            list(iter_ndjson_feed(StringIO('{"type": "product", "name": "a"}\n[1]\n')))
+        with self.assertRaisesMessage(FeedError, 'Line 1: expected an object, got str'):
+            list(iter_ndjson_feed(StringIO('"x"\n')))
+
+    def test_malformed_element_stops_at_the_value_size_cap(self):
+        head = '{"products": [{"name": "a"}, '
+        fh = StringIO(head + '{"name" "b"}, ' + '{"name": "c"}, ' * 1000 + '{}]}')
+        with self.assertRaisesMessage(FeedError, f'offset {len(head)}'):
+            list(iter_json_feed(fh, chunk_size=16, max_value_size=64))
+        # Gave up after about one cap's worth of input instead of buffering to EOF.
+        self.assertLess(fh.tell(), len(head) + 64 + 2 * 16)
+
+    def test_ndjson_feed_through_the_command(self):
+        products, tutorials, services = make_feed(3)
+        lines = [json.dumps({'type': 'product', **p}) for p in products]
+        lines += [json.dumps({'type': 'tutorial', **tutorials[0]}), '', json.dumps({'kind': 'services', **services[0]})]
+        self.assertEqual(len(list(iter_ndjson_feed(StringIO('\n'.join(lines))))), 5)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'feed.ndjson')
+            with open(path, 'w', encoding='utf-8') as fh:
+                fh.write('\n'.join(lines))
+            out = StringIO()
+            call_command('import_products', source=path, batch_size=2, stdout=out)
+        self.assertIn('products: 3 read', out.getvalue())
+        self.assertEqual(Product.objects.get(name='Feed 2').related.count(), 2)
+        self.assertEqual(Tutorial.objects.count(), 1)
+
+
+JS_MODULE = """// Catalog data
+export const products = [
+  {
+    id: 1, name: 'Kit "A"', price: 12.5, category: `DIY
+Kits`,
+    related: [2,], /* trailing commas are fine */
+  },
+  { "id": 2, name: "Caf\\u00e9 \\x41", price: -0, related: [1] },
+];
+export const tutorials = [{ title: 'T', excerpt: null, extra: undefined }]
+const services = [], testimonials = [{ name: 'x' }];
+"""
+
+
+class JSDataTests(TestCase):
+    def test_parses_literals_without_evaluating(self):
+        data = parse_js_module(JS_MODULE)
+        self.assertEqual(sorted(data), ['products', 'services', 'testimonials', 'tutorials'])
+        first, second = data['products']
+        self.assertEqual(first, {'id': 1, 'name': 'Kit "A"', 'price': 12.5, 'category': 'DIY\nKits', 'related': [2]})
+        self.assertEqual(second['name'], 'Caf\u00e9 A')
+        self.assertEqual(data['tutorials'], [{'title': 'T', 'excerpt': None, 'extra': None}])
+
+    def test_rejects_code(self):
+        for source in ('const x = [1, 2].map(f);', 'export default foo;', 'const t = `a ${b}`;', 'const s = "open'):
+            with self.assertRaises(JSDataError):
+                parse_js_module(source)
+
+    def test_caches_parse_by_content_hash(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'products.js')
+            cache_dir = os.path.join(tmp, 'cache')
+            with open(path, 'w', encoding='utf-8') as fh:
+                fh.write(JS_MODULE)
+            self.assertEqual(len(load_js_data(path, cache_dir=cache_dir)['products']), 2)
+            self.assertEqual(os.stat(cache_dir).st_mode & 0o777, 0o700)
+            # A warm cache is served without re-parsing, whatever the mtime says.
+            with mock.patch('shop.jsdata.parse_js_module') as parse:
+                self.assertEqual(len(load_js_data(path, cache_dir=cache_dir)['products']), 2)
+                stat = os.stat(path)
+                os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+                load_js_data(path, cache_dir=cache_dir)
+            parse.assert_not_called()
+
+            # Same size and mtime, different content: still re-parsed.
+            stat = os.stat(path)
+            with open(path, 'w', encoding='utf-8') as fh:
+                fh.write(JS_MODULE.replace("id: 1, name: 'Kit", "id: 1, name: 'Box"))
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            self.assertEqual(load_js_data(path, cache_dir=cache_dir)['products'][0]['name'], 'Box "A"')
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+    def test_ignores_cache_dir_others_can_write(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'products.js')
+            with open(path, 'w', encoding='utf-8') as fh:
+                fh.write(JS_MODULE)
+            os.chmod(tmp, 0o777)
+            load_js_data(path, cache_dir=tmp)
+            self.assertEqual(os.listdir(tmp), ['products.js'])
+
+    def test_command_imports_js_with_native_parser(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'products.js')
+            with open(path, 'w', encoding='utf-8') as fh:
+                fh.write(JS_MODULE)
+            out = StringIO()
+            call_command('import_products', source=path, no_cache=True, stdout=out, stderr=StringIO())
+        self.assertIn('Importing 2 products, 1 tutorials, 0 services', out.getvalue())
+        self.assertEqual(Product.objects.get(name='Kit "A"').related.get().name, 'Caf\u00e9 A')
+        self.assertEqual(Tutorial.objects.get().title, 'T')
+
+
+class CatalogSeederTests(TestCase):
+    def seed(self, seed):
+        CatalogSeeder(seed=seed, batch_size=40, related=3).run(products=101, tutorials=7, services=3)
+        return list(Product.objects.order_by('id').values_list('name', 'price', 'description'))
+
+    def test_volumes_and_symmetric_related_graph(self):
+        self.seed(7)
+        self.assertEqual((Product.objects.count(), Tutorial.objects.count(), Service.objects.count()), (101, 7, 3))
+        through = Product.related.through
+        edges = set(through.objects.values_list('from_product_id', 'to_product_id'))
+        self.assertEqual(len(edges), through.objects.count())
+        self.assertEqual(len(edges), 101 * 3 * 2)
+        self.assertTrue(all((dst, src) in edges for src, dst in edges))
+        self.assertFalse(any(src == dst for src, dst in edges))
+        product = Product.objects.first()
+        self.assertEqual(product.related.count(), 6)
+
+    def test_same_seed_same_rows(self):
+        first = self.seed(7)
+        Product.objects.all().delete()
+        self.assertEqual(self.seed(7), first)
+        Product.objects.all().delete()
+        self.assertNotEqual(self.seed(8), first)
+
+    def test_command_seeds_catalog_and_users(self):
+        out = StringIO()
+        call_command('seed_data', products=30, tutorials=5, services=2, users=20, hash_pool=2, stdout=out)
+        self.assertIn('Seed complete.', out.getvalue())
+        self.assertEqual(Product.objects.count(), 30)
+        self.assertEqual(User.objects.filter(email_normalized__endswith='@seed.example.invalid').count(), 20)
+        self.assertTrue(bootstrap.is_set(bootstrap.BENCH_DATABASE))
+        # Rerunning replaces the seeded users instead of colliding with them.
+        call_command('seed_data', products=0, tutorials=0, services=0, users=10, hash_pool=2, stdout=StringIO())
+        self.assertEqual(User.objects.filter(email_normalized__endswith='@seed.example.invalid').count(), 10)
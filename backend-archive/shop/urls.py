@@ -3,13 +3,19 @@ from .views import (
     ProductListCreateView, ProductDetailView,
     TutorialListCreateView, TutorialDetailView,
     ServiceListCreateView, ServiceDetailView,
+    ProductFacetsView, TutorialFacetsView,
+    CatalogCacheStatsView, SearchView,
 )
 
 urlpatterns = [
     path('products/', ProductListCreateView.as_view(), name='products'),
+    path('products/facets/', ProductFacetsView.as_view(), name='product_facets'),
     path('products/<int:pk>/', ProductDetailView.as_view(), name='product_detail'),
     path('tutorials/', TutorialListCreateView.as_view(), name='tutorials'),
+    path('tutorials/facets/', TutorialFacetsView.as_view(), name='tutorial_facets'),
     path('tutorials/<int:pk>/', TutorialDetailView.as_view(), name='tutorial_detail'),
     path('services/', ServiceListCreateView.as_view(), name='services'),
     path('services/<int:pk>/', ServiceDetailView.as_view(), name='service_detail'),
+    path('search/', SearchView.as_view(), name='search'),
+    path('cache/stats/', CatalogCacheStatsView.as_view(), name='catalog_cache_stats'),
 ]
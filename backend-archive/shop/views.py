@@ -1,39 +1,226 @@
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Count, Prefetch
 from rest_framework import generics, permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from config.query_budget import query_budget
+from .cache import CatalogCacheMixin, cache_stats
+from .conditional import ConditionalGetMixin
 from .models import Product, Tutorial, Service
-from .serializers import ProductSerializer, TutorialSerializer, ServiceSerializer
+from .search import KINDS, search_catalog
+from .serializers import ProductSerializer, TutorialSerializer, ServiceSerializer, requested_expansions
+
+
+class CatalogFilterMixin:
+    """Server-side ``?category=a,b``, ``?min_price=``/``?max_price=`` and ``?ordering=``.
+
+    ``get_ordering()`` is read by ``KeysetPagination``, which pages on
+    ``(ordering column, id)``; every allowed ordering has a matching index.
+    """
+
+    ordering_fields = ('id',)
+    filter_price = False
+
+    def get_ordering(self):
+        raw = self.request.query_params.get('ordering', 'id')
+        name = raw.lstrip('-')
+        if name not in self.ordering_fields:
+            raise ValidationError({'ordering': [f'Unsupported ordering: {raw}']})
+        return ('-' if raw.startswith('-') else '') + ('pk' if name == 'id' else name)
+
+    def filter_queryset(self, queryset):
+        return self.apply_filters(super().filter_queryset(queryset), self.request.query_params)
+
+    def apply_filters(self, queryset, params, skip=()):
+        categories = [name for name in params.get('category', '').split(',') if name]
+        if categories and 'category' not in skip:
+            queryset = queryset.filter(category__in=categories)
+        if self.filter_price:
+            for param, lookup in (('min_price', 'price__gte'), ('max_price', 'price__lte')):
+                raw = params.get(param)
+                if not raw:
+                    continue
+                try:
+                    queryset = queryset.filter(**{lookup: Decimal(raw)})
+                except InvalidOperation:
+                    raise ValidationError({param: ['A valid number is required.']})
+        return queryset
+
+
+class SparseFieldsetViewMixin:
+    """Honour ``?fields=a,b`` and a per-view default representation on reads.
+
+    The selected field names go to the serializer through its context and are
+    mirrored onto the queryset with ``.only()``, so unrequested text columns are
+    neither read from the database nor serialized. List views may set
+    ``default_representation = 'card'`` to use ``Meta.card_fields`` unless the
+    client asks for ``?view=full``.
+    """
+
+    default_representation = 'full'
+
+    def get_selected_fields(self):
+        if hasattr(self, '_selected_fields'):
+            return self._selected_fields
+        self._selected_fields = self._resolve_selected_fields()
+        return self._selected_fields
+
+    def _resolve_selected_fields(self):
+        if self.request is None or self.request.method not in permissions.SAFE_METHODS:
+            return None
+        meta = self.get_serializer_class().Meta
+        raw = self.request.query_params.get('fields')
+        if raw:
+            wanted = {name.strip() for name in raw.split(',') if name.strip()}
+            unknown = sorted(wanted - set(meta.fields))
+            if unknown:
+                raise ValidationError({'fields': [f'Unknown field: {name}' for name in unknown]})
+            return [name for name in meta.fields if name in wanted or name == 'id']
+        representation = self.request.query_params.get('view', self.default_representation)
+        if representation == 'card' and getattr(meta, 'card_fields', None):
+            return list(meta.card_fields)
+        return None
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_selected_fields()
+        return context
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        selected = self.get_selected_fields()
+        if selected is None:
+            return queryset
+        columns = {field.name for field in queryset.model._meta.concrete_fields}
+        wanted = [name for name in selected if name in columns]
+        # The pagination cursor reads the ordering column off the page rows.
+        if hasattr(self, 'get_ordering'):
+            field = self.get_ordering().lstrip('-')
+            wanted.append('id' if field == 'pk' else field)
+        return queryset.only(*wanted)
+
+
+class ProductQuerysetMixin:
+    """Load ``Product.related`` for a whole page in one batched query.
+
+    By default only the related ids are fetched; with ``?expand=related`` the
+    prefetch also pulls the handful of columns the summary serializer needs.
+    Nothing is prefetched when the selected fieldset leaves ``related`` out.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        selected = self.get_selected_fields()
+        if selected is not None and 'related' not in selected:
+            return queryset
+        if 'related' in requested_expansions(self.request):
+            related = Product.objects.only('id', 'name', 'price', 'image_url')
+        else:
+            related = Product.objects.only('id')
+        return queryset.prefetch_related(Prefetch('related', queryset=related))
 
 
-class ProductListCreateView(generics.ListCreateAPIView):
+@query_budget(4)
+class ProductListCreateView(ConditionalGetMixin, CatalogCacheMixin, ProductQuerysetMixin, SparseFieldsetViewMixin,
+                            CatalogFilterMixin, generics.ListCreateAPIView):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
     permission_classes = [permissions.AllowAny]
+    default_representation = 'card'
+    ordering_fields = ('id', 'price', 'name')
+    filter_price = True
 
 
-class ProductDetailView(generics.RetrieveUpdateDestroyAPIView):
+@query_budget(4)
+class ProductDetailView(ConditionalGetMixin, CatalogCacheMixin, ProductQuerysetMixin, SparseFieldsetViewMixin,
+                        generics.RetrieveUpdateDestroyAPIView):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
     permission_classes = [permissions.IsAdminUser | permissions.IsAuthenticated]
 
 
-class TutorialListCreateView(generics.ListCreateAPIView):
+@query_budget(3)
+class TutorialListCreateView(ConditionalGetMixin, CatalogCacheMixin, SparseFieldsetViewMixin, CatalogFilterMixin,
+                             generics.ListCreateAPIView):
     queryset = Tutorial.objects.all()
     serializer_class = TutorialSerializer
     permission_classes = [permissions.AllowAny]
 
 
-class TutorialDetailView(generics.RetrieveUpdateDestroyAPIView):
+@query_budget(3)
+class TutorialDetailView(ConditionalGetMixin, CatalogCacheMixin, SparseFieldsetViewMixin,
+                         generics.RetrieveUpdateDestroyAPIView):
     queryset = Tutorial.objects.all()
     serializer_class = TutorialSerializer
     permission_classes = [permissions.IsAdminUser | permissions.IsAuthenticated]
 
 
-class ServiceListCreateView(generics.ListCreateAPIView):
+@query_budget(3)
+class ServiceListCreateView(ConditionalGetMixin, CatalogCacheMixin, SparseFieldsetViewMixin, generics.ListCreateAPIView):
     queryset = Service.objects.all()
     serializer_class = ServiceSerializer
     permission_classes = [permissions.AllowAny]
 
 
-class ServiceDetailView(generics.RetrieveUpdateDestroyAPIView):
+@query_budget(3)
+class ServiceDetailView(ConditionalGetMixin, CatalogCacheMixin, SparseFieldsetViewMixin,
+                         generics.RetrieveUpdateDestroyAPIView):
     queryset = Service.objects.all()
     serializer_class = ServiceSerializer
     permission_classes = [permissions.IsAdminUser | permissions.IsAuthenticated]
+
+
+class CategoryFacetsView(CatalogCacheMixin, CatalogFilterMixin, generics.GenericAPIView):
+    """Per-category counts from one ``GROUP BY``.
+
+    Honours the same filters as the list endpoint except ``category`` itself,
+    so the counts describe what each category choice would return.
+    """
+
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        return self.cached_response(self.facets, request)
+
+    def facets(self, request):
+        queryset = self.apply_filters(self.get_queryset(), request.query_params, skip=('category',))
+        rows = queryset.order_by().values('category').annotate(count=Count('pk')).order_by('category')
+        return Response({'categories': list(rows)})
+
+
+@query_budget(2)
+class ProductFacetsView(CategoryFacetsView):
+    queryset = Product.objects.all()
+    filter_price = True
+
+
+@query_budget(2)
+class TutorialFacetsView(CategoryFacetsView):
+    queryset = Tutorial.objects.all()
+
+
+@query_budget(2)
+class SearchView(APIView):
+    """``GET /api/search/?q=<text>[&type=product|tutorial][&limit=n]``"""
+
+    permission_classes = [permissions.AllowAny]
+    max_limit = 50
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        kinds = [kind for kind in request.query_params.get('type', '').split(',') if kind] or KINDS
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), self.max_limit)
+        except ValueError:
+            limit = 20
+        return Response({'query': query, 'results': search_catalog(query, kinds=kinds, limit=limit)})
+
+
+class CatalogCacheStatsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(cache_stats())